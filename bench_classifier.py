@@ -0,0 +1,102 @@
+"""Micro-benchmark for the candidate-info classifier.
+
+Compares the original per-keyword scan (lowercase copy, then one ``in``
+test per keyword) with ``candidate_classifier.KeywordClassifier`` over a
+corpus of short control turns and long pasted resumes, and checks that
+both agree on every message.
+
+Usage (from project root):
+
+    python bench_classifier.py
+    python bench_classifier.py --locales en,de,fr,es -n 20000
+"""
+
+import argparse
+import random
+import timeit
+from typing import Callable, List, Optional
+
+from candidate_classifier import KeywordClassifier
+
+SHORT_COMMANDS = [
+    "show my resume",
+    "print my resume",
+    "Can you make it shorter?",
+    "make the summary more concise please",
+    "translate it to German",
+    "add my new phone number 555-0100",
+    "Skills: Python, SQL, Kubernetes",
+    "I have 5 years of experience in backend work",
+    "thanks!",
+    "Use a more formal tone",
+]
+
+_RESUME_SECTION = (
+    "Jane Doe\nSenior Software Engineer\n\nSummary: Backend engineer with "
+    "a focus on distributed systems.\n\nWork Experience\nAcme Corp (2019-"
+    "2024) - Led the payments platform; responsibilities included on-call, "
+    "design reviews and mentoring.\n\nEducation: B.Sc. Computer Science\n"
+    "Skills: Python, Go, PostgreSQL, Kafka\n\nProjects: ledger service, "
+    "fraud scoring pipeline\n"
+)
+
+
+def build_corpus(n_long: int = 50, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    corpus = list(SHORT_COMMANDS)
+    for _ in range(n_long):
+        corpus.append(_RESUME_SECTION * rng.randint(1, 20))
+    rng.shuffle(corpus)
+    return corpus
+
+
+def legacy_classifier(text: str) -> bool:
+    """The original implementation, kept here as the baseline."""
+    lowered = text.lower()
+    if len(text) > 300:
+        return True
+    keywords = [
+        "experience:",
+        "skills:",
+        "education:",
+        "projects:",
+        "summary:",
+        "work experience",
+        "years of experience",
+        "responsibilities",
+    ]
+    return any(k in lowered for k in keywords)
+
+
+def bench(fn: Callable[[str], bool], corpus: List[str], number: int) -> float:
+    """Mean microseconds per classified message."""
+    seconds = timeit.timeit(lambda: [fn(t) for t in corpus], number=number)
+    return seconds / (number * len(corpus)) * 1e6
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--locales", default="en")
+    parser.add_argument("-n", "--number", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    corpus = build_corpus()
+    compiled = KeywordClassifier.for_locales(args.locales.split(","))
+    default = KeywordClassifier.for_locales(["en"])
+    mismatches = [t for t in corpus if legacy_classifier(t) != default(t)]
+    if mismatches:
+        raise SystemExit(f"classifiers disagree on {len(mismatches)} message(s)")
+
+    short = [t for t in corpus if len(t) <= 300]
+    long_ = [t for t in corpus if len(t) > 300]
+    print(f"{'corpus':<10}{'messages':>9}{'legacy us':>11}{'compiled us':>13}")
+    for name, subset in (("short", short), ("long", long_), ("all", corpus)):
+        print(
+            f"{name:<10}{len(subset):>9}"
+            f"{bench(legacy_classifier, subset, args.number):>11.2f}"
+            f"{bench(compiled, subset, args.number):>13.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Import-time benchmark for the agent packages.
+
+``adk web --reload`` re-imports every agent package on each change, in a
+process that already has ``google.adk`` loaded. This script mimics that:
+each sample is a fresh interpreter that preloads ``google.adk`` (unless
+``--no-preload``) and then times ``import <module>``. It also reports any
+files or directories the import created, since importing an agent should
+not touch the filesystem.
+
+Usage (from project root):
+
+    python bench_import.py                      # current working tree
+    python bench_import.py --baseline HEAD~1    # compare with another revision
+    python bench_import.py -n 20 callback_logging llm_auditor
+
+``--baseline`` exports that revision with ``git archive`` into a temporary
+directory and runs the same measurement against it.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Optional
+
+DEFAULT_MODULES = [
+    "callback_logging",
+    "resume_creater_memory",
+    "resume_creater",
+    "llm_auditor",
+    "my_google_search_agent",
+]
+
+_PROBE = """
+import json, os, sys, time
+root, module, preload = sys.argv[1], sys.argv[2], sys.argv[3] == "1"
+if preload:
+    # already loaded by the adk web server before it imports any agent
+    import google.adk.agents.llm_agent, google.adk.runners, google.adk.tools
+def tree():
+    seen = set()
+    for top in (os.getcwd(), root):
+        for dirpath, dirnames, filenames in os.walk(top):
+            dirnames[:] = [d for d in dirnames if d not in ("__pycache__", ".git", ".venv")]
+            seen.update(os.path.join(dirpath, n) for n in dirnames + filenames)
+    return seen
+before = tree()
+started = time.perf_counter()
+__import__(module)
+elapsed = time.perf_counter() - started
+created = sorted(os.path.relpath(p, root) if p.startswith(root) else p for p in tree() - before)
+print(json.dumps({"ms": elapsed * 1000, "created": created}))
+"""
+
+
+def measure(root: str, module: str, samples: int, preload: bool) -> Dict:
+    """Time ``import module`` in ``samples`` fresh interpreters."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = root
+    env.setdefault("MODEL", "gemini-2.0-flash")  # agents validate the model name
+    timings: List[float] = []
+    created: List[str] = []
+    for _ in range(samples):
+        with tempfile.TemporaryDirectory() as cwd:
+            proc = subprocess.run(
+                [sys.executable, "-c", _PROBE, root, module, "1" if preload else "0"],
+                cwd=cwd,
+                env=env,
+                capture_output=True,
+                text=True,
+            )
+        if proc.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{proc.stderr}")
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        timings.append(result["ms"])
+        created = created or result["created"]
+    return {
+        "module": module,
+        "median_ms": round(statistics.median(timings), 1),
+        "min_ms": round(min(timings), 1),
+        "created": created,
+    }
+
+
+def export_revision(ref: str, target: str) -> None:
+    archive = subprocess.run(
+        ["git", "archive", ref], check=True, capture_output=True
+    ).stdout
+    subprocess.run(["tar", "-x", "-C", target], input=archive, check=True)
+
+
+def compile_tree(root: str) -> None:
+    """Byte-compile ``root`` so samples time imports, not compilation.
+
+    Without this, a fresh export (or a module edited since its ``.pyc`` was
+    written, with ``PYTHONDONTWRITEBYTECODE`` set) is compiled in every
+    sample.
+    """
+    subprocess.run([sys.executable, "-m", "compileall", "-q", root], check=True)
+
+
+def run(root: str, modules: List[str], samples: int, preload: bool) -> List[Dict]:
+    compile_tree(root)
+    return [measure(root, module, samples, preload) for module in modules]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("-n", "--samples", type=int, default=10)
+    parser.add_argument("--baseline", help="git revision to compare against")
+    parser.add_argument(
+        "--no-preload",
+        action="store_true",
+        help="include the google.adk import itself in the timing",
+    )
+    args = parser.parse_args(argv)
+
+    root = os.path.dirname(os.path.abspath(__file__))
+    preload = not args.no_preload
+    current = run(root, args.modules, args.samples, preload)
+
+    baseline = None
+    if args.baseline:
+        with tempfile.TemporaryDirectory() as tmp:
+            export_revision(args.baseline, tmp)
+            baseline = run(tmp, args.modules, args.samples, preload)
+
+    header = f"{'module':<26}{'median ms':>11}{'min ms':>9}"
+    if baseline:
+        header += f"{'baseline':>11}{'speedup':>9}"
+    print(header)
+    for i, row in enumerate(current):
+        line = f"{row['module']:<26}{row['median_ms']:>11}{row['min_ms']:>9}"
+        if baseline:
+            base = baseline[i]["median_ms"]
+            line += f"{base:>11}{base / max(row['median_ms'], 0.1):>8.1f}x"
+        print(line)
+    for label, rows in (("current", current), ("baseline", baseline or [])):
+        for row in rows:
+            if row["created"]:
+                print(f"{label}: import {row['module']} created {row['created']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,368 @@
+"""Shared model callbacks: logging, metrics and resume memory injection.
+
+Every agent package imports this module, so importing it has no side
+effects: the logging handlers are installed by ``configure_logging`` on
+the first callback (or explicitly by scripts), and the resume memory
+helpers are only imported the first time the resume agent needs them.
+"""
+
+import atexit
+import copy
 import logging
-from typing import Optional
+import os
+import queue
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import callback_metrics
+
+if TYPE_CHECKING:  # annotations only; agents import google.adk themselves
+    from google.adk.agents.callback_context import CallbackContext
+    from google.adk.models import LlmRequest, LlmResponse
+
+
+# -----------------------------
+# Lazy logging setup
+# -----------------------------
+
+_logging_configured = False
+_logging_lock = threading.RLock()
+
+
+def _file_handler() -> logging.Handler:
+    """Structured, rotated JSONL event log (default) or the legacy text log.
+
+    AGENT_LOG_FORMAT=text restores the plain ``agent.log`` file.
+    """
+    if os.getenv("AGENT_LOG_FORMAT", "jsonl").lower() == "text":
+        return logging.FileHandler("agent.log")
+
+    from event_log import JsonlEventHandler
+
+    return JsonlEventHandler(
+        os.getenv("AGENT_EVENT_LOG", "agent.jsonl"),
+        max_bytes=int(os.getenv("AGENT_EVENT_LOG_MAX_BYTES", str(50 * 1024 * 1024))),
+        rotate_seconds=float(os.getenv("AGENT_EVENT_LOG_ROTATE_SECONDS", "86400")),
+        backup_count=int(os.getenv("AGENT_EVENT_LOG_BACKUPS", "10")),
+        compress=os.getenv("AGENT_EVENT_LOG_GZIP", "1").lower() in ("1", "true", "yes"),
+        max_field_chars=int(os.getenv("AGENT_EVENT_LOG_MAX_FIELD_CHARS", "2000")),
+    )
+
+
+def configure_logging() -> None:
+    """Install console + file logging (and async logging if requested).
+
+    Called automatically by the callbacks below; safe to call repeatedly.
+    Like ``logging.basicConfig``, it leaves an already configured root
+    logger alone.
+    """
+
+    global _logging_configured
+    if _logging_configured:
+        return
+    with _logging_lock:
+        if _logging_configured:
+            return
+        _logging_configured = True
+        logging.basicConfig(
+            level=logging.INFO,
+            format="%(asctime)s [%(levelname)s] %(message)s",
+            handlers=[
+                logging.StreamHandler(),  # prints to terminal
+                _file_handler(),  # writes agent.jsonl (or agent.log) locally
+            ],
+        )
+        if os.getenv(_ASYNC_LOGGING_ENV, "").lower() in ("1", "true", "yes"):
+            enable_async_logging(
+                max_queue_size=int(os.getenv("AGENT_LOG_QUEUE_SIZE", "10000")),
+                overflow_policy=os.getenv("AGENT_LOG_OVERFLOW", "drop_newest"),
+            )
+
+
+# -----------------------------
+# Lazy resume memory import
+# -----------------------------
+
+# For resume_creater_memory: load stored resumes so we can inject them into
+# the prompt when the same user comes back later. Importing it pulls in the
+# whole resume agent and its storage, so only do it when that agent runs.
+_memory_policy = None
+_memory_unavailable = False
+
+
+def _memory_api():
+    """Return ``resume_creater_memory.memory_policy``, or None if unavailable."""
+
+    global _memory_policy, _memory_unavailable
+    if _memory_policy is None and not _memory_unavailable:
+        try:
+            from resume_creater_memory import memory_policy  # type: ignore
+
+            _memory_policy = memory_policy
+        except Exception:  # pragma: no cover - defensive; other agents may not need this
+            _memory_unavailable = True
+    return _memory_policy
+
 
-from google.adk.agents.callback_context import CallbackContext
-from google.adk.models import LlmRequest, LlmResponse
+# -----------------------------
+# Optional non-blocking logging pipeline
+# -----------------------------
 
-# For resume_creater_memory: load/save stored resumes so we can inject
-# them into the prompt when the same user comes back later.
-try:
-    from resume_creater_memory.resume_storage import load_resume  # type: ignore
-except Exception:  # pragma: no cover - defensive; other agents may not need this
-    load_resume = None  # type: ignore
+# Set AGENT_LOG_ASYNC=1 to move handler I/O off the event loop.
+_ASYNC_LOGGING_ENV = "AGENT_LOG_ASYNC"
 
+_OVERFLOW_POLICIES = ("drop_newest", "drop_oldest", "block")
 
-# Configure local logging (console + file)
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[
-        logging.StreamHandler(),  # prints to terminal
-        logging.FileHandler("agent.log"),  # writes to agent.log locally
-    ],
-)
+_STOP = object()  # sentinel telling the writer thread to exit
+
+
+class _BoundedQueueHandler(logging.Handler):
+    """Queue handler that never lets a full queue stall the caller.
+
+    Prepares records like ``logging.handlers.QueueHandler``, which is not
+    subclassed because importing ``logging.handlers`` (and ``pickle``) would
+    cost more than the rest of this module.
+
+    ``overflow_policy`` decides what happens when the queue is full:
+
+    - ``"drop_newest"``: discard the record being logged.
+    - ``"drop_oldest"``: discard the oldest queued record to make room.
+    - ``"block"``: wait up to ``block_timeout`` seconds, then drop.
+    """
+
+    def __init__(
+        self,
+        log_queue: "queue.Queue",
+        overflow_policy: str = "drop_newest",
+        block_timeout: float = 0.05,
+    ):
+        super().__init__()
+        self.queue = log_queue
+        if overflow_policy not in _OVERFLOW_POLICIES:
+            raise ValueError(
+                f"overflow_policy must be one of {_OVERFLOW_POLICIES}, "
+                f"got {overflow_policy!r}"
+            )
+        self.overflow_policy = overflow_policy
+        self.block_timeout = block_timeout
+        self.enqueued = 0
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Format the message into a copy of ``record``, as QueueHandler does."""
+        msg = self.format(record)
+        record = copy.copy(record)
+        record.message = msg
+        record.msg = msg
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        return record
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.enqueue(self.prepare(record))
+        except Exception:
+            self.handleError(record)
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            if self.overflow_policy == "block":
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            if self.overflow_policy != "drop_oldest":
+                self.dropped += 1
+                return
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            self.dropped += 1
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+                return
+        self.enqueued += 1
+
+
+class _AsyncLogWriter:
+    """Background thread draining the log queue in batches.
+
+    Records are written to every handler and each handler is flushed once
+    per batch instead of once per record, so bursts of long prompts cost a
+    single flush.
+    """
+
+    def __init__(
+        self,
+        handlers: List[logging.Handler],
+        max_queue_size: int = 10000,
+        overflow_policy: str = "drop_newest",
+        batch_size: int = 256,
+    ):
+        self.handlers = handlers
+        self.batch_size = max(1, batch_size)
+        self.queue: "queue.Queue" = queue.Queue(maxsize=max_queue_size)
+        self.queue_handler = _BoundedQueueHandler(self.queue, overflow_policy)
+        self.written = 0
+        self.batches = 0
+        self._thread = threading.Thread(
+            target=self._run, name="agent-log-writer", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Flush everything still queued and join the writer thread."""
+        if not self._thread.is_alive():
+            return
+        self.queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            record = self.queue.get()
+            if record is _STOP:
+                return
+            batch = [record]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    record = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if record is _STOP:
+                    stop = True
+                    break
+                batch.append(record)
+            self._write_batch(batch)
+            if stop:
+                return
+
+    def _write_batch(self, records: List[logging.LogRecord]) -> None:
+        for handler in self.handlers:
+            if hasattr(handler, "handle_batch"):
+                handler.handle_batch(records)
+                continue
+            stream = getattr(handler, "stream", None)
+            if not isinstance(handler, logging.StreamHandler) or stream is None:
+                for record in records:
+                    if record.levelno >= handler.level:
+                        handler.handle(record)
+                continue
+            handler.acquire()
+            try:
+                for record in records:
+                    if record.levelno < handler.level or not handler.filter(record):
+                        continue
+                    try:
+                        stream.write(handler.format(record) + handler.terminator)
+                    except Exception:
+                        handler.handleError(record)
+                handler.flush()
+            finally:
+                handler.release()
+        self.written += len(records)
+        self.batches += 1
+
+
+_async_writer: Optional[_AsyncLogWriter] = None
+
+
+def enable_async_logging(
+    max_queue_size: int = 10000,
+    overflow_policy: str = "drop_newest",
+    batch_size: int = 256,
+) -> None:
+    """Route root-logger output through a bounded queue and a writer thread.
+
+    The handlers installed by ``configure_logging`` are detached from the
+    root logger and driven by the writer thread instead, so the callbacks
+    only pay for an in-memory ``put``. Calling this twice is a no-op.
+    """
+
+    global _async_writer
+    configure_logging()
+    if _async_writer is not None:
+        return
 
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+    writer = _AsyncLogWriter(
+        handlers,
+        max_queue_size=max_queue_size,
+        overflow_policy=overflow_policy,
+        batch_size=batch_size,
+    )
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(writer.queue_handler)
+    writer.start()
+    atexit.register(disable_async_logging)
+    _async_writer = writer
 
-def _compute_persistence_id(callback_context: CallbackContext) -> str:
+
+def disable_async_logging() -> None:
+    """Drain the queue and reattach the handlers to the root logger."""
+
+    global _async_writer
+    writer = _async_writer
+    if writer is None:
+        return
+    root = logging.getLogger()
+    root.removeHandler(writer.queue_handler)
+    writer.stop()
+    for handler in writer.handlers:
+        root.addHandler(handler)
+    _async_writer = None
+
+
+def get_logging_stats() -> Dict[str, int]:
+    """Counters for the async pipeline (all zero when it is disabled)."""
+
+    writer = _async_writer
+    if writer is None:
+        return {"enqueued": 0, "dropped": 0, "written": 0, "batches": 0, "queued": 0}
+    return {
+        "enqueued": writer.queue_handler.enqueued,
+        "dropped": writer.queue_handler.dropped,
+        "written": writer.written,
+        "batches": writer.batches,
+        "queued": writer.queue.qsize(),
+    }
+
+
+def get_session_state(callback_context: "CallbackContext"):
+    """Return the session state mapping of a callback context, or None.
+
+    Older ADK builds expose it as ``session_state``; current ones as
+    ``state`` (a dict-like ``State`` object).
+    """
+    for attr in ("session_state", "state"):
+        state = getattr(callback_context, attr, None)
+        if state is not None and hasattr(state, "get"):
+            return state
+    return None
+
+
+def compute_persistence_id(callback_context: "CallbackContext") -> str:
     """Derive a stable id for storing/retrieving resumes.
 
     Priority:
     1. session_state["user_id"]  (if provided by the app / ADK Web)
     2. session_state["session_id"]
-    3. callback_context.session_id
+    3. callback_context.session_id (or the id of its session)
     4. "default" (fallback)
     """
 
-    session_state = getattr(callback_context, "session_state", None)
+    session_state = get_session_state(callback_context)
     persistence_id: Optional[str] = None
 
-    if isinstance(session_state, dict):
+    if session_state is not None:
         persistence_id = (
             session_state.get("user_id")
             or session_state.get("session_id")
@@ -45,6 +371,10 @@ def _compute_persistence_id(callback_context: CallbackContext) -> str:
     if not persistence_id:
         persistence_id = getattr(callback_context, "session_id", None)
 
+    if not persistence_id:
+        session = getattr(callback_context, "session", None)
+        persistence_id = getattr(session, "id", None)
+
     if not persistence_id:
         persistence_id = "default"
 
@@ -55,30 +385,99 @@ def _looks_like_candidate_info(text: str) -> bool:
     """Heuristic to decide if the user message already contains full resume data.
 
     If it does, we should NOT inject the stored resume, so a fresh
-    resume can be generated purely from the new info.
+    resume can be generated purely from the new info. The check itself is
+    pluggable, see ``candidate_classifier``.
     """
 
-    lowered = text.lower()
+    import candidate_classifier
+
+    return candidate_classifier.looks_like_candidate_info(text)
+
+
+def _memory_injection_target(
+    callback_context: "CallbackContext", llm_request: "LlmRequest"
+):
+    """Return the user part to log and whether stored memory should be injected.
+
+    Returns ``(None, False)`` when there is no user text to work with.
+    """
+
+    if not llm_request.contents or llm_request.contents[-1].role != "user":
+        return None, False
+
+    user_content = llm_request.contents[-1]
+    part = user_content.parts[-1]
+
+    if not part.text:
+        return None, False
+
+    agent_name = getattr(callback_context, "agent_name", None)
 
-    # If it's long and structured, it's likely candidate info
-    if len(text) > 300:
-        return True
+    # Only apply memory injection for this specific agent, and never when
+    # the message looks like fresh candidate info.
+    wants_memory = (
+        agent_name == "resume_generator_agent"
+        and _memory_api() is not None
+        and not _looks_like_candidate_info(part.text)
+    )
+    return part, wants_memory
 
-    # Common resume field markers
-    keywords = [
-        "experience:",
-        "skills:",
-        "education:",
-        "projects:",
-        "summary:",
-        "work experience",
-        "years of experience",
-        "responsibilities",
-    ]
-    return any(k in lowered for k in keywords)
 
+def _event(kind: str, callback_context: "CallbackContext", **fields) -> Dict:
+    """Structured fields for the JSONL event log (see event_log.py)."""
+    session = getattr(callback_context, "session", None)
+    return {
+        "event": kind,
+        "agent": getattr(callback_context, "agent_name", None),
+        "invocation_id": getattr(callback_context, "invocation_id", None),
+        "session_id": getattr(session, "id", None),
+        **fields,
+    }
 
-def log_query_to_model(callback_context: CallbackContext, llm_request: LlmRequest):
+
+def _inject_stored_resume(
+    callback_context: "CallbackContext",
+    part,
+    stored_resume: str,
+    persistence_id: str,
+) -> None:
+    injected_bytes = len(stored_resume.encode("utf-8"))
+    callback_metrics.record_injected_bytes(callback_context, injected_bytes)
+    logging.info(
+        f"[memory for {persistence_id}]: injected {injected_bytes} bytes",
+        extra={
+            "event": _event(
+                "memory_injected",
+                callback_context,
+                persistence_id=persistence_id,
+                injected_bytes=injected_bytes,
+            )
+        },
+    )
+    if stored_resume:
+        part.text = (
+            "Stored resume for this user (from previous sessions):\n"
+            f"{stored_resume}\n\n"
+            "User request:\n"
+            f"{part.text}"
+        )
+
+
+def _log_query(callback_context: "CallbackContext", text: str) -> None:
+    agent_name = getattr(callback_context, "agent_name", None)
+    logging.info(
+        f"[query to {agent_name}]: {text}",
+        extra={
+            "event": _event(
+                "model_request", callback_context, chars=len(text), text=text
+            )
+        },
+    )
+
+
+def log_query_to_model(
+    callback_context: "CallbackContext", llm_request: "LlmRequest"
+):
     """Log the last user message and, for resume agent, optionally inject stored resume.
 
     Behavior for `resume_generator_agent`:
@@ -86,49 +485,120 @@ def log_query_to_model(callback_context: CallbackContext, llm_request: LlmReques
       NOT inject memory (so a brand-new resume is generated).
     - If the user message is short/control-like (e.g. "show my resume",
       "print my resume"), we prepend the stored resume so the model can
-      answer without the user re-sending details.
+      answer without the user re-sending details. How much history is
+      prepended is decided by ``memory_policy.MemoryInjectionPolicy``
+      (in ``relevant`` mode, only the sections matching the request).
     """
 
-    if not llm_request.contents or llm_request.contents[-1].role != "user":
+    configure_logging()
+    callback_metrics.record_request(callback_context, llm_request)
+    part, wants_memory = _memory_injection_target(callback_context, llm_request)
+    if part is None:
         return
 
-    user_content = llm_request.contents[-1]
-    part = user_content.parts[-1]
+    if wants_memory:
+        persistence_id = compute_persistence_id(callback_context)
+        _inject_stored_resume(
+            callback_context,
+            part,
+            _memory_api().build_memory(persistence_id, query=part.text),
+            persistence_id,
+        )
 
-    if not part.text:
+    # Log whatever text is now going to the model
+    _log_query(callback_context, part.text)
+
+
+async def async_log_query_to_model(
+    callback_context: "CallbackContext", llm_request: "LlmRequest"
+):
+    """Async variant of ``log_query_to_model``.
+
+    The stored resume is read through ``async_build_memory`` so a slow disk
+    only delays this session instead of blocking the event loop.
+    """
+
+    configure_logging()
+    callback_metrics.record_request(callback_context, llm_request)
+    part, wants_memory = _memory_injection_target(callback_context, llm_request)
+    if part is None:
         return
 
-    original_text = part.text
-    agent_name = getattr(callback_context, "agent_name", None)
+    if wants_memory:
+        persistence_id = compute_persistence_id(callback_context)
+        memory = await _memory_api().async_build_memory(
+            persistence_id, query=part.text
+        )
+        _inject_stored_resume(callback_context, part, memory, persistence_id)
 
-    # Only apply memory injection for this specific agent
-    if agent_name == "resume_generator_agent" and load_resume is not None:
-        # If this looks like fresh candidate info, don't inject memory
-        if not _looks_like_candidate_info(original_text):
-            persistence_id = _compute_persistence_id(callback_context)
-            stored_resume = load_resume(persistence_id)
-
-            if stored_resume:
-                part.text = (
-                    "Stored resume for this user (from previous sessions):\n"
-                    f"{stored_resume}\n\n"
-                    "User request:\n"
-                    f"{original_text}"
-                )
+    _log_query(callback_context, part.text)
 
-    # Log whatever text is now going to the model
-    logging.info(f"[query to {agent_name}]: {part.text}")
+
+def record_model_response(
+    callback_context: "CallbackContext",
+    llm_response: "LlmResponse",
+    source: str = "model",
+    **fields,
+) -> None:
+    """Record metrics and a ``model_response`` event for a final response.
+
+    Agents with their own after_model_callback call this instead of
+    ``log_model_response``; ``source`` marks responses that did not come
+    from the model (e.g. ``"cache"``). Extra ``fields`` are added to the
+    event.
+    """
+    configure_logging()
+    elapsed = callback_metrics.record_response(callback_context, llm_response, source)
+    if llm_response.partial:
+        return
+    usage = llm_response.usage_metadata
+    chars = sum(
+        len(part.text)
+        for part in (llm_response.content.parts if llm_response.content else None) or []
+        if part.text
+    )
+    agent_name = getattr(callback_context, "agent_name", None)
+    duration_ms = round(elapsed * 1000, 1) if elapsed is not None else None
+    logging.info(
+        f"[{source} response from {agent_name}]: {chars} chars"
+        + (f" in {duration_ms} ms" if duration_ms is not None else ""),
+        extra={
+            "event": _event(
+                "model_response",
+                callback_context,
+                source=source,
+                chars=chars,
+                duration_ms=duration_ms,
+                prompt_tokens=usage.prompt_token_count if usage else None,
+                response_tokens=usage.candidates_token_count if usage else None,
+                **fields,
+            )
+        },
+    )
 
 
-def log_model_response(callback_context: CallbackContext, llm_response: LlmResponse):
+def log_model_response(
+    callback_context: "CallbackContext", llm_response: "LlmResponse"
+):
+    record_model_response(callback_context, llm_response)
     if llm_response.content and llm_response.content.parts:
         for part in llm_response.content.parts:
             if part.text:
                 logging.info(
-                    f"[response from {callback_context.agent_name}]: {part.text}"
+                    f"[response from {callback_context.agent_name}]: {part.text}",
+                    extra={
+                        "event": _event("model_text", callback_context, text=part.text)
+                    },
                 )
             elif part.function_call:
                 logging.info(
                     f"[function call from {callback_context.agent_name}]: "
-                    f"{part.function_call.name}"
+                    f"{part.function_call.name}",
+                    extra={
+                        "event": _event(
+                            "function_call",
+                            callback_context,
+                            tool=part.function_call.name,
+                        )
+                    },
                 )
@@ -0,0 +1,278 @@
+"""Per-agent latency/token metrics collected from the model callbacks.
+
+``record_request`` is called from the before_model_callback and
+``record_response`` from the after_model_callback of every agent. The two
+are paired by (invocation id, agent name) to measure wall time per model
+call. Token counts come from ``LlmResponse.usage_metadata``.
+
+Metrics can be exported in Prometheus text format (``render_prometheus``)
+or as a JSON snapshot (``dump_json``). Set ``AGENT_METRICS_DUMP=<path>``
+to write the JSON snapshot automatically at interpreter exit.
+"""
+
+import atexit
+import json
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+_TOKEN_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144)
+_BYTES_BUCKETS = (0, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+_MAX_PENDING = 4096
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last bucket is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the ``q`` quantile."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            seen += n
+            if seen >= target:
+                return bound
+        return float("inf")
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+
+    @staticmethod
+    def _labels(labels: Dict[str, object]) -> Labels:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def observe(self, name: str, value: float, buckets, **labels) -> None:
+        key = (name, self._labels(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = (name, self._labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+
+        def fmt(labels: Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+            items = labels + extra
+            if not items:
+                return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+        lines: List[str] = []
+        with self._lock:
+            for name in sorted({n for n, _ in self._counters}):
+                lines.append(f"# TYPE {name} counter")
+                for (n, labels), value in sorted(self._counters.items()):
+                    if n == name:
+                        lines.append(f"{name}{fmt(labels)} {value:g}")
+            for name in sorted({n for n, _ in self._histograms}):
+                lines.append(f"# TYPE {name} histogram")
+                for (n, labels), h in sorted(self._histograms.items()):
+                    if n != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(h.buckets + (float("inf"),), h.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                        lines.append(
+                            f"{name}_bucket{fmt(labels, (('le', le),))} {cumulative}"
+                        )
+                    lines.append(f"{name}_sum{fmt(labels)} {h.sum:g}")
+                    lines.append(f"{name}_count{fmt(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict:
+        """JSON-friendly view with count/sum/mean/p50/p95 per histogram."""
+        with self._lock:
+            return {
+                "counters": [
+                    {"name": n, "labels": dict(labels), "value": v}
+                    for (n, labels), v in sorted(self._counters.items())
+                ],
+                "histograms": [
+                    {
+                        "name": n,
+                        "labels": dict(labels),
+                        "count": h.count,
+                        "sum": h.sum,
+                        "mean": h.sum / h.count if h.count else 0.0,
+                        "p50": h.quantile(0.5),
+                        "p95": h.quantile(0.95),
+                    }
+                    for (n, labels), h in sorted(self._histograms.items())
+                ],
+            }
+
+
+registry = MetricsRegistry()
+
+# Start time of each in-flight model call, keyed by (invocation, agent).
+_pending: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+_pending_lock = threading.Lock()
+
+
+def _call_key(callback_context) -> Tuple[str, str]:
+    return (
+        str(getattr(callback_context, "invocation_id", "")),
+        str(getattr(callback_context, "agent_name", "")),
+    )
+
+
+def record_request(callback_context, llm_request) -> None:
+    """Mark the start of a model call (call from before_model_callback)."""
+    del llm_request  # request size is taken from usage_metadata on response
+    with _pending_lock:
+        _pending[_call_key(callback_context)] = time.perf_counter()
+        while len(_pending) > _MAX_PENDING:
+            _pending.popitem(last=False)
+
+
+def record_injected_bytes(callback_context, n_bytes: int) -> None:
+    registry.observe(
+        "agent_injected_memory_bytes",
+        n_bytes,
+        _BYTES_BUCKETS,
+        agent=getattr(callback_context, "agent_name", None),
+    )
+
+
+def record_response(
+    callback_context, llm_response, source: str = "model"
+) -> Optional[float]:
+    """Close a model call (call from after_model_callback).
+
+    ``source`` distinguishes real model calls from responses produced by a
+    before_model_callback (e.g. ``"cache"``), so short-circuited calls do
+    not skew model latency. Token histograms only count ``"model"``
+    responses: a replayed response carries the usage of the call it was
+    taken from, which has already been counted. Returns the call's wall
+    time in seconds, if its start was recorded.
+    """
+    if llm_response is None or llm_response.partial:
+        return None
+    agent = getattr(callback_context, "agent_name", None)
+    with _pending_lock:
+        started: Optional[float] = _pending.pop(_call_key(callback_context), None)
+
+    elapsed = None
+    registry.inc("agent_model_calls_total", agent=agent, source=source)
+    if started is not None:
+        elapsed = time.perf_counter() - started
+        registry.observe(
+            "agent_model_call_seconds",
+            elapsed,
+            _LATENCY_BUCKETS,
+            agent=agent,
+            source=source,
+        )
+
+    usage = getattr(llm_response, "usage_metadata", None)
+    if usage is not None and source == "model":
+        if usage.prompt_token_count is not None:
+            registry.observe(
+                "agent_prompt_tokens",
+                usage.prompt_token_count,
+                _TOKEN_BUCKETS,
+                agent=agent,
+            )
+        if usage.candidates_token_count is not None:
+            registry.observe(
+                "agent_response_tokens",
+                usage.candidates_token_count,
+                _TOKEN_BUCKETS,
+                agent=agent,
+            )
+
+    if llm_response.content and llm_response.content.parts:
+        for part in llm_response.content.parts:
+            if part.function_call:
+                registry.inc(
+                    "agent_tool_calls_total", agent=agent, tool=part.function_call.name
+                )
+    grounding = getattr(llm_response, "grounding_metadata", None)
+    if grounding is not None and grounding.web_search_queries:
+        registry.inc(
+            "agent_tool_calls_total",
+            len(grounding.web_search_queries),
+            agent=agent,
+            tool="google_search",
+        )
+    return elapsed
+
+
+def record_avoided_call(agent: Optional[str], intent: str) -> None:
+    """A model call answered without the model (e.g. a retrieval intent)."""
+    registry.inc("agent_model_calls_avoided_total", agent=agent, intent=intent)
+
+
+def record_route(
+    agent: Optional[str], route: str, model: str, seconds: float, outcome: str
+) -> None:
+    """One routed model call (see model_routing); ``outcome`` is ok/error."""
+    registry.inc("agent_route_calls_total", agent=agent, route=route, outcome=outcome)
+    registry.observe(
+        "agent_route_seconds",
+        seconds,
+        _LATENCY_BUCKETS,
+        agent=agent,
+        route=route,
+        model=model,
+    )
+
+
+def render_prometheus() -> str:
+    return registry.render_prometheus()
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of raw samples; 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def dump_json(path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(registry.snapshot(), f, indent=2)
+
+
+_dump_path = os.getenv("AGENT_METRICS_DUMP")
+if _dump_path:
+    atexit.register(dump_json, _dump_path)
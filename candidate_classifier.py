@@ -0,0 +1,138 @@
+"""Decide whether a user turn already carries full candidate information.
+
+``callback_logging`` asks the default classifier on every user turn of the
+resume agent: if the message looks like fresh candidate info, stored
+memory is NOT injected, so a brand-new resume is generated.
+
+Any callable ``(text) -> bool`` can be installed with
+``set_default_classifier``. The default ``KeywordClassifier`` answers in a
+single pass: a length check first, so long messages are never copied, then
+one search of the lowercased (short) message with a precompiled
+alternation of all keywords. Lowercasing a message of at most
+``long_text_chars`` is cheaper than a case-insensitive regex.
+
+Keyword sets are grouped per locale. The default set is configured with
+environment variables:
+
+- ``RESUME_CLASSIFIER_LOCALES``: comma-separated locales (default ``en``).
+- ``RESUME_CLASSIFIER_EXTRA_KEYWORDS``: comma-separated extra keywords.
+- ``RESUME_CLASSIFIER_LONG_CHARS``: messages longer than this are always
+  treated as candidate info (default 300).
+"""
+
+import os
+import re
+from typing import Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+Classifier = Callable[[str], bool]
+
+# Common resume field markers, per locale.
+LOCALE_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "en": (
+        "experience:",
+        "skills:",
+        "education:",
+        "projects:",
+        "summary:",
+        "work experience",
+        "years of experience",
+        "responsibilities",
+    ),
+    "de": (
+        "berufserfahrung",
+        "kenntnisse:",
+        "ausbildung:",
+        "projekte:",
+        "jahre erfahrung",
+        "aufgaben:",
+    ),
+    "fr": (
+        "expérience:",
+        "expérience professionnelle",
+        "compétences:",
+        "formation:",
+        "projets:",
+        "ans d'expérience",
+    ),
+    "es": (
+        "experiencia:",
+        "experiencia laboral",
+        "habilidades:",
+        "educación:",
+        "proyectos:",
+        "años de experiencia",
+    ),
+}
+
+DEFAULT_LONG_TEXT_CHARS = 300
+
+
+class KeywordClassifier:
+    """Length short-circuit plus one compiled keyword search."""
+
+    def __init__(
+        self,
+        keywords: Iterable[str],
+        long_text_chars: int = DEFAULT_LONG_TEXT_CHARS,
+    ):
+        unique = sorted({k.strip().lower() for k in keywords if k.strip()})
+        self.keywords: Tuple[str, ...] = tuple(unique)
+        self.long_text_chars = long_text_chars
+        self._pattern = re.compile("|".join(map(re.escape, unique))) if unique else None
+
+    @classmethod
+    def for_locales(
+        cls,
+        locales: Sequence[str] = ("en",),
+        extra_keywords: Iterable[str] = (),
+        long_text_chars: int = DEFAULT_LONG_TEXT_CHARS,
+    ) -> "KeywordClassifier":
+        unknown = [loc for loc in locales if loc not in LOCALE_KEYWORDS]
+        if unknown:
+            raise ValueError(
+                f"no keywords for locale(s) {unknown}; "
+                f"known: {sorted(LOCALE_KEYWORDS)}"
+            )
+        keywords = [k for loc in locales for k in LOCALE_KEYWORDS[loc]]
+        return cls(keywords + list(extra_keywords), long_text_chars)
+
+    @classmethod
+    def from_env(cls) -> "KeywordClassifier":
+        """Build a classifier from ``RESUME_CLASSIFIER_*`` environment variables."""
+        locales = os.getenv("RESUME_CLASSIFIER_LOCALES", "en")
+        extra = os.getenv("RESUME_CLASSIFIER_EXTRA_KEYWORDS", "")
+        return cls.for_locales(
+            [loc.strip() for loc in locales.split(",") if loc.strip()],
+            extra_keywords=extra.split(","),
+            long_text_chars=int(
+                os.getenv("RESUME_CLASSIFIER_LONG_CHARS", str(DEFAULT_LONG_TEXT_CHARS))
+            ),
+        )
+
+    def __call__(self, text: str) -> bool:
+        # If it's long and structured, it's likely candidate info
+        if len(text) > self.long_text_chars:
+            return True
+        if self._pattern is None:
+            return False
+        return self._pattern.search(text.lower()) is not None
+
+
+_default_classifier: Optional[Classifier] = None
+
+
+def get_default_classifier() -> Classifier:
+    global _default_classifier
+    if _default_classifier is None:
+        _default_classifier = KeywordClassifier.from_env()
+    return _default_classifier
+
+
+def set_default_classifier(classifier: Optional[Classifier]) -> None:
+    """Install a custom classifier; None restores the env-configured default."""
+    global _default_classifier
+    _default_classifier = classifier
+
+
+def looks_like_candidate_info(text: str) -> bool:
+    return get_default_classifier()(text)
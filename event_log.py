@@ -0,0 +1,251 @@
+"""Structured JSONL event log with size/time rotation.
+
+``JsonlEventHandler`` is a logging handler that writes one JSON object per
+record. Records logged with ``extra={"event": {...}}`` contribute their
+structured fields (agent, session, persistence id, sizes, durations...);
+plain records are written as ``{"message": ...}``. Long string fields are
+truncated to ``max_field_chars`` and their original length is kept in
+``<field>_chars``.
+
+The file is rotated when it exceeds ``max_bytes`` or is older than
+``rotate_seconds``. Rotated segments are named ``<path>.<UTC timestamp>``,
+optionally gzip-compressed, and only the newest ``backup_count`` are kept.
+
+Reader utility (from project root):
+
+    python -m event_log agent.jsonl --agent critic_agent --event model_response
+"""
+
+import argparse
+import glob
+import gzip
+import json
+import logging
+import os
+import shutil
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
+_TRUNCATION_SUFFIX = "...[truncated]"
+
+
+def truncate_fields(event: Dict, max_field_chars: int) -> Dict:
+    """Return a copy of ``event`` with long string values shortened."""
+    if max_field_chars <= 0:
+        return dict(event)
+    out = {}
+    for key, value in event.items():
+        if isinstance(value, str) and len(value) > max_field_chars:
+            out[key] = value[:max_field_chars] + _TRUNCATION_SUFFIX
+            out[f"{key}_chars"] = len(value)
+        else:
+            out[key] = value
+    return out
+
+
+class JsonlEventHandler(logging.Handler):
+    """Logging handler writing rotated, optionally gzipped JSONL segments."""
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 50 * 1024 * 1024,
+        rotate_seconds: Optional[float] = 24 * 3600,
+        backup_count: int = 10,
+        compress: bool = True,
+        max_field_chars: int = 2000,
+    ):
+        super().__init__()
+        self.path = os.path.abspath(path)
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.backup_count = backup_count
+        self.compress = compress
+        self.max_field_chars = max_field_chars
+        self._stream = None
+        self._opened_at = 0.0
+
+    # -----------------------------
+    # Formatting
+    # -----------------------------
+
+    def format(self, record: logging.LogRecord) -> str:
+        event = getattr(record, "event", None)
+        if isinstance(event, dict):
+            payload = dict(event)
+        else:
+            payload = {"message": record.getMessage()}
+        payload = truncate_fields(payload, self.max_field_chars)
+        payload.setdefault("event", "log")
+        payload["ts"] = record.created
+        payload["level"] = record.levelname
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+    # -----------------------------
+    # File handling
+    # -----------------------------
+
+    def _open(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._stream = open(self.path, "a", encoding="utf-8")
+        self._opened_at = self._first_event_time()
+
+    def _first_event_time(self) -> float:
+        """Age of the live segment = timestamp of its first event."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return float(json.loads(f.readline())["ts"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return time.time()
+
+    def _should_rollover(self, line_len: int) -> bool:
+        if self._stream is None:
+            return False
+        size = self._stream.tell()
+        if size and size + line_len > self.max_bytes:
+            return True
+        age = time.time() - self._opened_at
+        return bool(self.rotate_seconds and size and age >= self.rotate_seconds)
+
+    def rotated_segments(self) -> List[str]:
+        """Existing rotated segments, oldest first."""
+        return sorted(glob.glob(glob.escape(self.path) + ".*"))
+
+    def do_rollover(self) -> None:
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        if os.path.exists(self.path):
+            stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+            target = f"{self.path}.{stamp}"
+            os.replace(self.path, target)
+            if self.compress:
+                with open(target, "rb") as src, gzip.open(target + ".gz", "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                os.remove(target)
+        for stale in self.rotated_segments()[: -self.backup_count or None]:
+            os.remove(stale)
+        self._open()
+
+    def _write(self, record: logging.LogRecord) -> None:
+        line = self.format(record) + "\n"
+        if self._stream is None:
+            self._open()
+        if self._should_rollover(len(line)):
+            self.do_rollover()
+        self._stream.write(line)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self._write(record)
+            self._stream.flush()
+        except Exception:
+            self.handleError(record)
+
+    def handle_batch(self, records: List[logging.LogRecord]) -> None:
+        """Write several records with a single flush (used by async logging)."""
+        self.acquire()
+        try:
+            for record in records:
+                if record.levelno < self.level or not self.filter(record):
+                    continue
+                try:
+                    self._write(record)
+                except Exception:
+                    self.handleError(record)
+            if self._stream is not None:
+                self._stream.flush()
+        finally:
+            self.release()
+
+    def close(self) -> None:
+        self.acquire()
+        try:
+            if self._stream is not None:
+                self._stream.close()
+                self._stream = None
+        finally:
+            self.release()
+        super().close()
+
+
+# -----------------------------
+# Reader
+# -----------------------------
+
+
+def iter_events(path: str, include_rotated: bool = True) -> Iterator[Dict]:
+    """Yield events from rotated segments (oldest first) and the live file."""
+    paths = sorted(glob.glob(glob.escape(path) + ".*")) if include_rotated else []
+    paths.append(path)
+    for segment in paths:
+        if not os.path.exists(segment):
+            continue
+        opener = gzip.open if segment.endswith(".gz") else open
+        with opener(segment, "rt", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # partially written line
+
+
+def query(
+    path: str,
+    event: Optional[str] = None,
+    agent: Optional[str] = None,
+    persistence_id: Optional[str] = None,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    limit: Optional[int] = None,
+) -> List[Dict]:
+    """Filter events by type, agent, persistence id and time range."""
+    matches: List[Dict] = []
+    for item in iter_events(path):
+        if event and item.get("event") != event:
+            continue
+        if agent and item.get("agent") != agent:
+            continue
+        if persistence_id and item.get("persistence_id") != persistence_id:
+            continue
+        ts = item.get("ts", 0)
+        if since is not None and ts < since:
+            continue
+        if until is not None and ts >= until:
+            continue
+        matches.append(item)
+    return matches[-limit:] if limit else matches
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Query a JSONL agent event log.")
+    parser.add_argument("path", nargs="?", default="agent.jsonl")
+    parser.add_argument("--event")
+    parser.add_argument("--agent")
+    parser.add_argument("--persistence-id")
+    parser.add_argument("--since", type=float, help="unix timestamp")
+    parser.add_argument("--until", type=float, help="unix timestamp")
+    parser.add_argument("--limit", type=int, help="only the last N matches")
+    args = parser.parse_args(argv)
+
+    for item in query(
+        args.path,
+        event=args.event,
+        agent=args.agent,
+        persistence_id=args.persistence_id,
+        since=args.since,
+        until=args.until,
+        limit=args.limit,
+    ):
+        sys.stdout.write(json.dumps(item, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    main()
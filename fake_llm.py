@@ -0,0 +1,186 @@
+"""Deterministic local stand-in for Gemini, for load tests and benchmarks.
+
+``FakeLlm`` answers every request after a configurable latency with text
+derived from a hash of the request, so the same request always gets the
+same response and token counts. When the request carries the built-in
+``google_search`` tool, the fake also plays the search backend: it waits
+``search_latency`` and attaches grounding metadata (queries and web
+chunks) like a grounded Gemini response.
+
+Its model name starts with ``gemini`` because ADK only lets built-in tools
+such as ``google_search`` run on Gemini models. Like Gemini, it honours
+``stop_sequences``; ``trailing_tokens`` makes it keep writing after the
+end-of-edit mark, as real models sometimes do.
+
+    from fake_llm import FakeLlm, install_fake_llm
+    install_fake_llm(root_agent, FakeLlm(latency=0.2, grounding_chunks=5))
+"""
+
+import asyncio
+import hashlib
+import random
+from typing import AsyncGenerator, Callable, List, Optional
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.genai import types
+
+_CHARS_PER_TOKEN = 4
+
+_WORDS = (
+    "led designed built shipped scalable reliable platform service team "
+    "python data pipeline customers latency reduced improved migrated api "
+    "cloud analytics product delivered mentored automated tested secure"
+).split()
+
+END_OF_EDIT_MARK = "---END-OF-EDIT---"
+
+
+def _request_text(llm_request: LlmRequest) -> str:
+    return "\n".join(
+        part.text
+        for content in llm_request.contents or []
+        for part in content.parts or []
+        if part.text
+    )
+
+
+def _uses_google_search(llm_request: LlmRequest) -> bool:
+    tools = llm_request.config.tools if llm_request.config else None
+    return any(getattr(tool, "google_search", None) for tool in tools or [])
+
+
+class FakeLlm(BaseLlm):
+    """Configurable, deterministic fake model (no network)."""
+
+    model: str = "gemini-fake"
+    latency: float = 0.05
+    jitter: float = 0.0  # extra latency, uniform in [0, jitter), seeded
+    response_tokens: int = 200
+    stream_chunks: int = 8
+    verdict: str = "Inaccurate"
+    grounding_chunks: int = 3
+    search_latency: float = 0.0
+    trailing_tokens: int = 0  # generated after the end-of-edit mark
+    responder: Optional[Callable[[LlmRequest], str]] = None
+
+    def _seed(self, llm_request: LlmRequest) -> int:
+        digest = hashlib.sha256(_request_text(llm_request).encode("utf-8"))
+        return int.from_bytes(digest.digest()[:8], "big")
+
+    def _text(self, llm_request: LlmRequest, rng: random.Random) -> str:
+        if self.responder is not None:
+            return self.responder(llm_request)
+        n_words = max(0, self.response_tokens - 8)
+        words = [rng.choice(_WORDS) for _ in range(n_words)]
+        lines = [" ".join(words[i : i + 12]) for i in range(0, len(words), 12)]
+        # Footer understood by the auditor: a verdict for the critic and the
+        # end-of-edit mark for the reviser.
+        lines.append(f"* Verdict: {self.verdict}")
+        lines.append(f"Overall verdict: {self.verdict}")
+        lines.append(END_OF_EDIT_MARK)
+        trailing = [rng.choice(_WORDS) for _ in range(self.trailing_tokens)]
+        if trailing:
+            lines.append(" ".join(trailing))
+        return "\n".join(lines)
+
+    @staticmethod
+    def _stop(llm_request: LlmRequest, text: str) -> str:
+        """Cut ``text`` at the first stop sequence (excluded, as in Gemini)."""
+        config = llm_request.config
+        for stop in (config.stop_sequences if config else None) or []:
+            idx = text.find(stop)
+            if idx >= 0:
+                text = text[:idx]
+        return text
+
+    def _grounding(self, llm_request: LlmRequest, seed: int):
+        query = _request_text(llm_request)[-80:].strip() or "query"
+        return types.GroundingMetadata(
+            web_search_queries=[query],
+            grounding_chunks=[
+                types.GroundingChunk(
+                    web=types.GroundingChunkWeb(
+                        uri=f"https://example.com/{seed % 1000}/{i}",
+                        title=f"Result {i} for {query[:30]}",
+                    )
+                )
+                for i in range(self.grounding_chunks)
+            ],
+        )
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        seed = self._seed(llm_request)
+        rng = random.Random(seed)
+        grounded = _uses_google_search(llm_request)
+        if grounded and self.search_latency:
+            await asyncio.sleep(self.search_latency)
+
+        text = self._stop(llm_request, self._text(llm_request, rng))
+        delay = self.latency + (rng.random() * self.jitter if self.jitter else 0.0)
+        prompt_chars = len(_request_text(llm_request))
+        usage = types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=max(1, prompt_chars // _CHARS_PER_TOKEN),
+            candidates_token_count=max(1, len(text) // _CHARS_PER_TOKEN),
+        )
+
+        if stream and self.stream_chunks > 1:
+            step = max(1, len(text) // self.stream_chunks)
+            for start in range(0, len(text), step):
+                await asyncio.sleep(delay / self.stream_chunks)
+                yield LlmResponse(
+                    partial=True,
+                    content=types.Content(
+                        role="model",
+                        parts=[types.Part(text=text[start : start + step])],
+                    ),
+                )
+        else:
+            await asyncio.sleep(delay)
+
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            grounding_metadata=(
+                self._grounding(llm_request, seed) if grounded else None
+            ),
+            usage_metadata=usage,
+            finish_reason=types.FinishReason.STOP,
+        )
+
+
+def install_fake_llm(agent: BaseAgent, fake: BaseLlm) -> List[str]:
+    """Point every LLM agent in ``agent``'s tree at ``fake``.
+
+    Follows ``sub_agents`` and agent-valued fields (e.g. the fan-out
+    critic's extractor and verifier templates). Returns the names of the
+    agents that were switched.
+    """
+    switched: List[str] = []
+    seen = set()
+
+    def visit(node: BaseAgent) -> None:
+        if id(node) in seen:
+            return
+        seen.add(id(node))
+        if isinstance(node, LlmAgent):
+            inner = getattr(node.model, "inner", None)
+            if isinstance(inner, BaseLlm):  # a wrapper: keep it, swap its model
+                node.model = node.model.model_copy(
+                    update={"inner": fake, "model": fake.model}
+                )
+            else:
+                node.model = fake
+            switched.append(node.name)
+        for name in type(node).model_fields:
+            if name == "parent_agent":
+                continue
+            value = getattr(node, name, None)
+            children = value if isinstance(value, list) else [value]
+            for child in children:
+                if isinstance(child, BaseAgent):
+                    visit(child)
+
+    visit(agent)
+    return switched
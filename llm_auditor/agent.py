@@ -1,5 +1,7 @@
 """LLM Auditor for verifying & refining LLM-generated answers using the web."""
 
+import os
+
 from google.adk.agents import SequentialAgent
 
 # import sys
@@ -10,6 +12,11 @@ from callback_logging import log_model_response, log_query_to_model
 from .sub_agents.critic import critic_agent
 from .sub_agents.reviser import reviser_agent
 
+# CRITIC_FANOUT=1 verifies claims concurrently instead of in one long
+# model conversation; output format and the reviser are unchanged.
+if os.getenv("CRITIC_FANOUT", "").lower() in ("1", "true", "yes"):
+    from .sub_agents.critic.fanout import critic_fanout_agent as critic_agent
+
 llm_auditor = SequentialAgent(
     name="llm_auditor",
     description=(
@@ -0,0 +1,175 @@
+"""Batch audit runner for the LLM Auditor.
+
+Reads question/answer pairs from a JSONL file, audits them concurrently
+through ``root_agent`` (critic -> reviser) and streams one JSON result
+per line to the output file as each audit finishes.
+
+Usage (from project root):
+
+    python -m llm_auditor.batch input.jsonl -o results.jsonl \\
+        --concurrency 8 --timeout 180
+
+Each input line needs ``question`` and ``answer`` fields; an optional
+``id`` is echoed back (the line number is used otherwise).
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+import uuid
+from typing import Dict, List, Optional, TextIO
+
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from callback_metrics import percentile
+
+from .agent import root_agent
+
+APP_NAME = "llm_auditor_batch"
+
+
+def build_message(question: str, answer: str) -> str:
+    """Format one pair the way the critic/reviser prompts expect it."""
+    return f"Question: {question}\n\nAnswer: {answer}"
+
+
+async def audit_one(runner: Runner, question: str, answer: str) -> Dict[str, str]:
+    """Run a single audit and return the critic and reviser outputs."""
+    user_id = "batch"
+    session = await runner.session_service.create_session(
+        app_name=runner.app_name, user_id=user_id, session_id=str(uuid.uuid4())
+    )
+    message = types.Content(
+        role="user", parts=[types.Part(text=build_message(question, answer))]
+    )
+
+    outputs: Dict[str, str] = {}
+    try:
+        async for event in runner.run_async(
+            user_id=user_id, session_id=session.id, new_message=message
+        ):
+            if event.partial or not event.content or not event.content.parts:
+                continue
+            text = "".join(part.text for part in event.content.parts if part.text)
+            if text:
+                outputs[event.author] = text
+    finally:
+        # One session per audit: drop it so a long batch does not grow.
+        try:
+            await runner.session_service.delete_session(
+                app_name=runner.app_name, user_id=user_id, session_id=session.id
+            )
+        except Exception as e:  # never mask the audit's own outcome
+            logging.warning(f"[batch] could not delete session {session.id}: {e}")
+
+    return {
+        "critique": outputs.get("critic_agent", ""),
+        "revised_answer": outputs.get("reviser_agent", answer),
+    }
+
+
+async def run_batch(
+    items: List[Dict],
+    out: TextIO,
+    concurrency: int = 4,
+    timeout: Optional[float] = None,
+    runner: Optional[Runner] = None,
+) -> Dict[str, float]:
+    """Audit ``items`` with at most ``concurrency`` audits in flight.
+
+    Results are written to ``out`` in completion order. Returns a summary
+    with counts, throughput and latency percentiles.
+    """
+    runner = runner or Runner(
+        app_name=APP_NAME,
+        agent=root_agent,
+        session_service=InMemorySessionService(),
+    )
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    latencies: List[float] = []
+    counts = {"ok": 0, "error": 0, "timeout": 0}
+
+    async def worker(index: int, item: Dict) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            result: Dict = {"id": item.get("id", index)}
+            try:
+                result.update(
+                    await asyncio.wait_for(
+                        audit_one(runner, item["question"], item["answer"]),
+                        timeout=timeout,
+                    )
+                )
+                result["status"] = "ok"
+            except asyncio.TimeoutError:
+                result["status"] = "timeout"
+            except Exception as e:  # keep the batch going
+                result["status"] = "error"
+                result["error"] = f"{type(e).__name__}: {e}"
+            elapsed = time.perf_counter() - started
+
+        result["latency_s"] = round(elapsed, 3)
+        counts[result["status"]] += 1
+        if result["status"] == "ok":
+            latencies.append(elapsed)
+        out.write(json.dumps(result, ensure_ascii=False) + "\n")
+        out.flush()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i, item) for i, item in enumerate(items, 1)))
+    wall = time.perf_counter() - started
+
+    return {
+        "total": len(items),
+        **counts,
+        "wall_s": round(wall, 3),
+        "throughput_per_s": round(len(items) / wall, 3) if wall else 0.0,
+        "p50_s": round(percentile(latencies, 50), 3),
+        "p95_s": round(percentile(latencies, 95), 3),
+    }
+
+
+def load_items(path: str) -> List[Dict]:
+    items = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if "question" not in item or "answer" not in item:
+                raise ValueError(f"{path}:{line_no}: needs 'question' and 'answer'")
+            item.setdefault("id", line_no)
+            items.append(item)
+    return items
+
+
+async def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="JSONL file of question/answer pairs")
+    parser.add_argument(
+        "-o", "--output", default="-", help="output JSONL ('-' = stdout)"
+    )
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--timeout", type=float, default=None, help="seconds per audit")
+    args = parser.parse_args(argv)
+
+    items = load_items(args.input)
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        summary = await run_batch(
+            items, out, concurrency=args.concurrency, timeout=args.timeout
+        )
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(json.dumps(summary), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,138 @@
+"""Micro-benchmark for rendering the critic's grounding references.
+
+Compares the original ``_render_reference`` (reference list appended as a
+new part, then every part re-joined) with ``ReferenceRenderer`` on
+synthetic critic responses carrying hundreds of grounding chunks, a share
+of them repeating a URI. Reports microseconds per response and the size
+of the rendered text.
+
+Usage (from project root):
+
+    python -m llm_auditor.bench_references
+    python -m llm_auditor.bench_references --chunks 100,500,2000 --dup 0.5
+"""
+
+import argparse
+import random
+import timeit
+from typing import List, Optional
+
+from google.genai import types
+
+from .sub_agents.critic.references import ReferenceRenderer
+
+
+def build_response(
+    n_chunks: int, dup: float, text_chars: int = 20000, seed: int = 0
+) -> types.GenerateContentResponse:
+    """A long critic answer in 4 text parts, grounded by ``n_chunks``."""
+    rng = random.Random(seed)
+    # Chunk i repeats URI i % unique, in shuffled order.
+    sentence = "* **Claim:** Python was released in 1991. **Verdict:** Accurate\n"
+    text = sentence * (text_chars // len(sentence))
+    quarter = len(text) // 4
+    parts = [text[i * quarter : (i + 1) * quarter] for i in range(4)]
+    unique = max(1, round(n_chunks * (1 - dup)))
+    docs = [i % unique for i in range(n_chunks)]
+    rng.shuffle(docs)
+    chunks = [
+        types.GroundingChunk(
+            web=types.GroundingChunkWeb(
+                uri=f"https://example.com/doc/{doc}",
+                title="Python (programming language) - history and releases",
+            )
+        )
+        for doc in docs
+    ]
+    supports = [
+        types.GroundingSupport(
+            segment=types.Segment(part_index=i % 4, end_index=(i * 97) % quarter),
+            grounding_chunk_indices=[i % n_chunks],
+        )
+        for i in range(min(n_chunks, 200))
+    ]
+    return types.GenerateContentResponse(
+        candidates=[
+            types.Candidate(
+                content=types.Content(
+                    role="model", parts=[types.Part(text=p) for p in parts]
+                ),
+                grounding_metadata=types.GroundingMetadata(
+                    grounding_chunks=chunks, grounding_supports=supports
+                ),
+            )
+        ]
+    )
+
+
+def legacy_render(texts: List[str], metadata: types.GroundingMetadata) -> str:
+    """The original implementation, kept here as the baseline.
+
+    Works on a list of strings; the original's parts are only read for
+    their text, so this leaves out nothing but the Part wrappers.
+    """
+    parts = list(texts)
+    references = []
+    for chunk in metadata.grounding_chunks or []:
+        title, uri, text = "", "", ""
+        if chunk.retrieved_context:
+            title = chunk.retrieved_context.title
+            uri = chunk.retrieved_context.uri
+            text = chunk.retrieved_context.text
+        elif chunk.web:
+            title = chunk.web.title
+            uri = chunk.web.uri
+        fields = [s for s in (title, text) if s]
+        if uri and fields:
+            fields[0] = f"[{fields[0]}]({uri})"
+        if fields:
+            references.append("* " + ": ".join(fields) + "\n")
+    if references:
+        reference_text = "".join(["\n\nReference:\n\n"] + references)
+        parts.append(reference_text)
+    return "\n".join(parts)
+
+
+def bench(fn, number: int) -> float:
+    """Mean microseconds per call."""
+    return timeit.timeit(fn, number=number) / number * 1e6
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", default="100,300,1000")
+    parser.add_argument("--dup", type=float, default=0.3, help="duplicate share")
+    parser.add_argument("--max-chars", type=int, default=4000)
+    parser.add_argument("-n", "--number", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    renderers = {
+        "list": ReferenceRenderer("list", max_chars=args.max_chars),
+        "list-uncapped": ReferenceRenderer("list", max_chars=0),
+        "footnotes": ReferenceRenderer("footnotes", max_chars=args.max_chars),
+    }
+    print(f"{'chunks':>7}  {'renderer':<14}{'us/resp':>10}{'chars':>9}")
+    for n_chunks in (int(n) for n in args.chunks.split(",")):
+        candidate = build_response(n_chunks, args.dup).candidates[0]
+        texts = [p.text for p in candidate.content.parts]
+        metadata = candidate.grounding_metadata
+
+        def legacy():
+            return legacy_render(texts, metadata)
+
+        if args.dup == 0 and legacy() != renderers["list-uncapped"].render(
+            texts, metadata
+        ):
+            raise SystemExit("renderers disagree on a response without duplicates")
+        rows = [("legacy", legacy)]
+        for name, renderer in renderers.items():
+            rows.append((name, lambda r=renderer: r.render(texts, metadata)))
+        for name, fn in rows:
+            print(
+                f"{n_chunks:>7}  {name:<14}"
+                f"{bench(fn, args.number):>10.1f}{len(fn()):>9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
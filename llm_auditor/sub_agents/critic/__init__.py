@@ -1,3 +1,4 @@
 """Critic agent for identifying and verifying statements using search tools."""
 
 from .agent import critic_agent
+from .verdict import CRITIC_VERDICT_KEY, parse_verdict
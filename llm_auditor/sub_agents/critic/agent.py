@@ -10,9 +10,23 @@ from google.adk.tools import google_search
 from google.genai import types
 
 sys.path.append("..")
-from callback_logging import log_model_response, log_query_to_model
+from callback_logging import (
+    log_model_response,
+    log_query_to_model,
+    record_model_response,
+)
+from model_routing import routed_model
+from prompt_cache import get_prompt_cache
+from response_cache import CACHE_OUTCOME_KEY, cache_from_env
 
 from . import prompt
+from .references import ReferenceRenderer
+from .verdict import CRITIC_VERDICT_KEY, parse_verdict
+
+
+# CRITIC_REFERENCE_STYLE=list|footnotes, CRITIC_REFERENCE_MAX_CHARS; see
+# references.ReferenceRenderer.
+_reference_renderer = ReferenceRenderer.from_env()
 
 
 def _render_reference(
@@ -27,36 +41,89 @@ def _render_reference(
         or not llm_response.grounding_metadata
     ):
         return llm_response
-    references = []
-    for chunk in llm_response.grounding_metadata.grounding_chunks or []:
-        title, uri, text = "", "", ""
-        if chunk.retrieved_context:
-            title = chunk.retrieved_context.title
-            uri = chunk.retrieved_context.uri
-            text = chunk.retrieved_context.text
-        elif chunk.web:
-            title = chunk.web.title
-            uri = chunk.web.uri
-        parts = [s for s in (title, text) if s]
-        if uri and parts:
-            parts[0] = f"[{parts[0]}]({uri})"
-        if parts:
-            references.append("* " + ": ".join(parts) + "\n")
-    if references:
-        reference_text = "".join(["\n\nReference:\n\n"] + references)
-        llm_response.content.parts.append(types.Part(text=reference_text))
-    if all(part.text is not None for part in llm_response.content.parts):
-        all_text = "\n".join(part.text for part in llm_response.content.parts)
-        llm_response.content.parts[0].text = all_text
-        del llm_response.content.parts[1:]
+    parts = llm_response.content.parts
+    if all(part.text is not None for part in parts):
+        # One text part holding the response and its references.
+        parts[0].text = _reference_renderer.render(
+            [part.text for part in parts], llm_response.grounding_metadata
+        )
+        del parts[1:]
+    else:
+        reference_text = _reference_renderer.reference_block(
+            llm_response.grounding_metadata
+        )
+        if reference_text:
+            parts.append(types.Part(text=reference_text))
+    return llm_response
+
+
+# Opt-in: with CRITIC_CACHE=memory|sqlite, identical audits (retries,
+# duplicate submissions, regression batches) are answered from this cache
+# instead of re-running the grounded model call, and concurrent identical
+# audits share one call. A cached verdict is replayed for CRITIC_CACHE_TTL
+# seconds (default 3600) even if search results have changed since. Off
+# by default; see response_cache.cache_from_env.
+_critic_cache = cache_from_env("CRITIC_CACHE", default_path="critic_cache.db")
+
+
+def _record_verdict(
+    callback_context: CallbackContext,
+    llm_response: LlmResponse,
+) -> None:
+    """Stores the parsed verdict in session state for the reviser."""
+    if llm_response.partial or not llm_response.content:
+        return
+    text = "\n".join(
+        part.text for part in llm_response.content.parts or [] if part.text
+    )
+    verdict = parse_verdict(text)
+    verdict["invocation_id"] = callback_context.invocation_id
+    callback_context.state[CRITIC_VERDICT_KEY] = verdict
+
+
+def _render_and_cache(
+    callback_context: CallbackContext,
+    llm_response: LlmResponse,
+) -> LlmResponse:
+    """Renders references, records the verdict and caches the response."""
+    llm_response = _render_reference(callback_context, llm_response)
+    _record_verdict(callback_context, llm_response)
+    if _critic_cache is not None:
+        _critic_cache.store(callback_context, llm_response)
+    record_model_response(callback_context, llm_response)
     return llm_response
 
 
+async def _lookup_cached(callback_context: CallbackContext, llm_request):
+    """Serves the critic from cache, or from an identical in-flight call;
+    after_model_callback is skipped then, so the verdict is recorded here."""
+    llm_response = await _critic_cache.lookup_async(callback_context, llm_request)
+    if llm_response is not None:
+        _record_verdict(callback_context, llm_response)
+        outcome = llm_response.custom_metadata[CACHE_OUTCOME_KEY]
+        record_model_response(
+            callback_context,
+            llm_response,
+            source="cache" if outcome == "hit" else outcome,
+        )
+    return llm_response
+
+
+_before_model_callbacks = [log_query_to_model]
+if _critic_cache is not None:
+    _before_model_callbacks.append(_lookup_cached)
+# Last: the response cache key includes the system instruction this removes.
+_prompt_cache = get_prompt_cache()
+if _prompt_cache is not None:
+    _before_model_callbacks.append(_prompt_cache.apply)
+
+
 critic_agent = Agent(
-    model=os.getenv("MODEL"),
+    model=routed_model("critic_agent", os.getenv("MODEL")),
     name="critic_agent",
     instruction=prompt.CRITIC_PROMPT,
     tools=[google_search],
-    before_model_callback=log_query_to_model,
-    after_model_callback=_render_reference,
+    before_model_callback=_before_model_callbacks,
+    after_model_callback=_render_and_cache,
+    on_model_error_callback=_critic_cache.fail if _critic_cache else None,
 )
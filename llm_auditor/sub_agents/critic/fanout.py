@@ -0,0 +1,277 @@
+"""Fan-out critic: extract claims once, then verify them concurrently.
+
+The default ``critic_agent`` verifies every claim serially inside a single
+model conversation. ``FanoutCriticAgent`` instead:
+
+1. asks a tool-less extractor agent for the list of claims,
+2. verifies each claim with its own grounded verifier agent, keeping up
+   to ``max_concurrency`` verifiers running: a verifier that finishes
+   frees its slot for the next claim at once, so the wall time tracks
+   the slowest claim rather than the sum of per-batch maxima, and
+3. merges the per-claim results into the same Markdown findings format
+   the serial critic produces, so the reviser is unaffected.
+
+Each claim's verifier is a clone of ``claim_verifier`` (with the claim in
+its instruction), created per invocation and run on its own branch as
+``ParallelAgent`` does. The clones are not added to ``sub_agents``, since
+the tree is shared by concurrent invocations. The template is, so the
+clones inherit it as a child of this agent for tree lookups and tracing.
+
+Enable it for ``llm_auditor`` with ``CRITIC_FANOUT=1``.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+from typing import AsyncGenerator, List
+
+from google.adk import Agent
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.events import Event, EventActions
+from google.adk.tools import google_search
+from google.genai import types
+
+from callback_logging import (
+    log_model_response,
+    log_query_to_model,
+    record_model_response,
+)
+from model_routing import routed_model
+
+from . import prompt
+from .agent import _render_reference
+from .verdict import CRITIC_VERDICT_KEY, parse_verdict
+
+# Invocation-scoped ("temp:") keys, so a later audit in the same session
+# never merges this one's claims or results.
+_CLAIMS_KEY = "temp:critic_claims"
+_RESULT_KEY_PREFIX = "temp:critic_claim_result_"
+
+# Worst verdict wins when deriving the overall verdict from the claims.
+_VERDICT_SEVERITY = [
+    "Accurate",
+    "Not Applicable",
+    "Unsupported",
+    "Disputed",
+    "Inaccurate",
+]
+
+_VERDICT_LINE = re.compile(r"verdict\W*:\W*(.+)", re.IGNORECASE)
+_JUSTIFICATION_LINE = re.compile(r"justification\W*:\W*(.+)", re.IGNORECASE | re.DOTALL)
+_BULLET = re.compile(r"^\s*(?:[-*]|\d+[.)])\s+(.*)$")
+
+
+def parse_claims(text: str) -> List[str]:
+    """Reads the extractor output: a JSON array, or a bulleted list."""
+    text = (text or "").strip()
+    match = re.search(r"\[.*\]", text, re.DOTALL)
+    if match:
+        try:
+            claims = json.loads(match.group(0))
+            return [str(c).strip() for c in claims if str(c).strip()]
+        except ValueError:
+            pass
+    return [m.group(1).strip() for m in map(_BULLET.match, text.splitlines()) if m]
+
+
+def _render_verification(callback_context, llm_response):
+    llm_response = _render_reference(callback_context, llm_response)
+    record_model_response(callback_context, llm_response)
+    return llm_response
+
+
+def _verifier_instruction(claim: str):
+    # An InstructionProvider, so braces in the claim are not templated.
+    def provider(ctx: ReadonlyContext) -> str:
+        del ctx
+        return prompt.CLAIM_VERIFIER_PROMPT + claim + "\n"
+
+    return provider
+
+
+def _canonical_verdict(raw: str) -> str:
+    lowered = raw.strip().strip("*").lower()
+    for verdict in _VERDICT_SEVERITY:
+        if lowered.startswith(verdict.lower()):
+            return verdict
+    return "Unsupported"
+
+
+def merge_findings(claims: List[str], results: List[str]) -> str:
+    """Builds the serial critic's Markdown findings from per-claim results."""
+    lines = []
+    verdicts = []
+    for idx, (claim, result) in enumerate(zip(claims, results), 1):
+        verdict_match = _VERDICT_LINE.search(result or "")
+        verdict = (
+            _canonical_verdict(verdict_match.group(1))
+            if verdict_match
+            else "Unsupported"
+        )
+        justification_match = _JUSTIFICATION_LINE.search(result or "")
+        justification = (
+            justification_match.group(1).strip()
+            if justification_match
+            else (result or "No evidence was returned for this claim.").strip()
+        )
+        verdicts.append(verdict)
+        lines.append(f"  * Claim {idx}: {claim}")
+        lines.append(f"      * Verdict: {verdict}")
+        lines.append(f"      * Justification: {justification}")
+
+    if not verdicts:
+        # Nothing was verified: never let the answer through as accurate.
+        lines.append("  * Overall verdict: Unsupported")
+        lines.append(
+            "  * Overall justification: No claims could be extracted from the "
+            "answer, so none of it was verified."
+        )
+        return "\n".join(lines)
+
+    overall = max(verdicts, key=_VERDICT_SEVERITY.index)
+    if overall == "Not Applicable":
+        overall = "Accurate"
+    flagged = sum(v not in ("Accurate", "Not Applicable") for v in verdicts)
+    lines.append(f"  * Overall verdict: {overall}")
+    lines.append(
+        "  * Overall justification: "
+        + (
+            f"{flagged} of {len(verdicts)} claims need attention."
+            if flagged
+            else "Every claim was verified as accurate or needs no verification."
+        )
+    )
+    return "\n".join(lines)
+
+
+class FanoutCriticAgent(BaseAgent):
+    """Critic that verifies extracted claims in parallel."""
+
+    claim_extractor: Agent
+    claim_verifier: Agent
+    max_concurrency: int = 4
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        async for event in self.claim_extractor.run_async(ctx):
+            yield event
+
+        extracted = ctx.session.state.get(_CLAIMS_KEY, "")
+        claims = parse_claims(extracted)
+        if not claims:
+            logging.warning(
+                f"[{self.name}]: no claims parsed from the extractor output "
+                f"({len(extracted or '')} chars); the answer is left unverified"
+            )
+        verifiers = [
+            self.claim_verifier.clone(
+                update={
+                    "name": f"claim_verifier_{i}",
+                    "instruction": _verifier_instruction(claim),
+                    "output_key": f"{_RESULT_KEY_PREFIX}{i}",
+                }
+            )
+            for i, claim in enumerate(claims)
+        ]
+        async for event in self._verify(ctx, verifiers):
+            yield event
+        results = [
+            ctx.session.state.get(f"{_RESULT_KEY_PREFIX}{i}", "")
+            for i in range(len(claims))
+        ]
+
+        findings = merge_findings(claims, results)
+        verdict = parse_verdict(findings)
+        verdict["invocation_id"] = ctx.invocation_id
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=findings)]),
+            actions=EventActions(state_delta={CRITIC_VERDICT_KEY: verdict}),
+        )
+
+
+    async def _verify(
+        self, ctx: InvocationContext, verifiers: List[Agent]
+    ) -> AsyncGenerator[Event, None]:
+        """Runs ``verifiers`` with at most ``max_concurrency`` in flight.
+
+        Events are handed over one at a time, as in ``ParallelAgent``: a
+        verifier waits until the runner has processed its event (and
+        applied its state delta) before producing the next one.
+        """
+        slots = asyncio.Semaphore(max(1, self.max_concurrency))
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        async def run(verifier: Agent) -> None:
+            error = None
+            try:
+                async with slots:
+                    branch = f"{self.name}.{verifier.name}"
+                    if ctx.branch:
+                        branch = f"{ctx.branch}.{branch}"
+                    branch_ctx = ctx.model_copy(update={"branch": branch})
+                    events = verifier.run_async(branch_ctx)
+                    try:
+                        async for event in events:
+                            resume = asyncio.Event()
+                            await queue.put((event, resume))
+                            await resume.wait()
+                    finally:
+                        await events.aclose()
+            except Exception as e:
+                error = e
+            finally:
+                await queue.put((done, error))
+
+        tasks = [asyncio.create_task(run(verifier)) for verifier in verifiers]
+        try:
+            finished = 0
+            while finished < len(tasks):
+                event, payload = await queue.get()
+                if event is done:
+                    finished += 1
+                    if payload is not None:
+                        raise payload
+                    continue
+                yield event
+                payload.set()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+claim_extractor_agent = Agent(
+    model=routed_model("claim_extractor_agent", os.getenv("MODEL")),
+    name="claim_extractor_agent",
+    instruction=prompt.CLAIM_EXTRACTOR_PROMPT,
+    before_model_callback=log_query_to_model,
+    after_model_callback=log_model_response,
+    output_key=_CLAIMS_KEY,
+)
+
+claim_verifier_agent = Agent(
+    model=routed_model("claim_verifier_agent", os.getenv("MODEL")),
+    name="claim_verifier_agent",
+    instruction=prompt.CLAIM_VERIFIER_PROMPT,
+    tools=[google_search],
+    before_model_callback=log_query_to_model,
+    after_model_callback=_render_verification,
+)
+
+critic_fanout_agent = FanoutCriticAgent(
+    name="critic_agent",
+    description="Verifies each claim of an answer concurrently using search.",
+    claim_extractor=claim_extractor_agent,
+    claim_verifier=claim_verifier_agent,
+    max_concurrency=int(os.getenv("CRITIC_FANOUT_CONCURRENCY", "4")),
+    sub_agents=[claim_extractor_agent, claim_verifier_agent],
+)
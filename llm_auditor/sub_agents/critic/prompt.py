@@ -47,5 +47,45 @@ There are various actions you can take to help you with the verification:
 
 The last block of your output should be a Markdown-formatted list, summarizing your verification result. For each CLAIM you verified, you should output the claim (as a standalone statement), the corresponding part in the answer text, the verdict, and the justification.
 
+In that list, give each CLAIM's verdict on its own line as `Verdict: <verdict>`, using exactly one of Accurate, Inaccurate, Disputed, Unsupported or Not Applicable. Do not use a table.
+
+End your output with exactly one line of the form:
+
+Overall verdict: <verdict>
+
 Here is the question and answer you are going to double check:
 """
+
+CLAIM_EXTRACTOR_PROMPT = """
+You are a professional investigative journalist preparing a fact-check.
+You are given a question-answer pair. Carefully read the answer text and extract every distinct CLAIM made within it. A CLAIM can be a statement of fact about the world or a logical argument presented to support a point.
+
+Rewrite each CLAIM as a standalone statement that can be verified without reading the rest of the answer.
+
+# Output format
+
+Output only a JSON array of strings, one string per CLAIM, and nothing else. For example:
+
+["George Washington was the first president of the United States.", "The sun is very hot."]
+
+Here is the question and answer you are going to analyze:
+"""
+
+CLAIM_VERIFIER_PROMPT = """
+You are a professional investigative journalist, excelling at critical thinking and verifying information before printed to a highly-trustworthy publication.
+You are given a question-answer pair and ONE claim extracted from the answer. Your task is to determine the reliability of that single claim.
+
+* Consider the Context: Take into account the original question and the rest of the answer.
+* Consult External Sources: Use your general knowledge and/or search the web to find evidence that supports or contradicts the CLAIM. Aim to consult reliable and authoritative sources.
+* Determine the VERDICT: assign exactly one of Accurate, Inaccurate, Disputed, Unsupported or Not Applicable, with the same meaning as in a full fact-check.
+* Provide a JUSTIFICATION: clearly explain the reasoning behind your assessment and reference the sources you consulted.
+
+# Output format
+
+Output exactly these two lines and nothing else:
+
+Verdict: <verdict>
+Justification: <justification>
+
+The claim you must verify is:
+"""
@@ -0,0 +1,198 @@
+"""Grounding references rendered into the critic's response text.
+
+``ReferenceRenderer.render`` builds the final response text in one pass:
+the model's text parts and the reference block are collected as pieces
+and joined once. Grounding chunks are deduplicated by URI (or by title and
+text when a chunk has no URI), and the reference block is capped at
+``max_chars``; references that do not fit are summarised in one line.
+
+Styles:
+
+- ``list`` (default): a ``Reference:`` section with one Markdown link per
+  source, as the critic has always produced.
+- ``footnotes``: compact numbered citations. ``[n]`` markers are inserted
+  after each grounded segment (from ``grounding_supports``) and the
+  sources are listed once, by number, at the end.
+
+Configure with ``CRITIC_REFERENCE_STYLE`` and
+``CRITIC_REFERENCE_MAX_CHARS`` (0 = no cap).
+"""
+
+import os
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from google.genai import types
+
+REFERENCE_STYLES = ("list", "footnotes")
+
+
+class Reference(NamedTuple):
+    title: str
+    uri: str
+    text: str
+
+
+def dedupe_references(
+    chunks: Sequence[types.GroundingChunk],
+) -> Tuple[List[Reference], List[Optional[int]]]:
+    """Return the unique references, and each chunk's index into them.
+
+    The first usable chunk seen for a URI wins; chunks without a title or
+    text map to None.
+    """
+    references: List[Reference] = []
+    by_key: Dict[object, int] = {}
+    chunk_to_ref: List[Optional[int]] = []
+    for chunk in chunks:
+        # Branch on the type (getattr on a missing pydantic field is slow)
+        # and read each field once: attribute access dominates here.
+        source = chunk.retrieved_context
+        if source is not None:
+            text = source.text or ""
+        else:
+            source, text = chunk.web, ""
+            if source is None:
+                chunk_to_ref.append(None)
+                continue
+        uri, title = source.uri or "", source.title or ""
+        key = uri or (title, text)
+        index = by_key.get(key)
+        if index is None:
+            if not title and not text:
+                chunk_to_ref.append(None)  # a bare URI: nothing to show
+                continue
+            index = by_key[key] = len(references)
+            references.append(Reference(title, uri, text))
+        chunk_to_ref.append(index)
+    return references, chunk_to_ref
+
+
+class ReferenceRenderer:
+    """Renders a response's text parts plus its grounding references."""
+
+    def __init__(self, style: str = "list", max_chars: int = 4000):
+        if style not in REFERENCE_STYLES:
+            raise ValueError(
+                f"style must be one of {REFERENCE_STYLES}, got {style!r}"
+            )
+        self.style = style
+        self.max_chars = max_chars
+
+    @classmethod
+    def from_env(cls, prefix: str = "CRITIC_REFERENCE") -> "ReferenceRenderer":
+        return cls(
+            style=os.getenv(f"{prefix}_STYLE", "list").lower(),
+            max_chars=int(os.getenv(f"{prefix}_MAX_CHARS", "4000")),
+        )
+
+    @staticmethod
+    def _list_line(number: int, reference: Reference) -> str:
+        title, uri, text = reference
+        label = title or text
+        if uri:
+            label = f"[{label}]({uri})"
+        return f"* {label}: {text}\n" if title and text else f"* {label}\n"
+
+    @staticmethod
+    def _footnote_line(number: int, reference: Reference) -> str:
+        title, uri, text = reference
+        label = title or text[:80]
+        return f"[{number}] {label} <{uri}>\n" if uri else f"[{number}] {label}\n"
+
+    def _block(self, references: Sequence[Reference]) -> Tuple[List[str], int]:
+        """Pieces of the reference block and how many references it lists.
+
+        Stops before the line that would take the block past ``max_chars``.
+        """
+        if not references:
+            return [], 0
+        if self.style == "list":
+            heading, line_for = "Reference:", self._list_line
+        else:
+            heading, line_for = "Sources:", self._footnote_line
+        pieces = [f"\n\n{heading}\n\n"]
+        size, limit = 0, self.max_chars or float("inf")
+        for number, reference in enumerate(references, start=1):
+            line = line_for(number, reference)
+            size += len(line)
+            if size > limit:
+                pieces.append(f"... and {len(references) - number + 1} more\n")
+                return pieces, number - 1
+            pieces.append(line)
+        return pieces, len(references)
+
+    def _with_markers(
+        self,
+        texts: List[str],
+        supports: Sequence[types.GroundingSupport],
+        chunk_to_ref: List[Optional[int]],
+        listed: int,
+    ) -> List[str]:
+        """Insert ``[n]`` after each supported segment, one pass per part."""
+        # part index -> {byte end offset -> footnote numbers}
+        inserts: Dict[int, Dict[int, List[int]]] = {}
+        for support in supports:
+            segment = support.segment
+            if segment is None or segment.end_index is None:
+                continue
+            at = inserts.setdefault(segment.part_index or 0, {}).setdefault(
+                segment.end_index, []
+            )
+            for chunk_index in support.grounding_chunk_indices or []:
+                if 0 <= chunk_index < len(chunk_to_ref):
+                    ref = chunk_to_ref[chunk_index]
+                    if ref is not None and ref < listed and ref + 1 not in at:
+                        at.append(ref + 1)
+
+        marked = []
+        for part_index, text in enumerate(texts):
+            offsets = inserts.get(part_index)
+            if not offsets:
+                marked.append(text)
+                continue
+            # Segment offsets are UTF-8 byte offsets into the part.
+            data = text.encode("utf-8")
+            pieces: List[bytes] = []
+            start = 0
+            for end in sorted(offsets):
+                numbers = offsets[end]
+                if not numbers or end > len(data):
+                    continue
+                pieces.append(data[start:end])
+                pieces.append("".join(f"[{n}]" for n in sorted(numbers)).encode())
+                start = end
+            pieces.append(data[start:])
+            marked.append(b"".join(pieces).decode("utf-8", errors="replace"))
+        return marked
+
+    def render(
+        self,
+        texts: List[str],
+        grounding_metadata: Optional[types.GroundingMetadata],
+    ) -> str:
+        """Return ``texts`` joined by newlines, followed by the references."""
+        metadata = grounding_metadata or types.GroundingMetadata()
+        references, chunk_to_ref = dedupe_references(metadata.grounding_chunks or [])
+        block, listed = self._block(references)
+        if self.style == "footnotes" and metadata.grounding_supports and listed:
+            texts = self._with_markers(
+                texts, metadata.grounding_supports, chunk_to_ref, listed
+            )
+        # Same layout as joining the text parts and a separate reference
+        # part with newlines, but the text is only copied once.
+        pieces: List[str] = []
+        for text in texts:
+            pieces += (text, "\n")
+        if block:
+            pieces += block
+        elif pieces:
+            pieces.pop()
+        return "".join(pieces)
+
+    def reference_block(
+        self, grounding_metadata: Optional[types.GroundingMetadata]
+    ) -> str:
+        """The reference block alone ('' when there is nothing to cite)."""
+        chunks = grounding_metadata.grounding_chunks if grounding_metadata else None
+        block, _ = self._block(dedupe_references(chunks or [])[0])
+        return "".join(block)
@@ -0,0 +1,41 @@
+"""Structured verdicts parsed from the critic's Markdown findings."""
+
+import re
+from typing import Dict, List, Optional
+
+# Session-state key the critic writes its parsed verdict to.
+CRITIC_VERDICT_KEY = "critic_verdict"
+
+# Matches "Verdict: Accurate", "* **Overall verdict:** Inaccurate", etc.
+_VERDICT_LINE = re.compile(
+    r"^[\s*\->#]*(overall\s+)?verdict[\s*]*:[\s*]*([a-z][a-z ]*[a-z])",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# Claim verdicts that need no edit from the reviser.
+_CLEAN_VERDICTS = {"accurate", "not applicable"}
+
+
+def parse_verdict(text: str) -> Dict:
+    """Extract per-claim and overall verdicts from critic output.
+
+    ``all_accurate`` is only True when an overall verdict of "Accurate"
+    was found, at least one claim verdict was parsed and none of them
+    requires editing. Output that could not be parsed (e.g. a table) is
+    never treated as clean.
+    """
+    claims: List[str] = []
+    overall: Optional[str] = None
+    for match in _VERDICT_LINE.finditer(text or ""):
+        verdict = match.group(2).strip().lower()
+        if match.group(1):
+            overall = verdict
+        else:
+            claims.append(verdict)
+    return {
+        "overall": overall,
+        "claims": claims,
+        "all_accurate": overall == "accurate"
+        and bool(claims)
+        and all(v in _CLEAN_VERDICTS for v in claims),
+    }
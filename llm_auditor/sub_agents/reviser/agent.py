@@ -1,38 +1,209 @@
 """Reviser agent for correcting inaccuracies based on verified findings."""
 
 import os
+import re
 import sys
+from typing import Optional
 
 from google.adk import Agent
 from google.adk.agents.callback_context import CallbackContext
-from google.adk.models import LlmResponse
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
 
 sys.path.append("..")
-from callback_logging import log_model_response, log_query_to_model
+from callback_logging import (
+    log_model_response,
+    log_query_to_model,
+    record_model_response,
+)
+
+import callback_metrics
+from model_routing import routed_model
+from prompt_cache import get_prompt_cache
 
+from ..critic.verdict import CRITIC_VERDICT_KEY
 from . import prompt
+from .end_of_edit import (
+    END_OF_EDIT_KEY,
+    END_OF_EDIT_MARK,
+    TOKENS_AFTER_MARK_KEY,
+    EndOfEditLlm,
+    finish_response,
+    supports_stop_sequences,
+)
+
+# "Answer: ..." in the user's question-answer pair, up to any findings.
+_ANSWER_RE = re.compile(
+    r"^\s*answer\s*:\s*(.*?)(?=^\s*findings\s*:|\Z)",
+    re.IGNORECASE | re.MULTILINE | re.DOTALL,
+)
+
+_skipped_revisions = 0
+_end_of_edit_stats = {
+    "stop_sequence": 0,
+    "stream_cut": 0,
+    "trimmed": 0,
+    "max_tokens": 0,
+    "no_mark": 0,
+    "tokens_after_mark": 0,
+}
+
+
+def get_reviser_stats() -> dict:
+    return {"skipped_revisions": _skipped_revisions, **_end_of_edit_stats}
+
+
+def _enabled(name: str) -> bool:
+    return os.getenv(name, "1").lower() not in ("0", "false", "no", "off")
+
+
+def _reviser_model():
+    """MODEL (or the routed model, see model_routing) wrapped so streamed
+    output is cut at the end-of-edit mark.
+
+    REVISER_STREAM_CUT=0 disables the wrapper; models the registry cannot
+    resolve are used as configured.
+    """
+    model = routed_model("reviser_agent", os.getenv("MODEL"))
+    if not model or not _enabled("REVISER_STREAM_CUT"):
+        return model
+    try:
+        return EndOfEditLlm.wrap(model)
+    except ValueError:
+        return model
+
+
+def _uses_stop_sequence(model) -> bool:
+    """True if generation should end at the mark server-side.
+
+    ``model`` is the reviser's resolved model; with routing, every tier it
+    may use has to support stop sequences.
+    """
+    return _enabled("REVISER_STOP_SEQUENCE") and supports_stop_sequences(model)
+
 
-_END_OF_EDIT_MARK = "---END-OF-EDIT---"
+_model = _reviser_model()
+_stop_sequence = _uses_stop_sequence(_model)
+_stop_config: Optional[types.GenerateContentConfig] = None
+
+
+def _generation_config() -> Optional[types.GenerateContentConfig]:
+    """What ``_add_stop_sequence`` adds to each request, or None.
+
+    Built on first use: the first ``GenerateContentConfig`` in a process
+    builds its pydantic schema, which would otherwise dominate importing
+    this package.
+    """
+    global _stop_config
+    if _stop_sequence and _stop_config is None:
+        _stop_config = types.GenerateContentConfig(stop_sequences=[END_OF_EDIT_MARK])
+    return _stop_config
+
+
+def _add_stop_sequence(
+    callback_context: CallbackContext,
+    llm_request: LlmRequest,
+) -> None:
+    """before_model_callback: end generation at the mark where supported."""
+    del callback_context
+    if not _stop_sequence:
+        return None
+    stop_sequences = llm_request.config.stop_sequences or []
+    if END_OF_EDIT_MARK not in stop_sequences:
+        llm_request.config.stop_sequences = [*stop_sequences, END_OF_EDIT_MARK]
+    return None
+
+
+def _original_answer(callback_context: CallbackContext) -> Optional[str]:
+    """Finds the answer text in this invocation's user message, if labelled.
+
+    Earlier turns of the session (previous audits) are in the request too,
+    so the request contents are not searched.
+    """
+    content = callback_context.user_content
+    if content is None or not content.parts:
+        return None
+    text = "\n".join(part.text for part in content.parts if part.text)
+    match = _ANSWER_RE.search(text)
+    if match and match.group(1).strip():
+        return match.group(1).strip()
+    return None
+
+
+def _skip_if_accurate(
+    callback_context: CallbackContext,
+    llm_request: LlmRequest,
+) -> Optional[LlmResponse]:
+    """Returns the original answer unchanged when the critic found no issues.
+
+    Only applies when the critic of *this* invocation judged every claim
+    accurate (or not applicable) and the answer can be located in the
+    user's message; otherwise the reviser runs as usual.
+    """
+    global _skipped_revisions
+    verdict = callback_context.state.get(CRITIC_VERDICT_KEY)
+    if (
+        not isinstance(verdict, dict)
+        or not verdict.get("all_accurate")
+        or verdict.get("invocation_id") != callback_context.invocation_id
+    ):
+        return None
+    del llm_request
+    answer = _original_answer(callback_context)
+    if answer is None:
+        return None
+    _skipped_revisions += 1
+    llm_response = LlmResponse(
+        content=types.Content(role="model", parts=[types.Part(text=answer)])
+    )
+    record_model_response(callback_context, llm_response, source="skipped")
+    return llm_response
 
 
 def _remove_end_of_edit_mark(
     callback_context: CallbackContext,
     llm_response: LlmResponse,
 ) -> LlmResponse:
-    del callback_context  # unused
-    if not llm_response.content or not llm_response.content.parts:
+    """Trims the answer at the end-of-edit mark and reports how it ended.
+
+    Streamed chunks were already cut by ``EndOfEditLlm``; this also covers
+    complete responses from an unwrapped model.
+    """
+    if llm_response.partial:
+        record_model_response(callback_context, llm_response)
         return llm_response
-    for idx, part in enumerate(llm_response.content.parts):
-        if _END_OF_EDIT_MARK in part.text:
-            del llm_response.content.parts[idx + 1 :]
-            part.text = part.text.split(_END_OF_EDIT_MARK, 1)[0]
+    finish_response(llm_response, _generation_config())
+    metadata = llm_response.custom_metadata or {}
+    outcome = metadata[END_OF_EDIT_KEY]
+    tokens_after_mark = metadata.get(TOKENS_AFTER_MARK_KEY, 0)
+    _end_of_edit_stats[outcome] += 1
+    _end_of_edit_stats["tokens_after_mark"] += tokens_after_mark
+    agent_name = getattr(callback_context, "agent_name", None)
+    callback_metrics.registry.inc(
+        "agent_end_of_edit_total", agent=agent_name, outcome=outcome
+    )
+    callback_metrics.registry.inc(
+        "agent_tokens_after_mark_total", tokens_after_mark, agent=agent_name
+    )
+    record_model_response(
+        callback_context,
+        llm_response,
+        end_of_edit=outcome,
+        tokens_after_mark=tokens_after_mark,
+    )
     return llm_response
 
 
+_before_model_callbacks = [log_query_to_model, _skip_if_accurate, _add_stop_sequence]
+_prompt_cache = get_prompt_cache()  # PROMPT_CACHE=gemini|local, off by default
+if _prompt_cache is not None:
+    _before_model_callbacks.append(_prompt_cache.apply)
+
+
 reviser_agent = Agent(
-    model=os.getenv("MODEL"),
+    model=_model,
     name="reviser_agent",
     instruction=prompt.REVISER_PROMPT,
-    before_model_callback=log_query_to_model,
+    before_model_callback=_before_model_callbacks,
     after_model_callback=_remove_end_of_edit_mark,
 )
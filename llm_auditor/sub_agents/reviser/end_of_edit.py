@@ -0,0 +1,222 @@
+"""Stop the reviser at its end-of-edit mark instead of after it.
+
+The reviser prompt ends every answer with ``---END-OF-EDIT---``; anything
+the model writes after it is discarded, but still generated, billed and
+waited for. Two mechanisms avoid that:
+
+- **Stop sequence**: where the model supports it (Gemini), the mark is
+  passed as a ``stop_sequences`` entry and generation ends server-side.
+- **Stream cut**: ``EndOfEditLlm`` wraps the reviser's model and scans
+  streamed chunks for the mark, including a mark split across chunk
+  boundaries. As soon as it appears the stream is closed (which cancels
+  the generation) and a final response with the text before the mark is
+  returned.
+
+Complete (non-streamed) responses that still contain the mark are trimmed
+as before. Each response is annotated, in ``custom_metadata``, with how it
+ended (``END_OF_EDIT_KEY``) and how many tokens after the mark were still
+received and discarded (``TOKENS_AFTER_MARK_KEY``). That is the waste left
+over, not a saving: it is 0 when the stop sequence ended generation at
+the mark, and for a stream cut it counts what arrived before the cancel.
+"""
+
+from typing import AsyncGenerator, List, Optional, Tuple, Union
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse, LLMRegistry
+from google.genai import types
+
+from model_routing import RoutedLlm
+
+END_OF_EDIT_MARK = "---END-OF-EDIT---"
+
+# custom_metadata keys set on the reviser's final response.
+# stop_sequence | stream_cut | trimmed | max_tokens | no_mark
+END_OF_EDIT_KEY = "end_of_edit"
+TOKENS_AFTER_MARK_KEY = "tokens_after_mark"
+
+_CHARS_PER_TOKEN = 4
+
+
+def supports_stop_sequences(model: Union[str, BaseLlm, None]) -> bool:
+    """True if every model ``model`` may call honours ``stop_sequences``.
+
+    Wrappers are resolved to what they call: ``EndOfEditLlm`` to its inner
+    model, ``RoutedLlm`` to all the models it can route to. Only Gemini
+    models are known to support stop sequences.
+    """
+    if isinstance(model, EndOfEditLlm):
+        model = model.inner
+    if isinstance(model, RoutedLlm):
+        names = model.models()
+    else:
+        names = [model.model if isinstance(model, BaseLlm) else model]
+    return all(name and "gemini" in name.lower() for name in names)
+
+
+def _tokens(chars: int, response: Optional[LlmResponse], total_chars: int) -> int:
+    """Tokens for ``chars`` of output, scaled by the usage when known."""
+    usage = response.usage_metadata if response else None
+    if usage and usage.candidates_token_count and total_chars:
+        return round(usage.candidates_token_count * chars / total_chars)
+    return -(-chars // _CHARS_PER_TOKEN)
+
+
+def _annotate(response: LlmResponse, outcome: str, tokens_after_mark: int) -> None:
+    response.custom_metadata = {
+        **(response.custom_metadata or {}),
+        END_OF_EDIT_KEY: outcome,
+        TOKENS_AFTER_MARK_KEY: tokens_after_mark,
+    }
+
+
+def _answer_parts(response: LlmResponse) -> List[types.Part]:
+    """Text parts of the answer (thoughts are not scanned)."""
+    parts = response.content.parts if response.content else None
+    return [p for p in parts or [] if p.text is not None and not p.thought]
+
+
+def trim_response(
+    response: LlmResponse, mark: str = END_OF_EDIT_MARK
+) -> Tuple[bool, int]:
+    """Cut a complete response at ``mark``; return (found, chars removed).
+
+    Parts without text (function calls, inline data) are left alone unless
+    they come after the mark.
+    """
+    parts = response.content.parts if response.content else None
+    for idx, part in enumerate(parts or []):
+        if part.text is None or part.thought or mark not in part.text:
+            continue
+        before, after = part.text.split(mark, 1)
+        removed = len(after) + sum(len(p.text or "") for p in parts[idx + 1 :])
+        part.text = before
+        del parts[idx + 1 :]
+        return True, removed
+    return False, 0
+
+
+def finish_response(
+    response: LlmResponse,
+    config: Optional[types.GenerateContentConfig] = None,
+    mark: str = END_OF_EDIT_MARK,
+) -> LlmResponse:
+    """Trim a complete response at ``mark`` and annotate how it ended.
+
+    ``config`` is the generation config the response was produced with.
+    A response without the mark is put down to the stop sequence only if
+    ``mark`` was one and the model reports a normal stop. The API reports
+    the same ``STOP`` for a natural end, which the reviser prompt (every
+    answer ends with the mark) makes unlikely. Responses cut by the
+    token limit are ``max_tokens``. Responses already annotated (e.g. by
+    ``EndOfEditLlm``) are returned unchanged.
+    """
+    if END_OF_EDIT_KEY in (response.custom_metadata or {}):
+        return response
+    total = sum(len(p.text) for p in _answer_parts(response))
+    found, removed = trim_response(response, mark)
+    if found:
+        _annotate(response, "trimmed", _tokens(removed, response, total))
+    elif response.finish_reason == types.FinishReason.MAX_TOKENS:
+        _annotate(response, "max_tokens", 0)
+    elif (
+        config
+        and mark in (config.stop_sequences or [])
+        and response.finish_reason == types.FinishReason.STOP
+    ):
+        _annotate(response, "stop_sequence", 0)
+    else:
+        _annotate(response, "no_mark", 0)
+    return response
+
+
+class MarkScanner:
+    """Finds ``mark`` in text that arrives in chunks.
+
+    ``feed`` returns the text that is safe to emit: everything except a
+    tail that could still be the start of the mark. Once the mark has
+    been seen, ``found`` is set and nothing more is emitted. A held-back
+    tail is never emitted by a stream that ends without the mark; the
+    model's final, complete response carries it.
+    """
+
+    def __init__(self, mark: str = END_OF_EDIT_MARK):
+        self.mark = mark
+        self.found = False
+        self.after_mark = 0  # chars received after the mark
+        self._pending = ""
+
+    def feed(self, text: str) -> str:
+        if self.found:
+            self.after_mark += len(text)
+            return ""
+        text = self._pending + text
+        idx = text.find(self.mark)
+        if idx >= 0:
+            self.found = True
+            self.after_mark = len(text) - idx - len(self.mark)
+            self._pending = ""
+            return text[:idx]
+        keep = self._overlap(text)
+        self._pending = text[len(text) - keep :] if keep else ""
+        return text[: len(text) - keep]
+
+    def _overlap(self, text: str) -> int:
+        """Length of the longest suffix of ``text`` that starts the mark."""
+        for n in range(min(len(text), len(self.mark) - 1), 0, -1):
+            if self.mark.startswith(text[-n:]):
+                return n
+        return 0
+
+
+class EndOfEditLlm(BaseLlm):
+    """Wraps a model and stops its output at the end-of-edit mark."""
+
+    inner: BaseLlm
+    mark: str = END_OF_EDIT_MARK
+
+    @classmethod
+    def wrap(cls, model: Union[str, BaseLlm], mark: str = END_OF_EDIT_MARK):
+        inner = model if isinstance(model, BaseLlm) else LLMRegistry.new_llm(model)
+        return cls(model=inner.model, inner=inner, mark=mark)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        responses = self.inner.generate_content_async(llm_request, stream=stream)
+        scanner = MarkScanner(self.mark)
+        emitted: List[str] = []
+        last: Optional[LlmResponse] = None
+        try:
+            async for response in responses:
+                if not response.partial:
+                    yield finish_response(response, llm_request.config, self.mark)
+                    continue
+                last = response
+                for part in _answer_parts(response):
+                    part.text = scanner.feed(part.text)
+                    emitted.append(part.text)
+                if scanner.found:
+                    break
+                yield response
+        finally:
+            # Closing the inner stream cancels the generation.
+            await responses.aclose()
+        if not scanner.found:
+            return
+
+        # Partial chunk holding the mark: emit the text before it, then the
+        # final response the inner model would have sent.
+        if last is not None and any(p.text for p in _answer_parts(last)):
+            yield last
+        final = LlmResponse(
+            content=types.Content(
+                role="model", parts=[types.Part(text="".join(emitted))]
+            ),
+            usage_metadata=last.usage_metadata if last else None,
+            finish_reason=types.FinishReason.STOP,
+        )
+        _annotate(final, "stream_cut", _tokens(scanner.after_mark, None, 0))
+        yield final
+
+    def connect(self, llm_request: LlmRequest):
+        return self.inner.connect(llm_request)
@@ -0,0 +1,260 @@
+"""Multi-session load test for the agents, against a local fake model.
+
+Every LLM agent is switched to ``fake_llm.FakeLlm``, so no Gemini or
+Search calls are made. Each scenario runs ``--requests`` requests with at
+most ``--concurrency`` in flight and reports:
+
+- throughput and p50/p95/p99 latency;
+- memory growth per request and peak traced memory (tracemalloc);
+- bytes written per request to the JSONL event log and to resume storage.
+
+Logs and storage go to a temporary directory, never to the project tree.
+
+Usage (from project root):
+
+    python load_test.py --requests 200 --concurrency 32 --latency 0.2
+    python load_test.py resume_creater_memory llm_auditor --json out.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional
+
+SCENARIOS = (
+    "resume_creater_memory",
+    "resume_creater",
+    "llm_auditor",
+    "my_google_search_agent",
+)
+
+_CANDIDATE_INFO = (
+    "Jane Doe. Experience: 6 years of backend work at Acme, led the payments "
+    "platform. Skills: Python, Go, PostgreSQL. Education: B.Sc. CS."
+)
+
+
+def _dir_bytes(path: str) -> int:
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, name))
+            except OSError:
+                pass  # rotated away meanwhile
+    return total
+
+
+async def _run_message(runner, text: str) -> None:
+    """One request on a fresh session of ``runner``."""
+    from google.genai import types
+
+    session = await runner.session_service.create_session(
+        app_name=runner.app_name, user_id="load", session_id=str(uuid.uuid4())
+    )
+    async for _ in runner.run_async(
+        user_id="load",
+        session_id=session.id,
+        new_message=types.Content(role="user", parts=[types.Part(text=text)]),
+    ):
+        pass
+
+
+def _build_scenario(name: str, fake, users: int) -> Callable[[int], Awaitable]:
+    """Return ``call(i)`` running request ``i`` of scenario ``name``."""
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+
+    from fake_llm import install_fake_llm
+
+    if name == "resume_creater_memory":
+        from resume_creater_memory.agent import root_agent
+        from resume_creater_memory.service import ResumeAgentService
+
+        install_fake_llm(root_agent, fake)
+        service = ResumeAgentService()
+        return lambda i: service.generate(
+            f"load-user-{i % users}", _CANDIDATE_INFO
+        )
+
+    if name == "resume_creater":
+        from resume_creater.agent import root_agent
+
+        text = _CANDIDATE_INFO
+    elif name == "llm_auditor":
+        from llm_auditor.agent import root_agent
+        from llm_auditor.batch import build_message
+
+        text = build_message("Is Python older than Java?", "Yes, released 1991.")
+    elif name == "my_google_search_agent":
+        from my_google_search_agent.agent import root_agent
+
+        text = "Who maintains the Python language?"
+    else:
+        raise ValueError(f"unknown scenario {name!r}; choose from {SCENARIOS}")
+
+    install_fake_llm(root_agent, fake)
+    runner = Runner(
+        app_name=f"load_{name}",
+        agent=root_agent,
+        session_service=InMemorySessionService(),
+    )
+    # Vary the request so response caches do not answer everything.
+    return lambda i: _run_message(runner, f"{text} (request {i})")
+
+
+async def run_scenario(
+    name: str,
+    call: Callable[[int], Awaitable],
+    requests: int,
+    concurrency: int,
+    log_dir: str,
+    store_dir: str,
+) -> Dict:
+    from callback_metrics import percentile
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    latencies: List[float] = []
+    errors = 0
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await call(i)
+            except Exception as e:
+                errors += 1
+                logging.warning(f"[load test] {name} request {i} failed: {e}")
+                return
+            latencies.append(time.perf_counter() - started)
+
+    await call(-1)  # warm-up: lazy imports, first connections, schema setup
+    log_before, store_before = _dir_bytes(log_dir), _dir_bytes(store_dir)
+    tracemalloc.reset_peak()
+    mem_before = tracemalloc.get_traced_memory()[0]
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    wall = time.perf_counter() - started
+
+    logging.getLogger().handlers[0].flush()
+    mem_after, mem_peak = tracemalloc.get_traced_memory()
+    return {
+        "scenario": name,
+        "requests": requests,
+        "errors": errors,
+        "requests_per_s": round(requests / wall, 1) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "mem_growth_kib_per_req": round(
+            (mem_after - mem_before) / 1024 / requests, 2
+        ),
+        "mem_peak_mib": round(mem_peak / 1024 / 1024, 1),
+        "log_bytes_per_req": round((_dir_bytes(log_dir) - log_before) / requests),
+        "store_bytes_per_req": round(
+            (_dir_bytes(store_dir) - store_before) / requests
+        ),
+    }
+
+
+_COLUMNS = (  # (result key, header, width)
+    ("scenario", "scenario", 24),
+    ("errors", "err", 6),
+    ("requests_per_s", "req/s", 9),
+    ("p50_ms", "p50 ms", 9),
+    ("p95_ms", "p95 ms", 9),
+    ("p99_ms", "p99 ms", 9),
+    ("mem_growth_kib_per_req", "KiB/req", 10),
+    ("mem_peak_mib", "peak MiB", 10),
+    ("log_bytes_per_req", "log B/req", 11),
+    ("store_bytes_per_req", "store B/req", 13),
+)
+
+
+def _print_table(rows: List[Dict]) -> None:
+    def line(cells) -> str:
+        first, *rest = cells
+        width = _COLUMNS[0][2]
+        return f"{first!s:<{width}}" + "".join(
+            f"{cell!s:>{w}}" for cell, (_, _, w) in zip(rest, _COLUMNS[1:])
+        )
+
+    print(line(header for _, header, _ in _COLUMNS))
+    for row in rows:
+        print(line(row[key] for key, _, _ in _COLUMNS))
+
+
+async def main_async(args, log_dir: str, store_dir: str) -> List[Dict]:
+    from fake_llm import FakeLlm
+    from resume_creater_memory import resume_storage
+
+    # Resumes go to the temporary store (scenario resume_creater_memory).
+    resume_storage.configure_storage(root=store_dir, legacy_dir=store_dir)
+    fake = FakeLlm(
+        latency=args.latency,
+        jitter=args.jitter,
+        response_tokens=args.response_tokens,
+        grounding_chunks=args.grounding_chunks,
+        search_latency=args.search_latency,
+    )
+    rows = []
+    for name in args.scenarios:
+        call = _build_scenario(name, fake, args.users)
+        rows.append(
+            await run_scenario(
+                name, call, args.requests, args.concurrency, log_dir, store_dir
+            )
+        )
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("scenarios", nargs="*", default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--users", type=int, default=50, help="distinct user ids")
+    parser.add_argument("--latency", type=float, default=0.1, help="fake model s")
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--response-tokens", type=int, default=300)
+    parser.add_argument("--grounding-chunks", type=int, default=5)
+    parser.add_argument("--search-latency", type=float, default=0.1)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_dir = os.path.join(tmp, "logs")
+        store_dir = os.path.join(tmp, "store")
+        os.makedirs(store_dir)
+        # Must be set before the agent packages are imported.
+        os.environ.setdefault("MODEL", "gemini-fake")
+        os.environ.setdefault("CRITIC_CACHE", "off")
+        os.environ.setdefault("SEARCH_CACHE", "off")
+        os.environ["AGENT_EVENT_LOG"] = os.path.join(log_dir, "agent.jsonl")
+
+        import callback_logging
+
+        # Event log only: console output would dominate the measurement.
+        logging.basicConfig(
+            level=logging.INFO, handlers=[callback_logging._file_handler()]
+        )
+        tracemalloc.start()
+        rows = asyncio.run(main_async(args, log_dir, store_dir))
+        tracemalloc.stop()
+
+    _print_table(rows)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
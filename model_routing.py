@@ -0,0 +1,321 @@
+"""Pick the model for each request from a tier list.
+
+Agents used to pin one model each. With routing enabled, an agent's model
+is a ``RoutedLlm`` that chooses a tier per request:
+
+- **Input size**: the smallest tier whose ``max_input_chars`` fits the
+  user's latest message, so short control turns ("show my resume") go to
+  a lite model and long candidate dumps to a larger one.
+- **Agent**: ``agents`` limits which tiers an agent may use; an empty
+  list keeps the agent's own model.
+- **Observed latency and errors**: a tier whose recent calls for this
+  agent failed more often than ``max_error_rate``, or whose median
+  latency exceeds the tier's ``max_latency``, is skipped in favour of the
+  next larger one until its window (``window_seconds``) no longer shows
+  it. At least ``min_samples`` recent calls are needed to judge a tier.
+
+Routing happens when the request reaches the model, after the
+before_model callbacks. A request whose prefix ``PromptCache.apply``
+already cached for the configured model is re-resolved against the
+chosen tier's model (``PromptCache.retarget``).
+
+Every routed call is recorded per (agent, tier): ``get_routing_stats()``
+reports counts, errors and recent latency quantiles, and the
+``agent_route_calls_total`` / ``agent_route_seconds`` metrics carry the
+same data (see ``callback_metrics``).
+
+Configuration:
+
+- ``MODEL_ROUTING=on`` routes with the built-in tiers (``DEFAULT_TIERS``);
+  unset or ``off``, agents use their configured model as before.
+- ``MODEL_ROUTING_FILE``: a JSON object replacing the defaults (implies
+  ``on`` unless ``MODEL_ROUTING=off``)::
+
+    {
+      "tiers": [
+        {"name": "lite", "model": "gemini-2.5-flash-lite",
+         "max_input_chars": 500, "max_latency": 3},
+        {"name": "pro", "model": "gemini-2.5-pro"}
+      ],
+      "agents": {"critic_agent": ["pro"], "root_agent": []},
+      "window_seconds": 300, "max_error_rate": 0.5, "min_samples": 5
+    }
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import AsyncGenerator, Dict, Iterable, List, NamedTuple, Optional, Union
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse, LLMRegistry
+from pydantic import PrivateAttr
+
+import callback_metrics
+
+
+class Tier(NamedTuple):
+    name: str
+    model: str
+    max_input_chars: Optional[int] = None  # None: any size
+    max_latency: Optional[float] = None  # seconds, recent median
+
+
+DEFAULT_TIERS = (
+    Tier("lite", "gemini-2.5-flash-lite", max_input_chars=500),
+    Tier("standard", "gemini-2.5-flash", max_input_chars=8000),
+    Tier("pro", "gemini-2.5-pro"),
+)
+
+
+class RouteStats:
+    """Totals and a time window of recent calls for one (agent, tier)."""
+
+    def __init__(self, window_seconds: float):
+        self.window_seconds = window_seconds
+        self.calls = 0
+        self.errors = 0
+        self._recent: deque = deque()  # (finished_at, seconds, ok)
+
+    def record(self, seconds: float, ok: bool, now: float) -> None:
+        self.calls += 1
+        self.errors += not ok
+        self._recent.append((now, seconds, ok))
+        self._trim(now)
+
+    def _trim(self, now: float) -> None:
+        while self._recent and self._recent[0][0] < now - self.window_seconds:
+            self._recent.popleft()
+
+    def recent(self, now: float) -> Dict[str, float]:
+        self._trim(now)
+        latencies = sorted(seconds for _, seconds, _ in self._recent)
+        n = len(latencies)
+        errors = sum(1 for _, _, ok in self._recent if not ok)
+        return {
+            "recent_calls": n,
+            "recent_error_rate": errors / n if n else 0.0,
+            "p50": latencies[(n - 1) // 2] if n else 0.0,
+            "p95": latencies[min(n - 1, int(n * 0.95))] if n else 0.0,
+        }
+
+
+class ModelRouter:
+    """Chooses a tier per (agent, request size) and tracks how tiers do."""
+
+    def __init__(
+        self,
+        tiers: Iterable[Tier],
+        agents: Optional[Dict[str, List[str]]] = None,
+        window_seconds: float = 300.0,
+        max_error_rate: float = 0.5,
+        min_samples: int = 5,
+    ):
+        self.tiers = list(tiers)
+        if not self.tiers:
+            raise ValueError("model routing needs at least one tier")
+        names = {tier.name for tier in self.tiers}
+        self.agents = dict(agents or {})
+        for agent, allowed in self.agents.items():
+            unknown = sorted(set(allowed or ()) - names)
+            if unknown:
+                raise ValueError(f"unknown tier(s) {unknown} for agent {agent!r}")
+        self.window_seconds = window_seconds
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples
+        self._stats: Dict[tuple, RouteStats] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict) -> "ModelRouter":
+        return cls(
+            tiers=[Tier(**tier) for tier in config.get("tiers", ())]
+            or DEFAULT_TIERS,
+            agents=config.get("agents"),
+            window_seconds=float(config.get("window_seconds", 300.0)),
+            max_error_rate=float(config.get("max_error_rate", 0.5)),
+            min_samples=int(config.get("min_samples", 5)),
+        )
+
+    @classmethod
+    def from_env(cls) -> Optional["ModelRouter"]:
+        """Router from ``MODEL_ROUTING`` / ``MODEL_ROUTING_FILE``, or None."""
+        setting = os.getenv("MODEL_ROUTING", "").lower()
+        path = os.getenv("MODEL_ROUTING_FILE")
+        if setting in ("off", "0", "false", "no") or not (setting or path):
+            return None
+        if not path:
+            return cls(DEFAULT_TIERS)
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_config(json.load(f))
+
+    def tiers_for(self, agent: str) -> List[Tier]:
+        """Tiers ``agent`` may use, smallest first ([]: not routed)."""
+        if agent not in self.agents:
+            return self.tiers
+        allowed = set(self.agents[agent] or ())
+        return [tier for tier in self.tiers if tier.name in allowed]
+
+    def _healthy(self, agent: str, tier: Tier, now: float) -> bool:
+        stats = self._stats.get((agent, tier.name))
+        if stats is None:
+            return True
+        recent = stats.recent(now)
+        if recent["recent_calls"] < self.min_samples:
+            return True
+        if recent["recent_error_rate"] > self.max_error_rate:
+            return False
+        return tier.max_latency is None or recent["p50"] <= tier.max_latency
+
+    def choose(self, agent: str, input_chars: int) -> Optional[Tier]:
+        """The tier for a request of ``input_chars``; None if not routed."""
+        tiers = self.tiers_for(agent)
+        if not tiers:
+            return None
+        start = next(
+            (
+                i
+                for i, tier in enumerate(tiers)
+                if tier.max_input_chars is None or input_chars <= tier.max_input_chars
+            ),
+            len(tiers) - 1,
+        )
+        now = time.monotonic()
+        with self._lock:
+            for tier in tiers[start:]:
+                if self._healthy(agent, tier, now):
+                    return tier
+        return tiers[start]  # all larger tiers unhealthy: size decides
+
+    def record(self, agent: str, tier: Tier, seconds: float, ok: bool) -> None:
+        with self._lock:
+            stats = self._stats.get((agent, tier.name))
+            if stats is None:
+                stats = self._stats[(agent, tier.name)] = RouteStats(
+                    self.window_seconds
+                )
+            stats.record(seconds, ok, time.monotonic())
+        callback_metrics.record_route(
+            agent, tier.name, tier.model, seconds, "ok" if ok else "error"
+        )
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per ``agent/tier``: totals and recent latency/error figures."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                f"{agent}/{tier}": {
+                    "calls": stats.calls,
+                    "errors": stats.errors,
+                    **stats.recent(now),
+                }
+                for (agent, tier), stats in sorted(self._stats.items())
+            }
+
+
+_router: Optional[ModelRouter] = None
+_router_loaded = False
+
+
+def get_model_router() -> Optional[ModelRouter]:
+    global _router, _router_loaded
+    if not _router_loaded:
+        _router = ModelRouter.from_env()
+        _router_loaded = True
+    return _router
+
+
+def set_model_router(router: Optional[ModelRouter]) -> None:
+    """Install a router; None turns routing off for models built later."""
+    global _router, _router_loaded
+    _router = router
+    _router_loaded = True
+
+
+def get_routing_stats() -> Dict[str, Dict[str, float]]:
+    router = get_model_router()
+    return router.stats() if router is not None else {}
+
+
+def _input_chars(llm_request: LlmRequest) -> int:
+    """Size of the latest user message, the part that varies per turn."""
+    for content in reversed(llm_request.contents or []):
+        if content.role == "user":
+            return sum(len(part.text or "") for part in content.parts or [])
+    return 0
+
+
+class RoutedLlm(BaseLlm):
+    """An agent's model, chosen per request by the router.
+
+    ``model`` is the agent's configured model, used for live connections
+    and when the router does not cover the agent.
+    """
+
+    agent: str
+    _delegates: Dict[str, BaseLlm] = PrivateAttr(default_factory=dict)
+
+    def _delegate(self, model: str) -> BaseLlm:
+        llm = self._delegates.get(model)
+        if llm is None:
+            llm = self._delegates[model] = LLMRegistry.new_llm(model)
+        return llm
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        router = get_model_router()
+        tier = router.choose(self.agent, _input_chars(llm_request)) if router else None
+        model = tier.model if tier else self.model
+        if model != llm_request.model and llm_request.config.cached_content:
+            # The prompt cache resolved the prefix for the configured model;
+            # cached content only works with the model it was created for.
+            from prompt_cache import get_prompt_cache
+
+            cache = get_prompt_cache()
+            if cache is None or not await cache.retarget(llm_request, model):
+                tier, model = None, llm_request.model
+        llm_request.model = model
+        responses = self._delegate(model).generate_content_async(
+            llm_request, stream=stream
+        )
+        started = time.perf_counter()
+        ok = True
+        try:
+            async for response in responses:
+                if not response.partial and response.error_code:
+                    ok = False
+                yield response
+        except Exception:
+            ok = False
+            raise
+        finally:
+            await responses.aclose()
+            if tier is not None:
+                router.record(self.agent, tier, time.perf_counter() - started, ok)
+
+    def models(self) -> List[str]:
+        """Every model a request may go to: the configured one and the tiers."""
+        router = get_model_router()
+        tiers = router.tiers_for(self.agent) if router else []
+        return [self.model, *(tier.model for tier in tiers)]
+
+    def connect(self, llm_request: LlmRequest):
+        return self._delegate(self.model).connect(llm_request)
+
+
+def routed_model(agent: str, model: Optional[str]) -> Union[str, BaseLlm, None]:
+    """``model`` for ``agent``, routed when routing is on and covers it.
+
+    Pass the agent's ``name`` and the model name it would otherwise use.
+    """
+    router = get_model_router()
+    if router is None or not router.tiers_for(agent):
+        return model
+    return RoutedLlm(model=model or router.tiers[-1].model, agent=agent)
+
+
+# Referenced by hello/root_agent.yaml (``model_code``), which cannot pass
+# arguments.
+hello_model = routed_model("hello", "gemini-2.5-flash")
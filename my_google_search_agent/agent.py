@@ -4,7 +4,44 @@ from google.adk import Agent
 from google.adk.tools import google_search  # The Google Search tool
 
 sys.path.append("..")
-from callback_logging import log_model_response, log_query_to_model
+from callback_logging import (
+    log_model_response,
+    log_query_to_model,
+    record_model_response,
+)
+from model_routing import routed_model
+from response_cache import CACHE_OUTCOME_KEY, cache_from_env
+
+# Opt-in: with SEARCH_CACHE=memory|sqlite, repeated questions are answered
+# from this cache (for SEARCH_CACHE_TTL seconds, default 3600, even if the
+# search results have changed since), and a burst of the same question
+# makes one grounded call that the others wait for. Keys ignore case and
+# trailing punctuation (SEARCH_CACHE_NORMALIZE=query). Off by default; see
+# response_cache.cache_from_env.
+_search_cache = cache_from_env(
+    "SEARCH_CACHE", default_path="search_cache.db", normalize="query"
+)
+
+
+async def _lookup_cached(callback_context, llm_request):
+    """Answer from the cache; after_model_callback is skipped then, so the
+    response is recorded here."""
+    llm_response = await _search_cache.lookup_async(callback_context, llm_request)
+    if llm_response is not None:
+        outcome = llm_response.custom_metadata[CACHE_OUTCOME_KEY]
+        record_model_response(
+            callback_context,
+            llm_response,
+            source="cache" if outcome == "hit" else outcome,
+        )
+    return llm_response
+
+
+_before_model_callbacks = [log_query_to_model]
+_after_model_callbacks = [log_model_response]
+if _search_cache is not None:
+    _before_model_callbacks.append(_lookup_cached)
+    _after_model_callbacks.append(_search_cache.store)
 
 root_agent = Agent(
     # name: A unique name for the agent.
@@ -12,15 +49,19 @@ root_agent = Agent(
     # description: A short description of the agent's purpose, so
     # other agents in a multi-agent system know when to call it.
     description="Answer questions using Google Search.",
-    # model: The LLM model that the agent will use:
-    model="gemini-2.0-flash-001",
+    # model: The LLM model that the agent will use (MODEL_ROUTING can
+    # pick one per request instead, see model_routing.py):
+    model=routed_model("google_search_agent", "gemini-2.0-flash-001"),
     # instruction: Instructions (or the prompt) for the agent.
     instruction="You are an expert researcher. You stick to the facts.",
     # callbacks: Allow for you to run functions at certain points in
     # the agent's execution cycle. In this example, you will log the
-    # request to the agent and its response.
-    before_model_callback=log_query_to_model,
-    after_model_callback=log_model_response,
+    # request to the agent and its response, and serve repeated
+    # questions from the search cache.
+    before_model_callback=_before_model_callbacks,
+    after_model_callback=_after_model_callbacks,
+    on_model_error_callback=_search_cache.fail if _search_cache else None,
     # tools: functions to enhance the model's capabilities.
     # Add the google_search tool below.
+    tools=[google_search],
 )
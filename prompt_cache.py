@@ -0,0 +1,363 @@
+"""Opt-in context caching for the static prefix of agent requests.
+
+Every agent re-sends its full static instruction (and tool declarations)
+on each model call. ``PromptCache.apply`` is a before_model_callback that
+registers that prefix once as cached content and rewrites the request to
+reference it, so later calls only send the per-request contents.
+
+Lifecycle, per (agent, model, prefix hash):
+
+- **create** on first use;
+- **refresh** the TTL when a call arrives within ``refresh_margin`` of
+  expiry;
+- **invalidate** (delete) the old entry as soon as the agent's prefix hash
+  changes, e.g. after a prompt edit picked up by ``adk web --reload``.
+
+If the backend refuses a prefix (Gemini rejects prefixes below the model's
+minimum cacheable size), the request is sent unchanged and that prefix is
+not retried until the TTL has passed.
+
+Backends:
+
+- ``GeminiPromptCacheBackend``: Gemini context caching via google-genai.
+- ``LocalPromptCacheBackend``: in-process stand-in for tests and the fake
+  models used by the benchmarks.
+
+Enable with ``PROMPT_CACHE=gemini|local`` (default ``off``);
+``PROMPT_CACHE_TTL`` sets the TTL in seconds.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest
+from google.genai import types
+
+import callback_metrics
+
+_CacheKey = Tuple[str, str, str]  # (agent, model, prefix hash)
+_Prefix = Tuple[object, object, object]  # (system_instruction, tools, tool_config)
+
+
+class CachedPrefix(NamedTuple):
+    name: str
+    expire_time: float
+
+
+def prefix_hash(llm_request: LlmRequest) -> Optional[str]:
+    """Hash of the cacheable prefix (system instruction, tools, tool config).
+
+    Returns None when the request has no system instruction to cache.
+    """
+    config = llm_request.config
+    if config is None or not config.system_instruction:
+        return None
+    digest = hashlib.sha256()
+    items = [config.system_instruction, *(config.tools or []), config.tool_config]
+    for item in items:
+        if item is None:
+            continue
+        if hasattr(item, "model_dump_json"):
+            item = item.model_dump_json(exclude_none=True)
+        digest.update(str(item).encode("utf-8"))
+    return digest.hexdigest()
+
+
+# -----------------------------
+# Backends
+# -----------------------------
+
+
+class GeminiPromptCacheBackend:
+    """Gemini context caching (``client.aio.caches``)."""
+
+    def __init__(self, client=None):
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            from google import genai
+
+            self._client = genai.Client()
+        return self._client
+
+    @staticmethod
+    def _expiry(cached: types.CachedContent, ttl_seconds: float) -> float:
+        if isinstance(cached.expire_time, datetime):
+            return cached.expire_time.timestamp()
+        return time.time() + ttl_seconds
+
+    async def create(
+        self, model: str, config: types.GenerateContentConfig, ttl_seconds: float
+    ) -> CachedPrefix:
+        cached = await self.client.aio.caches.create(
+            model=model,
+            config=types.CreateCachedContentConfig(
+                system_instruction=config.system_instruction,
+                tools=config.tools,
+                tool_config=config.tool_config,
+                ttl=f"{int(ttl_seconds)}s",
+                display_name="adk-static-prefix",
+            ),
+        )
+        return CachedPrefix(cached.name, self._expiry(cached, ttl_seconds))
+
+    async def refresh(self, name: str, ttl_seconds: float) -> float:
+        cached = await self.client.aio.caches.update(
+            name=name,
+            config=types.UpdateCachedContentConfig(ttl=f"{int(ttl_seconds)}s"),
+        )
+        return self._expiry(cached, ttl_seconds)
+
+    async def delete(self, name: str) -> None:
+        await self.client.aio.caches.delete(name=name)
+
+
+class LocalPromptCacheBackend:
+    """In-process stand-in: keeps the prefixes so fakes can resolve them."""
+
+    def __init__(self):
+        self.entries: Dict[str, types.GenerateContentConfig] = {}
+
+    async def create(
+        self, model: str, config: types.GenerateContentConfig, ttl_seconds: float
+    ) -> CachedPrefix:
+        name = f"cachedContents/local-{uuid.uuid4().hex[:12]}"
+        self.entries[name] = types.GenerateContentConfig(
+            system_instruction=config.system_instruction,
+            tools=config.tools,
+            tool_config=config.tool_config,
+        )
+        return CachedPrefix(name, time.time() + ttl_seconds)
+
+    async def refresh(self, name: str, ttl_seconds: float) -> float:
+        if name not in self.entries:
+            raise KeyError(name)
+        return time.time() + ttl_seconds
+
+    async def delete(self, name: str) -> None:
+        self.entries.pop(name, None)
+
+    def resolve(self, name: str) -> Optional[types.GenerateContentConfig]:
+        """Return the cached prefix config for ``name`` (for fake models)."""
+        return self.entries.get(name)
+
+
+# -----------------------------
+# Callback-facing cache
+# -----------------------------
+
+
+class PromptCache:
+    """Replaces a request's static prefix with a cached-content reference."""
+
+    def __init__(
+        self,
+        backend,
+        ttl_seconds: float = 3600.0,
+        refresh_margin: float = 300.0,
+    ):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin = min(refresh_margin, ttl_seconds / 2)
+        self._entries: Dict[_CacheKey, CachedPrefix] = {}
+        self._current: Dict[Tuple[str, str], str] = {}  # (agent, model) -> hash
+        self._rejected: Dict[_CacheKey, float] = {}  # key -> retry after
+        # Entry name -> its key and the prefix ``apply`` removed, for retarget.
+        self._applied: Dict[str, Tuple[_CacheKey, _Prefix]] = {}
+        self._locks: Dict[_CacheKey, asyncio.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self.stats_counts = {
+            "hits": 0,
+            "created": 0,
+            "refreshed": 0,
+            "invalidated": 0,
+            "failed": 0,
+            "retargeted": 0,
+        }
+
+    def _lock(self, key: _CacheKey) -> asyncio.Lock:
+        with self._locks_guard:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = asyncio.Lock()
+            return lock
+
+    def _count(self, agent: str, result: str) -> None:
+        self.stats_counts[result] += 1
+        callback_metrics.registry.inc(
+            "agent_prompt_cache_total", agent=agent or None, result=result
+        )
+
+    async def _invalidate_previous(self, key: _CacheKey) -> None:
+        """Drop the entry of this agent's previous prefix, if it changed."""
+        agent, model, digest = key
+        previous = self._current.get((agent, model))
+        self._current[(agent, model)] = digest
+        if previous is None or previous == digest:
+            return
+        stale = self._entries.pop((agent, model, previous), None)
+        if stale is None:
+            return
+        self._applied.pop(stale.name, None)
+        self._count(agent, "invalidated")
+        try:
+            await self.backend.delete(stale.name)
+        except Exception as e:  # it expires on its own anyway
+            logging.warning(f"[prompt cache] could not delete {stale.name}: {e}")
+
+    async def _entry(
+        self, key: _CacheKey, llm_request: LlmRequest
+    ) -> Optional[CachedPrefix]:
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None and entry.expire_time - now > self.refresh_margin:
+            return entry
+        if self._rejected.get(key, 0) > now:
+            return None
+
+        async with self._lock(key):
+            entry = self._entries.get(key)  # another call may have done it
+            now = time.time()
+            if entry is not None and entry.expire_time - now > self.refresh_margin:
+                return entry
+            if entry is not None and entry.expire_time > now:
+                try:
+                    expire_time = await self.backend.refresh(
+                        entry.name, self.ttl_seconds
+                    )
+                    entry = self._entries[key] = entry._replace(
+                        expire_time=expire_time
+                    )
+                    self._count(key[0], "refreshed")
+                    return entry
+                except Exception as e:
+                    logging.warning(
+                        f"[prompt cache] refresh of {entry.name} failed: {e}"
+                    )
+            if entry is not None:
+                self._applied.pop(entry.name, None)
+            try:
+                entry = await self.backend.create(
+                    llm_request.model, llm_request.config, self.ttl_seconds
+                )
+            except Exception as e:
+                self._entries.pop(key, None)
+                self._rejected[key] = now + self.ttl_seconds
+                self._count(key[0], "failed")
+                logging.warning(
+                    f"[prompt cache] prefix not cached for {key[0]}: {e}"
+                )
+                return None
+            self._entries[key] = entry
+            self._count(key[0], "created")
+            return entry
+
+    async def apply(
+        self, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> None:
+        """before_model_callback: reference the cached prefix in the request.
+
+        Register it after any callback that reads or hashes the system
+        instruction (e.g. ``ResponseCache.lookup``).
+        """
+        digest = prefix_hash(llm_request)
+        if digest is None or not llm_request.model:
+            return None
+        if llm_request.config.cached_content:
+            return None  # already served from a cache
+        agent = str(getattr(callback_context, "agent_name", ""))
+        await self._reference(agent, digest, llm_request)
+        return None
+
+    async def _reference(
+        self, agent: str, digest: str, llm_request: LlmRequest, result: str = "hits"
+    ) -> None:
+        key = (agent, llm_request.model, digest)
+        await self._invalidate_previous(key)
+        entry = await self._entry(key, llm_request)
+        if entry is None:
+            return
+
+        # The API rejects system_instruction/tools next to cached_content.
+        config = llm_request.config
+        self._applied[entry.name] = (
+            key,
+            (config.system_instruction, config.tools, config.tool_config),
+        )
+        config.system_instruction = None
+        config.tools = None
+        config.tool_config = None
+        config.cached_content = entry.name
+        self._count(agent, result)
+
+    async def retarget(self, llm_request: LlmRequest, model: str) -> bool:
+        """Move a request ``apply`` rewrote over to ``model``.
+
+        Cached content belongs to the model it was created for, so a
+        request whose model changes after ``apply`` (e.g. ``RoutedLlm``
+        picking a tier) gets its prefix back and is re-resolved against
+        ``model``'s entry. Returns False, leaving the request untouched,
+        when its ``cached_content`` did not come from this cache.
+        """
+        applied = self._applied.get(llm_request.config.cached_content)
+        if applied is None:
+            return False
+        (agent, _, digest), prefix = applied
+        config = llm_request.config
+        config.system_instruction, config.tools, config.tool_config = prefix
+        config.cached_content = None
+        llm_request.model = model
+        await self._reference(agent, digest, llm_request, result="retargeted")
+        return True
+
+    async def clear(self) -> None:
+        """Delete every cached prefix created by this process."""
+        entries, self._entries = self._entries, {}
+        self._current.clear()
+        self._applied.clear()
+        for entry in entries.values():
+            try:
+                await self.backend.delete(entry.name)
+            except Exception as e:
+                logging.warning(f"[prompt cache] could not delete {entry.name}: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.stats_counts, entries=len(self._entries))
+
+
+def prompt_cache_from_env(prefix: str = "PROMPT_CACHE") -> Optional[PromptCache]:
+    """Build a cache from ``<prefix>`` (gemini/local/off) and ``<prefix>_TTL``."""
+    kind = os.getenv(prefix, "off").lower()
+    if kind in ("off", "0", "false", "none", ""):
+        return None
+    ttl = float(os.getenv(f"{prefix}_TTL", "3600"))
+    if kind == "gemini":
+        backend = GeminiPromptCacheBackend()
+    elif kind == "local":
+        backend = LocalPromptCacheBackend()
+    else:
+        raise ValueError(f"{prefix} must be 'gemini', 'local' or 'off', got {kind!r}")
+    return PromptCache(backend, ttl_seconds=ttl)
+
+
+_shared_cache: Optional[PromptCache] = None
+_shared_loaded = False
+
+
+def get_prompt_cache() -> Optional[PromptCache]:
+    """Process-wide cache shared by all agents (None when disabled)."""
+    global _shared_cache, _shared_loaded
+    if not _shared_loaded:
+        _shared_cache = prompt_cache_from_env()
+        _shared_loaded = True
+    return _shared_cache
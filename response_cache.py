@@ -0,0 +1,419 @@
+"""Content-addressed cache for model responses, usable from agent callbacks.
+
+A cache entry is keyed by the normalized request text, the model name and
+a hash of the system instruction, so identical requests against the same
+prompt reuse one response while any prompt or model change misses.
+
+``ResponseCache.lookup`` is a before_model_callback that returns the
+cached ``LlmResponse`` (skipping the model call, and marked with
+``CACHE_OUTCOME_KEY`` in its ``custom_metadata``) or None;
+``ResponseCache.store`` is called from the agent's after_model_callback
+to save the final response of a call that missed.
+
+``ResponseCache.lookup_async`` also coalesces concurrent identical
+requests (singleflight): the first miss for a key makes the model call,
+and identical requests arriving while it is in flight wait for its
+response instead of making their own. If that call fails (or takes longer
+than ``coalesce_timeout``), the waiting requests call the model
+themselves. Wire ``ResponseCache.fail`` into ``on_model_error_callback``
+so failures release the waiters at once.
+
+Hits, misses and coalesced requests are counted in ``stats()`` and in the
+``agent_response_cache_total`` metric (labels ``agent`` and ``outcome``).
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Tuple
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+
+import callback_metrics
+
+if TYPE_CHECKING:  # only the SQLite backend needs it, imported on first use
+    import sqlite3
+
+_WHITESPACE = re.compile(r"\s+")
+
+_MAX_PENDING = 4096
+
+# (key, future shared with waiting duplicates) of an in-flight miss.
+_Pending = Tuple[str, Optional[Future]]
+
+# custom_metadata key set on responses served by the cache: "hit" or
+# "coalesced".
+CACHE_OUTCOME_KEY = "response_cache"
+
+# ``stats()`` counter behind each ``outcome`` label of the metric.
+_OUTCOMES = {"hit": "hits", "miss": "misses", "coalesced": "coalesced"}
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so formatting-only differences share a key."""
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def normalize_query(text: str) -> str:
+    """Also fold case, Unicode forms and trailing punctuation, so search
+    questions that differ only in those share a key."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return normalize_text(text).rstrip(" ?!.")
+
+
+NORMALIZERS = {"text": normalize_text, "query": normalize_query}
+
+
+def _content_text(content) -> str:
+    if content is None or not content.parts:
+        return ""
+    return "\n".join(part.text for part in content.parts if part.text)
+
+
+def request_key(
+    llm_request: LlmRequest, normalize: Callable[[str], str] = normalize_text
+) -> str:
+    """Hash of (normalized input text, model, system instruction)."""
+    config = llm_request.config
+    instruction = config.system_instruction if config else None
+    if not isinstance(instruction, str):
+        instruction = _content_text(instruction) if instruction else ""
+    prompt_hash = hashlib.sha256(instruction.encode("utf-8")).hexdigest()
+
+    turns = [
+        f"{content.role}:{normalize(_content_text(content))}"
+        for content in llm_request.contents or []
+    ]
+    payload = json.dumps([llm_request.model or "", prompt_hash, turns])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# -----------------------------
+# Backends
+# -----------------------------
+
+
+class InMemoryResponseBackend:
+    """Process-local LRU of serialized responses."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def set(self, key: str, payload: str, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteResponseBackend:
+    """On-disk backend so cached responses survive restarts and are shared
+    between processes on the same machine."""
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS response_cache (
+        key TEXT PRIMARY KEY,
+        expires_at REAL NOT NULL,
+        created_at REAL NOT NULL,
+        payload TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_response_cache_created
+        ON response_cache (created_at);
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+
+    def _connection(self) -> "sqlite3.Connection":
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            import sqlite3
+
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self._SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[str]:
+        row = self._connection().execute(
+            "SELECT payload FROM response_cache WHERE key = ? AND expires_at >= ?",
+            (key, time.time()),
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, payload: str, ttl: float) -> None:
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO response_cache "
+                "(key, expires_at, created_at, payload) VALUES (?, ?, ?, ?)",
+                (key, now + ttl, now, payload),
+            )
+            conn.execute("DELETE FROM response_cache WHERE expires_at < ?", (now,))
+            conn.execute(
+                "DELETE FROM response_cache WHERE key NOT IN ("
+                "  SELECT key FROM response_cache ORDER BY created_at DESC LIMIT ?"
+                ")",
+                (self.max_entries,),
+            )
+
+    def clear(self) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM response_cache")
+
+
+# -----------------------------
+# Callback-facing cache
+# -----------------------------
+
+
+class ResponseCache:
+    """Short-circuits model calls whose request was seen recently."""
+
+    def __init__(
+        self,
+        backend,
+        ttl_seconds: float = 3600.0,
+        normalize: Callable[[str], str] = normalize_text,
+        coalesce_timeout: float = 120.0,
+    ):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.normalize = normalize
+        self.coalesce_timeout = coalesce_timeout
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.stores = 0
+        # Keys of in-flight misses, so ``store`` knows where the response
+        # goes, with the future that waiting duplicates share (leaders only).
+        self._pending: "OrderedDict[Tuple[str, str], _Pending]" = OrderedDict()
+        # key -> (deadline, future) of the call currently making the request.
+        self._inflight: Dict[str, Tuple[float, Future]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _call_id(callback_context: CallbackContext) -> Tuple[str, str]:
+        return (
+            str(getattr(callback_context, "invocation_id", "")),
+            str(getattr(callback_context, "agent_name", "")),
+        )
+
+    def _count(self, callback_context: CallbackContext, outcome: str) -> None:
+        attr = _OUTCOMES[outcome]
+        setattr(self, attr, getattr(self, attr) + 1)
+        callback_metrics.registry.inc(
+            "agent_response_cache_total",
+            agent=getattr(callback_context, "agent_name", None),
+            outcome=outcome,
+        )
+
+    def _served(
+        self, callback_context: CallbackContext, payload: str, outcome: str
+    ) -> LlmResponse:
+        self._count(callback_context, outcome)
+        llm_response = LlmResponse.model_validate_json(payload)
+        llm_response.custom_metadata = {
+            **(llm_response.custom_metadata or {}),
+            CACHE_OUTCOME_KEY: outcome,
+        }
+        return llm_response
+
+    def _add_pending(
+        self,
+        callback_context: CallbackContext,
+        key: str,
+        future: Optional[Future] = None,
+    ) -> None:
+        with self._lock:
+            self._pending[self._call_id(callback_context)] = (key, future)
+            while len(self._pending) > _MAX_PENDING:
+                # Calls that errored out never reach ``store``.
+                old_key, old_future = self._pending.popitem(last=False)[1]
+                self._finish(old_key, old_future, None)
+
+    def _finish(
+        self,
+        key: str,
+        future: Optional[Future],
+        payload: Optional[str],
+    ) -> None:
+        """Hand ``payload`` (None: no usable response) to waiting duplicates."""
+        if future is None:
+            return
+        if self._inflight.get(key, (0, None))[1] is future:
+            del self._inflight[key]
+        if not future.done():
+            future.set_result(payload)
+
+    def lookup(
+        self, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        """before_model_callback: return the cached response, if any."""
+        key = request_key(llm_request, self.normalize)
+        payload = self.backend.get(key)
+        if payload is None:
+            self._count(callback_context, "miss")
+            self._add_pending(callback_context, key)
+            return None
+        return self._served(callback_context, payload, "hit")
+
+    async def lookup_async(
+        self, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        """before_model_callback: like ``lookup``, but an identical request
+        already in flight is awaited instead of repeated."""
+        key = request_key(llm_request, self.normalize)
+        while True:
+            payload = self.backend.get(key)
+            if payload is not None:
+                return self._served(callback_context, payload, "hit")
+
+            now = time.monotonic()
+            with self._lock:
+                deadline, leader = self._inflight.get(key, (0.0, None))
+                if leader is None or deadline < now:
+                    # None in flight, or stuck: this call makes the request.
+                    future = Future()
+                    self._inflight[key] = (now + self.coalesce_timeout, future)
+                    leader = None
+            if leader is None:
+                self._count(callback_context, "miss")
+                self._add_pending(callback_context, key, future)
+                return None
+
+            try:
+                payload = await asyncio.wait_for(
+                    asyncio.shield(asyncio.wrap_future(leader)), deadline - now
+                )
+            except asyncio.TimeoutError:
+                payload = None
+            if payload is not None:
+                return self._served(callback_context, payload, "coalesced")
+            # The call failed or is stuck: one of the waiters takes over.
+
+    def store(
+        self, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> LlmResponse:
+        """after_model_callback helper: cache the final response of a miss."""
+        if llm_response.partial:
+            return llm_response
+        with self._lock:
+            key, future = self._pending.pop(
+                self._call_id(callback_context), (None, None)
+            )
+        if key is None:
+            return llm_response
+        payload = None
+        if (
+            llm_response.content
+            and llm_response.content.parts
+            and not llm_response.error_code
+        ):
+            payload = llm_response.model_dump_json(exclude_none=True)
+            self.backend.set(key, payload, self.ttl_seconds)
+            self.stores += 1
+        with self._lock:
+            self._finish(key, future, payload)
+        return llm_response
+
+    def fail(
+        self,
+        callback_context: CallbackContext,
+        llm_request: LlmRequest,
+        error: Exception,
+    ) -> None:
+        """on_model_error_callback: release duplicates waiting on this call."""
+        del llm_request, error
+        with self._lock:
+            key, future = self._pending.pop(
+                self._call_id(callback_context), (None, None)
+            )
+            if key is not None:
+                self._finish(key, future, None)
+        return None
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "stores": self.stores,
+            # Requests answered without their own model call.
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
+
+
+def cache_from_env(
+    prefix: str, default_path: str, normalize: str = "text"
+) -> Optional[ResponseCache]:
+    """Build a cache from ``<prefix>``, ``<prefix>_TTL``, ``<prefix>_PATH``,
+    ``<prefix>_MAX_ENTRIES``, ``<prefix>_NORMALIZE`` and
+    ``<prefix>_COALESCE_TIMEOUT``.
+
+    ``<prefix>`` selects the backend: ``memory``, ``sqlite`` or ``off``
+    (default): caching is opt-in, since a cached response is replayed
+    unchanged for ``<prefix>_TTL`` seconds (default 3600) even if what it
+    was based on has changed. ``<prefix>_NORMALIZE`` is ``text`` (whitespace only) or
+    ``query`` (see ``normalize_query``), defaulting to ``normalize``.
+    Returns None when caching is disabled.
+    """
+    kind = os.getenv(prefix, "off").lower()
+    if kind in ("off", "0", "false", "none", ""):
+        return None
+    ttl = float(os.getenv(f"{prefix}_TTL", "3600"))
+    max_entries = int(os.getenv(f"{prefix}_MAX_ENTRIES", "1024"))
+    if kind == "sqlite":
+        backend = SQLiteResponseBackend(
+            os.getenv(f"{prefix}_PATH", default_path), max_entries=max_entries
+        )
+    elif kind == "memory":
+        backend = InMemoryResponseBackend(max_entries=max_entries)
+    else:
+        raise ValueError(f"{prefix} must be 'memory', 'sqlite' or 'off', got {kind!r}")
+    normalize = os.getenv(f"{prefix}_NORMALIZE", normalize).lower()
+    if normalize not in NORMALIZERS:
+        raise ValueError(
+            f"{prefix}_NORMALIZE must be one of {sorted(NORMALIZERS)}, got {normalize!r}"
+        )
+    return ResponseCache(
+        backend,
+        ttl_seconds=ttl,
+        normalize=NORMALIZERS[normalize],
+        coalesce_timeout=float(os.getenv(f"{prefix}_COALESCE_TIMEOUT", "120")),
+    )
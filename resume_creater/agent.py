@@ -7,7 +7,12 @@ from google.adk.agents.callback_context import CallbackContext
 from google.adk.models import LlmResponse
 
 # Local imports (NO sys.path hacks)
-from callback_logging import log_model_response, log_query_to_model
+from callback_logging import (
+    log_query_to_model,
+    record_model_response,
+)
+from model_routing import routed_model
+from prompt_cache import get_prompt_cache
 
 from . import prompt
 
@@ -20,7 +25,7 @@ def _format_resume_output(
     Ensures the response is returned as clean Markdown/plain text.
     No external references or grounding metadata should exist for this agent.
     """
-    del callback_context
+    record_model_response(callback_context, llm_response)
 
     if not llm_response.content or not llm_response.content.parts:
         return llm_response
@@ -37,12 +42,18 @@ def _format_resume_output(
     return llm_response
 
 
+_before_model_callbacks = [log_query_to_model]
+_prompt_cache = get_prompt_cache()  # PROMPT_CACHE=gemini|local, off by default
+if _prompt_cache is not None:
+    _before_model_callbacks.append(_prompt_cache.apply)
+
+
 resume_generator_agent = Agent(
-    model=os.getenv("MODEL"),
+    model=routed_model("resume_generator_agent", os.getenv("MODEL")),
     name="resume_generator_agent",
     instruction=prompt.RESUME_CREATOR_PROMPT,
     tools=[],  # Resume generator does NOT call search tools
-    before_model_callback=log_query_to_model,
+    before_model_callback=_before_model_callbacks,
     after_model_callback=_format_resume_output,
 )
 
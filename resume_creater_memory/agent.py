@@ -1,41 +1,51 @@
+import inspect
+import logging
 import os
 import uuid
-from typing import Dict, Optional, Tuple
+from typing import Awaitable, Callable, Dict, Optional, Tuple, Union
 
 from google.adk import Agent
 from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.adk.models import LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
 
 from . import prompt
-from .resume_storage import load_resume, save_resume
-from callback_logging import log_query_to_model, log_model_response
+from .intents import answer_retrieval_intent
+from .memory_policy import async_build_memory
+from .resume_storage import async_save_resume
+from callback_logging import (
+    async_log_query_to_model,
+    compute_persistence_id,
+    configure_logging,
+    get_session_state,
+    record_model_response,
+)
+from model_routing import routed_model
+from prompt_cache import get_prompt_cache
 
 
 # -----------------------------
 # Callback to format and save resume
 # -----------------------------
 
-def _format_resume_output(
+def _merge_resume_output(
     callback_context: CallbackContext,
     llm_response: LlmResponse,
-) -> LlmResponse:
-    """Merge LLM output into a single text block and persist the resume.
-
-    This callback is compatible with ADK Web's expected signature:
-    (callback_context, llm_response).
-
-    Persistence key priority:
-    1. session_state["user_id"]  (if you set this for a logical user)
-    2. session_state["session_id"]
-    3. callback_context.session_id
-    4. "default" (fallback)
+) -> Optional[Tuple[str, str]]:
+    """Merge the response parts and return ``(persistence_id, resume_text)``.
 
-    This means you can have multiple ADK Web sessions share the same
-    stored resume by ensuring they all set the same "user_id" in
-    session_state.
+    Returns None when there is nothing to persist. Partial (streamed)
+    chunks are passed through untouched: only the final, aggregated
+    response is merged and persisted, so a streamed resume is written
+    exactly once.
     """
+    if llm_response.partial:
+        return None
     if not llm_response.content or not llm_response.content.parts:
-        return llm_response
+        return None
 
     # Combine all text parts into one
     combined = "\n".join(
@@ -44,33 +54,44 @@ def _format_resume_output(
     llm_response.content.parts[0].text = combined
     del llm_response.content.parts[1:]
 
-    # Inspect session_state if present
-    session_state = getattr(callback_context, "session_state", None)
-    persistence_id: Optional[str] = None
+    # No grounding metadata for this agent
+    llm_response.grounding_metadata = None
 
-    if isinstance(session_state, dict):
-        # Keep in-memory previous_resume for same ADK Web session
+    # Keep in-memory previous_resume for same ADK Web session
+    session_state = get_session_state(callback_context)
+    if session_state is not None:
         session_state["previous_resume"] = combined
 
-        # Prefer a stable logical user_id if you provide one via ADK Web
-        persistence_id = (
-            session_state.get("user_id")  # logical user identifier, if set
-            or session_state.get("session_id")  # ADK session id, if present
-        )
+    # user_id -> session_id -> ADK session -> "default", see callback_logging
+    persistence_id = compute_persistence_id(callback_context)
+
+    return persistence_id, combined
 
-    # Fallback to callback_context.session_id if nothing from session_state
-    if not persistence_id:
-        persistence_id = getattr(callback_context, "session_id", None)
 
-    # Final fallback so we always write *something*
-    if not persistence_id:
-        persistence_id = "default"
+async def _async_format_resume_output(
+    callback_context: CallbackContext,
+    llm_response: LlmResponse,
+) -> LlmResponse:
+    """Merge LLM output into a single text block and persist the resume.
 
-    # Persist to disk
-    save_resume(persistence_id, combined)
+    This callback is compatible with ADK Web's expected signature:
+    (callback_context, llm_response).
 
-    # No grounding metadata for this agent
-    llm_response.grounding_metadata = None
+    Persistence key priority:
+    1. session_state["user_id"]  (if you set this for a logical user)
+    2. session_state["session_id"]
+    3. callback_context.session_id
+    4. "default" (fallback)
+
+    This means you can have multiple ADK Web sessions share the same
+    stored resume by ensuring they all set the same "user_id" in
+    session_state. The write is offloaded to the storage thread pool, so
+    concurrent sessions are not serialized behind each other's disk I/O.
+    """
+    record_model_response(callback_context, llm_response)
+    merged = _merge_resume_output(callback_context, llm_response)
+    if merged is not None:
+        await async_save_resume(*merged)
     return llm_response
 
 
@@ -78,19 +99,34 @@ def _format_resume_output(
 # Create the Resume Generator Agent
 # -----------------------------
 
+# Retrieval commands ("show my resume") are answered from storage first,
+# without a model call; see intents.py. PROMPT_CACHE=gemini|local serves the
+# static instruction from a context cache; it runs last so memory injection
+# has already happened.
+_before_model_callbacks = [answer_retrieval_intent, async_log_query_to_model]
+_prompt_cache = get_prompt_cache()
+if _prompt_cache is not None:
+    _before_model_callbacks.append(_prompt_cache.apply)
+
 resume_generator_agent = Agent(
-    model=os.getenv("MODEL") or "gemini-1.5-pro",
+    # MODEL_ROUTING picks a model per request, see model_routing.py
+    model=routed_model(
+        "resume_generator_agent", os.getenv("MODEL") or "gemini-1.5-pro"
+    ),
     name="resume_generator_agent",  # valid identifier
     instruction=prompt.RESUME_CREATOR_PROMPT,  # base prompt; overridden per call when using helper
     tools=[],  # No external tools required
-    before_model_callback=log_query_to_model,
-    after_model_callback=_format_resume_output,
+    before_model_callback=_before_model_callbacks,
+    after_model_callback=_async_format_resume_output,
 )
 
 # Root agent used by ADK Web
 root_agent = resume_generator_agent
 
 
+_APP_NAME = "resume_creater_memory"
+
+
 # -----------------------------
 # Helper: generate session ID
 # -----------------------------
@@ -103,28 +139,97 @@ def _generate_session_id() -> str:
 # Public helper to run the agent with memory (Python-side)
 # -----------------------------
 
+ChunkHandler = Callable[[str], Union[None, Awaitable[None]]]
+
+
+async def _emit(on_chunk: ChunkHandler, chunk: str) -> None:
+    result = on_chunk(chunk)
+    if inspect.isawaitable(result):
+        await result
+
+
+async def _run_and_collect(
+    runner: Runner,
+    user_id: str,
+    session_id: str,
+    message: str,
+    on_chunk: Optional[ChunkHandler] = None,
+) -> LlmResponse:
+    """Send ``message`` through ``runner`` and return the final response.
+
+    Streams (SSE) when ``on_chunk`` is given and forwards every partial
+    text chunk to it. A response that arrives whole (e.g. a retrieval
+    command answered from storage) is forwarded as one chunk.
+    """
+    run_config = RunConfig(
+        streaming_mode=StreamingMode.SSE if on_chunk else StreamingMode.NONE
+    )
+
+    response: Optional[LlmResponse] = None
+    streamed = False
+    async for event in runner.run_async(
+        user_id=user_id,
+        session_id=session_id,
+        new_message=types.Content(role="user", parts=[types.Part(text=message)]),
+        run_config=run_config,
+    ):
+        if event.author != resume_generator_agent.name or not event.content:
+            continue
+        if event.partial:
+            chunk = "".join(p.text for p in event.content.parts or [] if p.text)
+            if chunk and on_chunk is not None:
+                streamed = True
+                await _emit(on_chunk, chunk)
+        else:
+            response = event
+
+    if on_chunk is not None and not streamed and response is not None:
+        text = "".join(p.text for p in response.content.parts or [] if p.text)
+        if text:
+            await _emit(on_chunk, text)
+
+    if response is None:
+        response = LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text="")])
+        )
+    return response
+
+
 async def run_resume_agent(
     candidate_info: str,
     session_id: Optional[str] = None,
     session_state: Optional[Dict] = None,
+    on_chunk: Optional[ChunkHandler] = None,
 ) -> Tuple[LlmResponse, str]:
     """Run the Resume Generator with disk-backed memory (Python helper).
 
     - If ``session_id`` is None, a new one is created.
     - Previous resume (if any) is loaded from disk and included in the prompt.
     - The latest resume is saved back to disk by the callback.
+    - If ``on_chunk`` is given, the model output is streamed and every
+      partial text chunk is passed to it (sync or async) as it arrives.
+      The resume is still persisted once, from the final response.
 
     NOTE: This helper is *not* used automatically by ADK Web. ADK Web
     uses ``root_agent`` directly, but the callback above will still
     persist the resume using the rules described there.
+
+    Every call builds its own runner; to serve many requests, share a
+    ``service.ResumeAgentService`` instead.
     """
 
+    configure_logging()
+
     # Create or reuse session_id
     if session_id is None:
         session_id = _generate_session_id()
 
-    # Load previously saved resume (if any)
-    previous_resume = load_resume(session_id)
+    # Load previously saved resume (if any), bounded by the memory policy
+    previous_resume = await async_build_memory(session_id, query=candidate_info)
+    logging.info(
+        f"[memory for {session_id}]: injected "
+        f"{len(previous_resume.encode('utf-8'))} bytes"
+    )
 
     # Build session_state
     if session_state is None:
@@ -133,17 +238,25 @@ async def run_resume_agent(
     session_state.setdefault("session_id", session_id)
     session_state.setdefault("previous_resume", previous_resume or "")
 
-    # Dynamic instruction including previous resume
-    instruction = prompt.build_dynamic_prompt(
+    # The agent instruction already carries the static base prompt, so the
+    # message only needs the per-request suffix (previous resume + info).
+    message = prompt.build_prompt_suffix(
         previous_resume=session_state["previous_resume"],
         candidate_info=candidate_info,
     )
 
     # Run the agent
-    response = await resume_generator_agent.run_async(
-        instruction=instruction,
-        session_state=session_state,
+    runner = Runner(
+        app_name=_APP_NAME,
+        agent=resume_generator_agent,
+        session_service=InMemorySessionService(),
+    )
+    user_id = str(session_state.get("user_id") or session_id)
+    await runner.session_service.create_session(
+        app_name=_APP_NAME,
+        user_id=user_id,
         session_id=session_id,
+        state=session_state,
     )
-
+    response = await _run_and_collect(runner, user_id, session_id, message, on_chunk)
     return response, session_id
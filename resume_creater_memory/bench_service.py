@@ -0,0 +1,87 @@
+"""Load test: ``ResumeAgentService.generate`` vs ``run_resume_agent``.
+
+Drives both entry points with the same number of concurrent users against
+a local fake model (fixed latency, no network) and reports requests/sec
+and latency percentiles. Resumes are written to a temporary store, not to
+``resumes/``.
+
+Usage (from project root):
+
+    python -m resume_creater_memory.bench_service --requests 200 \\
+        --concurrency 32 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from callback_metrics import percentile
+from fake_llm import FakeLlm, install_fake_llm
+
+from . import resume_storage
+from .agent import resume_generator_agent, run_resume_agent
+from .service import ResumeAgentService
+
+
+async def _drive(
+    call: Callable[[int], Awaitable[object]], requests: int, concurrency: int
+) -> Dict[str, float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await call(i)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    wall = time.perf_counter() - started
+    return {
+        "requests_per_s": round(requests / wall, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+    }
+
+
+async def run(requests: int, concurrency: int, latency: float) -> None:
+    install_fake_llm(resume_generator_agent, FakeLlm(latency=latency))
+    service = ResumeAgentService()
+    info = "Skills: Python, SQL\nExperience: 5 years backend"
+
+    # Both paths load and save memory under the same kind of key (one per
+    # user, session id = user id), with a prefix per path so neither sees
+    # resumes the other stored.
+    async def helper(i: int):
+        user = f"helper-{i}"
+        return await run_resume_agent(
+            info, session_id=user, session_state={"user_id": user}
+        )
+
+    async def shared(i: int):
+        return await service.generate(f"service-{i}", info)
+
+    for name, call in (("run_resume_agent", helper), ("service.generate", shared)):
+        await call(-1)  # warm-up: imports, first connection
+        print(f"{name:<18}", await _drive(call, requests, concurrency))
+    await service.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.05, help="fake model s")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keep benchmark resumes out of the real store.
+        resume_storage.configure_storage(root=tmp, legacy_dir=tmp)
+        asyncio.run(run(args.requests, args.concurrency, args.latency))
+
+
+if __name__ == "__main__":
+    main()
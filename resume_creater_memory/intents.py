@@ -0,0 +1,180 @@
+"""Answer stored-resume retrieval commands without calling the model.
+
+"show my resume" used to go to the model with the stored resume injected,
+only for the model to echo it back. ``answer_retrieval_intent`` is the
+first before_model_callback of the resume agent: when the user's message
+is a recognised retrieval command it returns the stored text directly as
+the response, so no model call is made (and the echo is not saved as a
+new version).
+
+Intents map to a storage lookup:
+
+- ``latest``: the most recent stored resume ("show my resume");
+- ``history``: every stored version ("show all my resumes").
+
+Each intent has regular expressions matched against the *whole* message,
+lowercased, with whitespace collapsed and trailing punctuation removed.
+When nothing is stored yet, the message goes to the model as before.
+
+Configuration:
+
+- ``RESUME_INTENTS_FILE``: a JSON object ``{"latest": [patterns], ...}``
+  replacing the built-in table.
+- ``RESUME_INTENTS=off`` disables the fast path.
+"""
+
+import json
+import logging
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+import callback_metrics
+from callback_logging import (
+    compute_persistence_id,
+    configure_logging,
+    get_session_state,
+    record_model_response,
+)
+
+from . import prompt
+from .resume_storage import async_load_latest_resume, async_load_resume
+
+_RESUME = r"(resume|cv|résumé)"
+
+DEFAULT_INTENTS: Dict[str, Tuple[str, ...]] = {
+    "latest": (
+        r"(please )?(show|print|display|give|send|view|see|get)( me)? (my |the )?"
+        r"((latest|last|current|stored|saved|newest) )?" + _RESUME + r"( please)?",
+        r"(what|where)('s| is) my ((latest|current) )?" + _RESUME,
+    ),
+    "history": (
+        r"(please )?(show|print|display|list|give)( me)? (all (of )?)?my "
+        r"(" + _RESUME + r"s|" + _RESUME + r" (history|versions)|"
+        r"previous " + _RESUME + r"s)( please)?",
+    ),
+}
+
+# Storage lookup behind each intent.
+INTENT_LOADERS = {
+    "latest": async_load_latest_resume,
+    "history": async_load_resume,
+}
+
+# Retrieval commands are short; longer messages are never matched.
+_MAX_COMMAND_CHARS = 200
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split()).rstrip(" .!?")
+
+
+class IntentTable:
+    """Ordered ``(intent, pattern)`` rules; the first full match wins."""
+
+    def __init__(self, intents: Dict[str, Iterable[str]]):
+        unknown = sorted(set(intents) - set(INTENT_LOADERS))
+        if unknown:
+            raise ValueError(
+                f"unknown intent(s) {unknown}; known: {sorted(INTENT_LOADERS)}"
+            )
+        self.rules: List[Tuple[str, re.Pattern]] = [
+            (intent, re.compile(pattern))
+            for intent, patterns in intents.items()
+            for pattern in patterns
+        ]
+
+    @classmethod
+    def from_env(cls) -> Optional["IntentTable"]:
+        """Table from ``RESUME_INTENTS_FILE``; None when ``RESUME_INTENTS=off``."""
+        if os.getenv("RESUME_INTENTS", "on").lower() in ("off", "0", "false", "no"):
+            return None
+        path = os.getenv("RESUME_INTENTS_FILE")
+        if not path:
+            return cls(DEFAULT_INTENTS)
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def match(self, text: str) -> Optional[str]:
+        """Return the intent of ``text``, or None for anything else."""
+        if len(text) > _MAX_COMMAND_CHARS:
+            return None
+        normalized = _normalize(text)
+        for intent, pattern in self.rules:
+            if pattern.fullmatch(normalized):
+                return intent
+        return None
+
+
+_intent_table: Optional[IntentTable] = None
+_intent_table_loaded = False
+
+_avoided: Dict[str, int] = {intent: 0 for intent in INTENT_LOADERS}
+
+
+def get_intent_table() -> Optional[IntentTable]:
+    global _intent_table, _intent_table_loaded
+    if not _intent_table_loaded:
+        _intent_table = IntentTable.from_env()
+        _intent_table_loaded = True
+    return _intent_table
+
+
+def set_intent_table(table: Optional[IntentTable]) -> None:
+    """Install a table; None disables the fast path."""
+    global _intent_table, _intent_table_loaded
+    _intent_table = table
+    _intent_table_loaded = True
+
+
+def get_intent_stats() -> Dict[str, int]:
+    """Model calls avoided, per intent and in total."""
+    return dict(_avoided, model_calls_avoided=sum(_avoided.values()))
+
+
+def _user_text(llm_request: LlmRequest) -> Optional[str]:
+    if not llm_request.contents or llm_request.contents[-1].role != "user":
+        return None
+    parts = llm_request.contents[-1].parts
+    return parts[-1].text if parts else None
+
+
+async def answer_retrieval_intent(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> Optional[LlmResponse]:
+    """before_model_callback: serve retrieval commands from storage."""
+    table = get_intent_table()
+    text = _user_text(llm_request) if table is not None else None
+    if not text:
+        return None
+    intent = table.match(prompt.candidate_info_from_message(text))
+    if intent is None:
+        return None
+
+    persistence_id = compute_persistence_id(callback_context)
+    stored = await INTENT_LOADERS[intent](persistence_id)
+    if not stored:
+        return None  # nothing stored yet: let the model ask for details
+
+    configure_logging()
+    _avoided[intent] += 1
+    callback_metrics.record_avoided_call(
+        getattr(callback_context, "agent_name", None), intent
+    )
+    if intent == "latest":
+        session_state = get_session_state(callback_context)
+        if session_state is not None:
+            session_state["previous_resume"] = stored
+    logging.info(f"[intent {intent} for {persistence_id}]: answered from storage")
+
+    llm_response = LlmResponse(
+        content=types.Content(role="model", parts=[types.Part(text=stored)])
+    )
+    record_model_response(
+        callback_context, llm_response, source="intent", intent=intent
+    )
+    return llm_response
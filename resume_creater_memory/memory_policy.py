@@ -0,0 +1,213 @@
+"""Policy for how much stored resume history is injected into prompts.
+
+Both memory-injection paths (``callback_logging.log_query_to_model`` for
+ADK Web and ``agent.run_resume_agent`` for the Python helper) build their
+memory block through ``build_memory``, so they share one budget.
+
+Modes:
+
+- ``latest``: the newest ``max_versions`` versions (default: only the
+  latest one).
+- ``diff``: the latest version in full, followed by compact diffs of up
+  to ``max_versions - 1`` earlier versions against it.
+- ``all``: the full history, as the original implementation did.
+- ``relevant``: only the ``max_sections`` stored sections most relevant
+  to the current request (see ``resume_index``), from any version, so
+  the block stays the same size however long the history gets. Requests
+  that match no section get the ``latest`` block.
+
+Whatever the mode, the result is capped at ``max_chars`` (and
+``max_tokens``, estimated at ~4 characters per token). Older material is
+dropped first.
+"""
+
+import os
+from dataclasses import dataclass
+from typing import List, Optional
+
+from . import prompt
+from .resume_index import Section
+from .resume_storage import (
+    SEPARATOR,
+    async_load_view,
+    async_search_resume,
+    get_resume_store,
+    load_view,
+    search_resume,
+)
+
+_MODES = ("latest", "diff", "all", "relevant")
+
+_CHARS_PER_TOKEN = 4
+
+_TRUNCATION_MARK = "\n[... truncated ...]"
+
+
+@dataclass(frozen=True)
+class MemoryInjectionPolicy:
+    mode: str = "latest"
+    max_versions: int = 1
+    max_chars: int = 8000
+    max_tokens: Optional[int] = None
+    max_sections: int = 4
+
+    def __post_init__(self):
+        if self.mode not in _MODES:
+            raise ValueError(f"mode must be one of {_MODES}, got {self.mode!r}")
+
+    @classmethod
+    def from_env(cls) -> "MemoryInjectionPolicy":
+        """Build a policy from ``RESUME_MEMORY_*`` environment variables."""
+        max_tokens = os.getenv("RESUME_MEMORY_MAX_TOKENS")
+        return cls(
+            mode=os.getenv("RESUME_MEMORY_MODE", "latest"),
+            max_versions=int(os.getenv("RESUME_MEMORY_MAX_VERSIONS", "1")),
+            max_chars=int(os.getenv("RESUME_MEMORY_MAX_CHARS", "8000")),
+            max_tokens=int(max_tokens) if max_tokens else None,
+            max_sections=int(os.getenv("RESUME_MEMORY_MAX_SECTIONS", "4")),
+        )
+
+    @property
+    def char_budget(self) -> int:
+        budget = self.max_chars
+        if self.max_tokens is not None:
+            budget = min(budget, self.max_tokens * _CHARS_PER_TOKEN)
+        return max(0, budget)
+
+    @property
+    def cache_view(self) -> str:
+        """Cache key for this policy's rendering of a user's history."""
+        return f"memory:{self.mode}:{self.max_versions}:{self.char_budget}"
+
+    def render(self, versions: List[str]) -> str:
+        """Render stored versions (oldest first) into the memory block."""
+        if not versions:
+            return ""
+        if self.mode == "all":
+            blocks = list(versions)
+        elif self.mode in ("latest", "relevant"):
+            blocks = versions[-max(1, self.max_versions):]
+        else:
+            latest = versions[-1]
+            n_older = max(0, self.max_versions - 1)
+            older = versions[-1 - n_older:-1] if n_older else []
+            blocks = [
+                _diff_block(old, latest, len(older) - i)
+                for i, old in enumerate(older)
+            ]
+            blocks = [b for b in blocks if b] + [latest]
+        return _fit_to_budget(blocks, self.char_budget)
+
+    def render_sections(self, sections: List[Section]) -> str:
+        """Render search results (best first); the best is kept last."""
+        return _fit_to_budget([s.text for s in reversed(sections)], self.char_budget)
+
+
+def _diff_block(old: str, latest: str, age: int) -> str:
+    import difflib  # only the "diff" mode needs it
+
+    lines = list(
+        difflib.unified_diff(
+            latest.splitlines(),
+            old.splitlines(),
+            fromfile="latest",
+            tofile=f"{age} version(s) earlier",
+            lineterm="",
+            n=0,
+        )
+    )
+    return "\n".join(lines)
+
+
+def _fit_to_budget(blocks: List[str], budget: int) -> str:
+    """Join blocks, dropping the oldest ones first to respect ``budget``."""
+    kept: List[str] = []
+    used = 0
+    for block in reversed(blocks):
+        cost = len(block) + (len(SEPARATOR) if kept else 0)
+        if used + cost > budget:
+            if not kept:
+                # Even the newest block is too large: keep its beginning.
+                keep = max(0, budget - len(_TRUNCATION_MARK))
+                kept.append(block[:keep] + _TRUNCATION_MARK)
+            break
+        kept.append(block)
+        used += cost
+    return SEPARATOR.join(reversed(kept))
+
+
+_default_policy: Optional[MemoryInjectionPolicy] = None
+
+
+def get_default_policy() -> MemoryInjectionPolicy:
+    global _default_policy
+    if _default_policy is None:
+        _default_policy = MemoryInjectionPolicy.from_env()
+    return _default_policy
+
+
+def set_default_policy(policy: MemoryInjectionPolicy) -> None:
+    global _default_policy
+    _default_policy = policy
+
+
+def _versions_needed(policy: MemoryInjectionPolicy) -> Optional[int]:
+    return None if policy.mode == "all" else max(1, policy.max_versions)
+
+
+def _loader(persistence_id: str, policy: MemoryInjectionPolicy):
+    def load() -> str:
+        history = get_resume_store().history(
+            persistence_id, limit=_versions_needed(policy)
+        )
+        return policy.render([v.text for v in history])
+
+    return load
+
+
+def _section_query(
+    policy: MemoryInjectionPolicy, query: Optional[str]
+) -> Optional[str]:
+    """The text to search sections for, or None to use the cached view."""
+    if policy.mode != "relevant" or not query:
+        return None
+    # Prompt-suffix messages carry the previous resume; search the request.
+    query = prompt.candidate_info_from_message(query)
+    return query if query.strip() else None
+
+
+def build_memory(
+    persistence_id: str,
+    policy: Optional[MemoryInjectionPolicy] = None,
+    query: Optional[str] = None,
+) -> str:
+    """Return the memory block to inject for ``persistence_id`` ('' if none).
+
+    ``query`` is the user's request; only ``relevant`` mode uses it.
+    """
+    policy = policy or get_default_policy()
+    query = _section_query(policy, query)
+    if query:
+        sections = search_resume(persistence_id, query, policy.max_sections)
+        if sections:
+            return policy.render_sections(sections)
+    return load_view(persistence_id, policy.cache_view, _loader(persistence_id, policy))
+
+
+async def async_build_memory(
+    persistence_id: str,
+    policy: Optional[MemoryInjectionPolicy] = None,
+    query: Optional[str] = None,
+) -> str:
+    """Async version of ``build_memory``."""
+    policy = policy or get_default_policy()
+    query = _section_query(policy, query)
+    if query:
+        sections = await async_search_resume(
+            persistence_id, query, policy.max_sections
+        )
+        if sections:
+            return policy.render_sections(sections)
+    return await async_load_view(
+        persistence_id, policy.cache_view, _loader(persistence_id, policy)
+    )
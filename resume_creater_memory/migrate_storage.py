@@ -0,0 +1,127 @@
+"""Move stored resumes into the sharded storage layout.
+
+Imports, into ``--dest`` (default: ``RESUME_STORAGE_DIR``, see
+``resume_storage.default_storage_dir``):
+
+- every legacy ``<source>/<id>.txt`` file, one record per version;
+- the old unsharded ``<source>/resumes.db``, if present.
+
+Safe to re-run: each id is imported at most once, and ids from the old
+database win over their text files (which that database already
+contains). Source files are left in place.
+
+Usage (from project root):
+
+    python -m resume_creater_memory.migrate_storage --dry-run
+    python -m resume_creater_memory.migrate_storage --dest /srv/resumes --shards 64
+"""
+
+import argparse
+import os
+import sqlite3
+from typing import Dict, List, Optional
+
+from .resume_storage import (
+    DEFAULT_SHARDS,
+    RESUME_DIR,
+    ShardedResumeStore,
+    default_storage_dir,
+)
+
+
+def _legacy_ids(source: str) -> List[str]:
+    return sorted(
+        name[: -len(".txt")]
+        for name in os.listdir(source)
+        if name.endswith(".txt") and os.path.isfile(os.path.join(source, name))
+    )
+
+
+def _old_db_rows(db_path: str) -> Dict[str, List[tuple]]:
+    """``persistence_id -> [(created_at, text), ...]`` from an unsharded db.
+
+    Opened read-only: the unsharded layout predates compression, so its
+    rows are plain text and its schema must not be upgraded.
+    """
+    rows: Dict[str, List[tuple]] = {}
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        for persistence_id, created_at, text in conn.execute(
+            "SELECT persistence_id, created_at, text FROM resume_versions "
+            "ORDER BY version_id"
+        ):
+            rows.setdefault(persistence_id, []).append((created_at, text))
+    finally:
+        conn.close()
+    return rows
+
+
+def migrate(
+    source: str = RESUME_DIR,
+    dest: Optional[str] = None,
+    shards: int = DEFAULT_SHARDS,
+    dry_run: bool = False,
+) -> Dict[str, int]:
+    """Import ``source`` into the sharded store at ``dest``; return counts."""
+    dest = dest or default_storage_dir()
+    counts = {"db_ids": 0, "db_versions": 0, "text_files": 0, "skipped_ids": 0}
+    # Opening the store creates its shards, so a dry run does not.
+    store = (
+        None if dry_run else ShardedResumeStore(dest, shards=shards, legacy_dir=source)
+    )
+    seen = set()
+
+    # The old database first: an id stored there already includes the
+    # versions of its text file, so that file must not be imported again.
+    old_db = os.path.join(source, "resumes.db")
+    if os.path.exists(old_db):
+        for pid, versions in _old_db_rows(old_db).items():
+            seen.add(pid)
+            if not dry_run:
+                shard = store.shard_for(pid)
+                if not shard.claim_legacy_import(pid) and shard.count(pid):
+                    counts["skipped_ids"] += 1  # migrated by an earlier run
+                    continue
+                for created_at, text in versions:
+                    shard.append(pid, text, created_at=created_at)
+            counts["db_ids"] += 1
+            counts["db_versions"] += len(versions)
+
+    for pid in _legacy_ids(source):
+        if pid in seen:
+            continue
+        counts["text_files"] += 1
+        if not dry_run:
+            # Any store call imports the id's text file, at most once.
+            store.count(pid)
+
+    if store is not None:
+        store.close()
+    return counts
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", default=RESUME_DIR, help="old resumes/ dir")
+    parser.add_argument("--dest", help="storage root (default: RESUME_STORAGE_DIR)")
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=int(os.getenv("RESUME_STORAGE_SHARDS", str(DEFAULT_SHARDS))),
+    )
+    parser.add_argument("--dry-run", action="store_true", help="only count")
+    args = parser.parse_args(argv)
+
+    dest = args.dest or default_storage_dir()
+    counts = migrate(args.source, dest, args.shards, args.dry_run)
+    prefix = "[dry run] would import" if args.dry_run else "imported"
+    print(
+        f"{prefix} {counts['text_files']} text files and "
+        f"{counts['db_versions']} versions of {counts['db_ids']} ids "
+        f"from {args.source} into {dest} ({args.shards} shards); "
+        f"{counts['skipped_ids']} ids already present"
+    )
+
+
+if __name__ == "__main__":
+    main()
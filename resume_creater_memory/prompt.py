@@ -74,19 +74,37 @@ assumptions, no external comparisons, and no added details.
 RESUME_CREATOR_PROMPT = RESUME_BASE_PROMPT
 
 
-# Internal dynamic template used by our helper to inject previous_resume
-# and candidate_info before sending the request to the model.
-_DYNAMIC_PROMPT_TEMPLATE = (
-    RESUME_BASE_PROMPT
-    + """
-
+# Per-request part of the prompt. It is kept separate from the static
+# RESUME_BASE_PROMPT so the base prompt can stay in the agent instruction
+# (and be served from the prompt prefix cache, see prompt_cache.py) while
+# only this suffix changes from call to call.
+_PROMPT_SUFFIX_TEMPLATE = """
 Previous resume (if any):
 {previous_resume}
 
 Candidate information:
 {candidate_info}
 """
-)
+
+
+def build_prompt_suffix(previous_resume: str, candidate_info: str) -> str:
+    """Fill the per-request suffix with stored memory and new candidate info."""
+
+    previous_resume = previous_resume or "No previous resume found."
+    return _PROMPT_SUFFIX_TEMPLATE.format(
+        previous_resume=previous_resume,
+        candidate_info=candidate_info,
+    )
+
+
+def candidate_info_from_message(message: str) -> str:
+    """The candidate info of a ``build_prompt_suffix`` message.
+
+    Other messages (e.g. typed in ADK Web) are returned unchanged.
+    """
+
+    _, header, candidate_info = message.rpartition("\nCandidate information:\n")
+    return candidate_info.rstrip("\n") if header else message
 
 
 def build_dynamic_prompt(previous_resume: str, candidate_info: str) -> str:
@@ -95,10 +113,12 @@ def build_dynamic_prompt(previous_resume: str, candidate_info: str) -> str:
     This is safe for our own helper usage because we call ``format``
     *before* passing the final string to the Agent. ADK Web never sees
     the `{previous_resume}` or `{candidate_info}` placeholders.
+
+    Returns the full base prompt followed by the suffix; callers whose
+    agent already uses ``RESUME_CREATOR_PROMPT`` as its instruction only
+    need ``build_prompt_suffix``.
     """
 
-    previous_resume = previous_resume or "No previous resume found."
-    return _DYNAMIC_PROMPT_TEMPLATE.format(
-        previous_resume=previous_resume,
-        candidate_info=candidate_info,
+    return RESUME_BASE_PROMPT + "\n" + build_prompt_suffix(
+        previous_resume, candidate_info
     )
@@ -0,0 +1,125 @@
+"""In-process LRU cache sitting in front of resume_storage.
+
+Entries are keyed by persistence id. Each id can hold a few *views* of
+its stored resumes (for example the full history or only the latest
+version) so that different readers share one LRU slot and one
+invalidation point.
+
+Readers that fill the cache from storage take ``generation(id)`` before
+reading and pass it to ``put``; if the id was invalidated in between (a
+save landed), the put is dropped instead of caching the pre-save view.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+# Generations are striped: ids sharing a stripe only cost each other a
+# skipped put, and memory stays bounded however many ids are seen.
+_GENERATION_STRIPES = 1024
+
+
+class ResumeCache:
+    """Bounded LRU keyed by persistence id.
+
+    The cache is bounded both by the number of persistence ids
+    (``max_entries``) and by the total UTF-8 size of the text held
+    (``max_bytes``). Least recently used ids are evicted first.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+        self._sizes: Dict[str, Dict[str, int]] = {}  # id -> view -> bytes
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._generations = [0] * _GENERATION_STRIPES
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, persistence_id: str, view: str) -> Optional[str]:
+        """Return a cached view, or None on a miss."""
+        with self._lock:
+            views = self._entries.get(persistence_id)
+            if views is None or view not in views:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(persistence_id)
+            self.hits += 1
+            return views[view]
+
+    @staticmethod
+    def _stripe(persistence_id: str) -> int:
+        return hash(persistence_id) % _GENERATION_STRIPES
+
+    def generation(self, persistence_id: str) -> int:
+        """Token for ``put``: changes whenever ``persistence_id`` is invalidated."""
+        with self._lock:
+            return self._generations[self._stripe(persistence_id)]
+
+    def put(
+        self,
+        persistence_id: str,
+        view: str,
+        text: str,
+        generation: Optional[int] = None,
+    ) -> None:
+        """Cache a view; skipped if ``generation`` is no longer current."""
+        size = len(text.encode("utf-8"))
+        with self._lock:
+            if (
+                generation is not None
+                and generation != self._generations[self._stripe(persistence_id)]
+            ):
+                return
+            views = self._entries.setdefault(persistence_id, {})
+            sizes = self._sizes.setdefault(persistence_id, {})
+            views[view] = text
+            self._bytes += size - sizes.get(view, 0)
+            sizes[view] = size
+            self._entries.move_to_end(persistence_id)
+            self._evict()
+
+    def peek(self, persistence_id: str, view: str) -> Optional[str]:
+        """Like ``get`` but without touching LRU order or hit/miss stats."""
+        with self._lock:
+            views = self._entries.get(persistence_id)
+            return None if views is None else views.get(view)
+
+    def invalidate(self, persistence_id: str) -> None:
+        with self._lock:
+            self._generations[self._stripe(persistence_id)] += 1
+            if self._entries.pop(persistence_id, None) is not None:
+                self._bytes -= self._drop_sizes(persistence_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generations = [g + 1 for g in self._generations]
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    # Callers must hold self._lock for the helpers below.
+
+    def _drop_sizes(self, persistence_id: str) -> int:
+        return sum(self._sizes.pop(persistence_id, {}).values())
+
+    def _evict(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            persistence_id, _ = self._entries.popitem(last=False)
+            self._bytes -= self._drop_sizes(persistence_id)
+            self.evictions += 1
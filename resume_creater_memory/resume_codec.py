@@ -0,0 +1,140 @@
+"""Compression of stored resume versions.
+
+Versions are stored as compressed blocks, optionally against a shared
+dictionary trained on existing resumes (section headings, boilerplate and
+wording repeat across versions and users, so a dictionary helps most on
+the short texts that compress poorly on their own).
+
+Codecs:
+
+- ``plain``: UTF-8 text, uncompressed (also used whenever compression
+  would not save space);
+- ``zlib``: standard library; a dictionary is used as zlib's preset
+  dictionary (at most 32 KiB);
+- ``zstd``: needs the optional ``zstandard`` package; dictionaries are
+  trained with ``zstandard.train_dictionary``.
+
+Pick one with ``RESUME_STORAGE_CODEC`` (default ``zlib``).
+"""
+
+import hashlib
+import zlib
+from collections import Counter
+from typing import Iterable, List, Optional
+
+CODECS = ("plain", "zlib", "zstd")
+
+# zlib only looks back 32 KiB, so a larger preset dictionary is wasted.
+_ZLIB_MAX_DICT = 32 * 1024
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError as e:  # optional dependency
+        raise RuntimeError(
+            "RESUME_STORAGE_CODEC=zstd needs the 'zstandard' package"
+        ) from e
+    return zstandard
+
+
+def check_codec(codec: str) -> str:
+    if codec not in CODECS:
+        raise ValueError(f"codec must be one of {CODECS}, got {codec!r}")
+    if codec == "zstd":
+        _zstd()
+    return codec
+
+
+def encode(
+    text: str, codec: str, dictionary: Optional[bytes] = None, level: int = 6
+) -> bytes:
+    """Compress ``text`` with ``codec`` (and ``dictionary`` if given)."""
+    raw = text.encode("utf-8")
+    if codec == "plain":
+        return raw
+    if codec == "zlib":
+        if dictionary:
+            compressor = zlib.compressobj(level, zdict=dictionary)
+        else:
+            compressor = zlib.compressobj(level)
+        return compressor.compress(raw) + compressor.flush()
+    if codec == "zstd":
+        zstandard = _zstd()
+        dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        return zstandard.ZstdCompressor(level=level, dict_data=dict_data).compress(
+            raw
+        )
+    raise ValueError(f"unknown codec {codec!r}")
+
+
+def decode(data: bytes, codec: str, dictionary: Optional[bytes] = None) -> str:
+    if codec == "plain":
+        return bytes(data).decode("utf-8")
+    if codec == "zlib":
+        if dictionary:
+            decompressor = zlib.decompressobj(zdict=dictionary)
+        else:
+            decompressor = zlib.decompressobj()
+        return (decompressor.decompress(data) + decompressor.flush()).decode("utf-8")
+    if codec == "zstd":
+        zstandard = _zstd()
+        dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        return (
+            zstandard.ZstdDecompressor(dict_data=dict_data)
+            .decompress(data)
+            .decode("utf-8")
+        )
+    raise ValueError(f"unknown codec {codec!r}")
+
+
+def train_dictionary(
+    samples: Iterable[str], codec: str, size: int = 16 * 1024
+) -> Optional[bytes]:
+    """Build a dictionary for ``codec`` from sample resumes.
+
+    Returns None when there is too little material to be useful.
+    """
+    samples = [s for s in samples if s]
+    if codec == "zstd":
+        zstandard = _zstd()
+        try:
+            trained = zstandard.train_dictionary(
+                size, [s.encode("utf-8") for s in samples]
+            )
+        except zstandard.ZstdError:
+            return None  # not enough samples
+        return trained.as_bytes()
+    if codec != "zlib":
+        return None
+    return _zlib_dictionary(samples, min(size, _ZLIB_MAX_DICT))
+
+
+def _zlib_dictionary(samples: List[str], size: int) -> Optional[bytes]:
+    """Lines that recur across samples, most frequent last.
+
+    zlib finds matches closer to the end of the preset dictionary more
+    cheaply, so the most common material goes there.
+    """
+    counts = Counter(
+        line
+        for sample in samples
+        for line in set(sample.splitlines())
+        if line.strip()
+    )
+    common = [line for line, n in counts.most_common() if n > 1]
+    if not common:
+        return None
+    chosen: List[bytes] = []
+    used = 0
+    for line in common:
+        encoded = line.encode("utf-8") + b"\n"
+        if used + len(encoded) > size:
+            break
+        chosen.append(encoded)
+        used += len(encoded)
+    return b"".join(reversed(chosen))
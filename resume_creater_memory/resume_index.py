@@ -0,0 +1,245 @@
+"""Relevance index over a user's stored resume sections.
+
+Stored versions are split into sections (at Markdown headings, bold
+lines, ``Title:`` lines or ALL-CAPS lines) and indexed per user with
+BM25. A section repeated unchanged across versions is indexed once, under
+the newest version that contains it, so the index grows with what changed
+rather than with the number of saves.
+
+``ResumeIndex.search`` returns the top-k sections for a request such as
+"update my skills" or "add the Acme project": at most one section per
+heading, best score first, newer versions winning ties. The memory policy
+uses it in ``relevant`` mode to inject only those sections instead of the
+whole resume.
+
+Users are indexed on first search, from their stored history, and kept
+current by ``resume_storage.save_resume``; the least recently searched
+users are evicted beyond ``max_users``. Pure Python, no dependencies.
+"""
+
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+_TOKEN = re.compile(r"\w+")
+
+# Words that say what to do with the resume rather than what it is about.
+_STOPWORDS = frozenset(
+    "a an and add are as at be by can for from have i in is it me my of on or "
+    "please resume cv show the to update change with".split()
+)
+
+_MARKDOWN_HEADING = re.compile(r"#{1,6}\s+(.+?)\s*#*")
+_BOLD_HEADING = re.compile(r"\*\*([^*]+?)\*\*:?")
+_RULE = re.compile(r"[-=_*\s]+")
+
+_MAX_HEADING_CHARS = 60
+
+# BM25 parameters (the usual defaults).
+_K1 = 1.2
+_B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    return [
+        t for t in _TOKEN.findall(text.lower()) if t not in _STOPWORDS and len(t) > 1
+    ]
+
+
+def _heading(line: str) -> Optional[str]:
+    """The heading ``line`` introduces, or None for ordinary lines."""
+    line = line.strip()
+    if not line or len(line) > _MAX_HEADING_CHARS or _RULE.fullmatch(line):
+        return None
+    match = _MARKDOWN_HEADING.fullmatch(line) or _BOLD_HEADING.fullmatch(line)
+    if match:
+        return match.group(1).strip()
+    if line.endswith(":") and len(line.split()) <= 5 and line[0].isalpha():
+        return line[:-1].strip()
+    if line.isupper() and line[0].isalpha():
+        return line
+    return None
+
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
+    """Split a resume into ``(heading, text)`` pairs, in order.
+
+    Text before the first heading (name, contact details) is a section
+    with an empty heading. Each section's text includes its heading line.
+    """
+    sections: List[Tuple[str, str]] = []
+    heading, lines = "", []
+    for line in text.splitlines():
+        new_heading = _heading(line)
+        if new_heading is not None:
+            if any(l.strip() for l in lines):
+                sections.append((heading, "\n".join(lines).strip()))
+            heading, lines = new_heading, []
+        lines.append(line)
+    if any(l.strip() for l in lines):
+        sections.append((heading, "\n".join(lines).strip()))
+    return sections
+
+
+def _heading_key(heading: str) -> str:
+    return " ".join(_TOKEN.findall(heading.lower()))
+
+
+class Section(NamedTuple):
+    heading: str
+    text: str
+    version_id: int  # newest version containing this section
+    score: float = 0.0
+
+
+class _UserIndex:
+    """BM25 postings for one user's distinct sections."""
+
+    def __init__(self):
+        self.sections: List[Section] = []
+        self.lengths: List[int] = []
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.total_length = 0
+        self.version_ids = set()
+        self._by_content: Dict[Tuple[str, str], int] = {}
+
+    def add_version(self, version_id: int, text: str) -> None:
+        if version_id in self.version_ids:
+            return
+        self.version_ids.add(version_id)
+        for heading, body in split_sections(text):
+            key = (_heading_key(heading), body)
+            doc = self._by_content.get(key)
+            if doc is not None:
+                if version_id > self.sections[doc].version_id:
+                    self.sections[doc] = self.sections[doc]._replace(
+                        version_id=version_id
+                    )
+                continue
+            doc = len(self.sections)
+            self._by_content[key] = doc
+            self.sections.append(Section(heading, body, version_id))
+            tokens = tokenize(body)
+            self.lengths.append(len(tokens))
+            self.total_length += len(tokens)
+            for term, tf in Counter(tokens).items():
+                self.postings.setdefault(term, {})[doc] = tf
+
+    def search(self, query: str, k: int) -> List[Section]:
+        n_docs = len(self.sections)
+        if not n_docs or k <= 0:
+            return []
+        avg_length = self.total_length / n_docs or 1.0
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc, tf in docs.items():
+                norm = _K1 * (1 - _B + _B * self.lengths[doc] / avg_length)
+                scores[doc] = scores.get(doc, 0.0) + idf * tf * (_K1 + 1) / (tf + norm)
+
+        ranked = sorted(
+            scores.items(),
+            key=lambda item: (item[1], self.sections[item[0]].version_id),
+            reverse=True,
+        )
+        results: List[Section] = []
+        seen_headings = set()
+        for doc, score in ranked:
+            section = self.sections[doc]
+            heading = _heading_key(section.heading)
+            if heading in seen_headings:
+                continue
+            seen_headings.add(heading)
+            results.append(section._replace(score=score))
+            if len(results) == k:
+                break
+        return results
+
+
+class ResumeIndex:
+    """Per-user section indexes, built lazily from ``load_versions``.
+
+    ``load_versions(persistence_id)`` returns ``(version_id, text)`` pairs
+    for everything stored for that user.
+    """
+
+    def __init__(
+        self,
+        load_versions: Callable[[str], Iterable[Tuple[int, str]]],
+        max_users: int = 1024,
+    ):
+        self.load_versions = load_versions
+        self.max_users = max_users
+        self._users: "OrderedDict[str, _UserIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Versions saved while a user's index is being built.
+        self._pending: Dict[str, List[Tuple[int, str]]] = {}
+        self._stats = {"searches": 0, "builds": 0, "updates": 0, "evictions": 0}
+
+    def add(self, persistence_id: str, version_id: int, text: str) -> None:
+        """Index a newly saved version (no-op for users not indexed yet)."""
+        with self._lock:
+            user = self._users.get(persistence_id)
+            if user is not None:
+                user.add_version(version_id, text)
+                self._stats["updates"] += 1
+            elif persistence_id in self._pending:
+                self._pending[persistence_id].append((version_id, text))
+
+    def search(self, persistence_id: str, query: str, k: int = 4) -> List[Section]:
+        """Top ``k`` sections for ``query``, best first."""
+        with self._lock:
+            user = self._users.get(persistence_id)
+            if user is not None:
+                self._users.move_to_end(persistence_id)
+                self._stats["searches"] += 1
+                return user.search(query, k)
+            self._pending.setdefault(persistence_id, [])
+        # Build outside the lock: it reads storage.
+        built = _UserIndex()
+        try:
+            for version_id, text in self.load_versions(persistence_id):
+                built.add_version(version_id, text)
+        except BaseException:
+            with self._lock:
+                self._pending.pop(persistence_id, None)
+            raise
+        with self._lock:
+            for version_id, text in self._pending.pop(persistence_id, ()):
+                built.add_version(version_id, text)
+            # A concurrent build may have won; either is complete.
+            user = self._users.setdefault(persistence_id, built)
+            self._users.move_to_end(persistence_id)
+            self._stats["builds"] += 1
+            self._stats["searches"] += 1
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+                self._stats["evictions"] += 1
+            return user.search(query, k)
+
+    def indexed(self, persistence_id: str) -> bool:
+        """True when searching ``persistence_id`` will not read storage."""
+        with self._lock:
+            return persistence_id in self._users
+
+    def invalidate(self, persistence_id: str) -> None:
+        """Forget a user (e.g. after compaction); rebuilt on next search."""
+        with self._lock:
+            self._users.pop(persistence_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._users.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(
+                self._stats,
+                users=len(self._users),
+                sections=sum(len(u.sections) for u in self._users.values()),
+            )
@@ -1,32 +1,918 @@
+"""Disk-backed resume memory for the resume_creater_memory agent.
+
+Every saved resume is stored as its own record (with a timestamp) in a
+small SQLite database, indexed by persistence id. That makes "latest
+version" a single index lookup and lets callers query or compact a
+user's history without reading everything ever written for them.
+
+``save_resume`` / ``load_resume`` keep their original behaviour so
+existing callers do not need to change. Legacy ``resumes/<id>.txt``
+files are imported transparently the first time an id is accessed.
+
+Storage lives outside the package, under ``RESUME_STORAGE_DIR`` (default
+``$XDG_DATA_HOME/resume_creater_memory``), split into
+``RESUME_STORAGE_SHARDS`` SQLite databases by a hash of the persistence
+id: ``<root>/<shard>/resumes.db``. Writes for one id are serialized by a
+per-key lock. ``python -m resume_creater_memory.migrate_storage`` moves
+existing data into this layout.
+
+A save identical to the user's latest version (by content hash) is
+skipped. Only the latest version is compared: going back to an earlier
+text (A, B, A) is a real change, and dropping it would leave B as the
+latest resume. Versions are stored compressed (``RESUME_STORAGE_CODEC``, see
+``resume_codec``), optionally against a dictionary trained on existing
+resumes; reads decompress transparently.
+``python -m resume_creater_memory.storage_report`` shows bytes per user
+and can train a dictionary and recompress existing versions.
+
+``search_resume`` returns the stored sections most relevant to a request,
+from an in-process index (see ``resume_index``) that ``save_resume``
+keeps current.
+"""
+
+import asyncio
+import hashlib
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from . import resume_codec
+from .resume_cache import ResumeCache
+from .resume_index import ResumeIndex, Section
+
+if TYPE_CHECKING:  # imported on first connection
+    import sqlite3
 
+# Legacy location of the per-user text files (read-only now).
 RESUME_DIR = os.path.join(os.path.dirname(__file__), "resumes")
-os.makedirs(RESUME_DIR, exist_ok=True)
+
+# Unsharded database used before RESUME_STORAGE_DIR existed; only read by
+# the migration command.
+RESUME_DB_PATH = os.path.join(RESUME_DIR, "resumes.db")
+
+DEFAULT_SHARDS = 16
+
+# Separator used between versions by the legacy text files and by
+# ``load_resume`` when it joins the full history.
+SEPARATOR = "\n\n" + "-" * 40 + "\n\n"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS resume_versions (
+    version_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    persistence_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    text TEXT NOT NULL,
+    codec TEXT NOT NULL DEFAULT 'plain',
+    data BLOB,
+    dict_id INTEGER,
+    content_hash TEXT,
+    raw_bytes INTEGER,
+    encoded_for TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_resume_versions_pid
+    ON resume_versions (persistence_id, version_id);
+CREATE TABLE IF NOT EXISTS legacy_imports (
+    persistence_id TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS dictionaries (
+    dict_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    codec TEXT NOT NULL,
+    data BLOB NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+# Columns added for compression and deduplication, for databases created
+# before they existed. Such rows are plain text in ``text``; compressed
+# rows keep ``text`` empty and the block in ``data``. ``encoded_for`` is the
+# ``codec:dict_id`` a row was last encoded for, which differs from its own
+# codec when the row was too small to compress.
+_COMPRESSION_COLUMNS = {
+    "codec": "TEXT NOT NULL DEFAULT 'plain'",
+    "data": "BLOB",
+    "dict_id": "INTEGER",
+    "content_hash": "TEXT",
+    "raw_bytes": "INTEGER",
+    "encoded_for": "TEXT",
+}
+
+_VERSION_COLUMNS = "version_id, persistence_id, created_at, text, codec, data, dict_id"
+
+
+class ResumeVersion(NamedTuple):
+    """A single stored resume for one persistence id."""
+
+    version_id: int
+    persistence_id: str
+    created_at: float
+    text: str
+
+
+class UserUsage(NamedTuple):
+    """Storage used by one persistence id."""
+
+    persistence_id: str
+    versions: int
+    raw_bytes: int  # uncompressed UTF-8 text
+    stored_bytes: int  # text and compressed blocks as stored
+
+
+class ResumeStore:
+    """SQLite-backed, append-only store of resume versions.
+
+    One connection is kept per thread; SQLite's WAL mode lets readers
+    proceed while another thread is appending.
+    """
+
+    def __init__(
+        self,
+        db_path: str = RESUME_DB_PATH,
+        legacy_dir: str = RESUME_DIR,
+        codec: Optional[str] = None,
+    ):
+        self.db_path = db_path
+        self.legacy_dir = legacy_dir
+        self.codec = resume_codec.check_codec(
+            codec or os.getenv("RESUME_STORAGE_CODEC", "zlib")
+        )
+        self.duplicates_skipped = 0
+        self._local = threading.local()
+        self._imported = set()  # ids whose legacy file has been checked
+        self._dictionaries: Dict[int, bytes] = {}
+        self._current_dict: Optional[Tuple[int, bytes]] = None
+        self._current_dict_loaded = False
+
+    # -----------------------------
+    # Connection handling
+    # -----------------------------
+
+    def _connection(self) -> "sqlite3.Connection":
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            import sqlite3
+
+            # Created on first use, not at import: importing this module
+            # must not touch the filesystem.
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._upgrade_schema(conn)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _upgrade_schema(conn: "sqlite3.Connection") -> None:
+        with conn:
+            # Under the write lock: other connections may be upgrading too.
+            conn.execute("BEGIN IMMEDIATE")
+            columns = conn.execute("PRAGMA table_info(resume_versions)")
+            existing = {row[1] for row in columns}
+            for name, declaration in _COMPRESSION_COLUMNS.items():
+                if name not in existing:
+                    conn.execute(
+                        f"ALTER TABLE resume_versions ADD COLUMN {name} {declaration}"
+                    )
+
+    def close(self) -> None:
+        """Close the connection owned by the calling thread, if any."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # -----------------------------
+    # Legacy text-file import
+    # -----------------------------
+
+    def _legacy_path(self, persistence_id: str) -> str:
+        return os.path.join(self.legacy_dir, f"{persistence_id}.txt")
+
+    def claim_legacy_import(self, persistence_id: str) -> bool:
+        """Mark ``<id>.txt`` as imported without reading it.
+
+        Returns False if it was already marked. Used by the migration
+        command when the id's versions come from another database.
+        """
+        conn = self._connection()
+        with conn:
+            claimed = conn.execute(
+                "INSERT OR IGNORE INTO legacy_imports (persistence_id) VALUES (?)",
+                (persistence_id,),
+            ).rowcount
+        self._imported.add(persistence_id)
+        return bool(claimed)
+
+    def _import_legacy(self, persistence_id: str) -> None:
+        """Import ``<legacy_dir>/<id>.txt`` once, one record per version.
+
+        Every public method calls this first, so legacy versions always
+        get lower version ids than anything saved through the store.
+        """
+        if persistence_id in self._imported:
+            return
+        conn = self._connection()
+        imported = conn.execute(
+            "SELECT 1 FROM legacy_imports WHERE persistence_id = ?",
+            (persistence_id,),
+        ).fetchone()
+        if imported:
+            self._imported.add(persistence_id)
+            return
+
+        path = self._legacy_path(persistence_id)
+        versions: List[str] = []
+        created_at = time.time()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                versions = [v for v in f.read().split(SEPARATOR) if v.strip()]
+            created_at = os.path.getmtime(path)
+
+        with conn:
+            # Take the write lock before re-checking, so two threads or
+            # processes cannot both import the same file.
+            conn.execute("BEGIN IMMEDIATE")
+            claimed = conn.execute(
+                "INSERT OR IGNORE INTO legacy_imports (persistence_id) VALUES (?)",
+                (persistence_id,),
+            ).rowcount
+            if not claimed:
+                versions = []
+            for text in versions:
+                self._insert(conn, persistence_id, text, created_at)
+        self._imported.add(persistence_id)
+
+    # -----------------------------
+    # Encoding
+    # -----------------------------
+
+    def _dictionary(self, dict_id: Optional[int]) -> Optional[bytes]:
+        if dict_id is None:
+            return None
+        data = self._dictionaries.get(dict_id)
+        if data is None:
+            row = self._connection().execute(
+                "SELECT data FROM dictionaries WHERE dict_id = ?", (dict_id,)
+            ).fetchone()
+            if row is None:
+                raise LookupError(f"dictionary {dict_id} missing from {self.db_path}")
+            data = self._dictionaries[dict_id] = bytes(row[0])
+        return data
+
+    def current_dictionary(self) -> Optional[Tuple[int, bytes]]:
+        """Newest dictionary for this store's codec, as ``(dict_id, data)``."""
+        if not self._current_dict_loaded:
+            row = self._connection().execute(
+                "SELECT dict_id, data FROM dictionaries WHERE codec = ? "
+                "ORDER BY dict_id DESC LIMIT 1",
+                (self.codec,),
+            ).fetchone()
+            self._current_dict = (row[0], bytes(row[1])) if row else None
+            self._current_dict_loaded = True
+        return self._current_dict
+
+    def _encoded_for(self, dict_id: Optional[int]) -> str:
+        return f"{self.codec}:{'' if dict_id is None else dict_id}"
+
+    def _encode(
+        self, text: str
+    ) -> Tuple[str, str, Optional[bytes], Optional[int], str]:
+        """``(text, codec, data, dict_id, encoded_for)`` column values."""
+        if self.codec == "plain":
+            return text, "plain", None, None, self._encoded_for(None)
+        dict_id, dictionary = self.current_dictionary() or (None, None)
+        encoded_for = self._encoded_for(dict_id)
+        data = resume_codec.encode(text, self.codec, dictionary)
+        if len(data) >= len(text.encode("utf-8")):
+            # Incompressible (e.g. very short): stored plain.
+            return text, "plain", None, None, encoded_for
+        return "", self.codec, data, dict_id, encoded_for
+
+    def _version(self, row) -> ResumeVersion:
+        version_id, persistence_id, created_at, text, codec, data, dict_id = row
+        if codec != "plain":
+            text = resume_codec.decode(data, codec, self._dictionary(dict_id))
+        return ResumeVersion(version_id, persistence_id, created_at, text)
+
+    def _insert(
+        self,
+        conn: "sqlite3.Connection",
+        persistence_id: str,
+        text: str,
+        created_at: float,
+    ) -> int:
+        stored_text, codec, data, dict_id, encoded_for = self._encode(text)
+        cursor = conn.execute(
+            "INSERT INTO resume_versions (persistence_id, created_at, text, "
+            "codec, data, dict_id, content_hash, raw_bytes, encoded_for) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                persistence_id,
+                created_at,
+                stored_text,
+                codec,
+                data,
+                dict_id,
+                resume_codec.content_hash(text),
+                len(text.encode("utf-8")),
+                encoded_for,
+            ),
+        )
+        return int(cursor.lastrowid)
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+
+    def append(
+        self,
+        persistence_id: str,
+        text: str,
+        created_at: Optional[float] = None,
+    ) -> int:
+        """Store ``text`` as a new version and return its version id.
+
+        Text identical to the latest version is not stored again; the
+        latest version's id is returned instead. Older versions are not
+        compared: a return to earlier text is stored, so it is the latest.
+        """
+        return self.save(persistence_id, text, created_at)[0]
+
+    def save(
+        self,
+        persistence_id: str,
+        text: str,
+        created_at: Optional[float] = None,
+    ) -> Tuple[int, bool]:
+        """Like ``append``, but also return whether a version was stored."""
+        self._import_legacy(persistence_id)
+        digest = resume_codec.content_hash(text)
+        conn = self._connection()
+        with conn:
+            # Check and insert under the write lock (other processes too).
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                f"SELECT {_VERSION_COLUMNS}, content_hash FROM resume_versions "
+                "WHERE persistence_id = ? ORDER BY version_id DESC LIMIT 1",
+                (persistence_id,),
+            ).fetchone()
+            if row is not None:
+                latest_hash = row[-1]
+                if latest_hash is None:  # written before hashes were stored
+                    latest = self._version(row[:-1])
+                    latest_hash = resume_codec.content_hash(latest.text)
+                if latest_hash == digest:
+                    self.duplicates_skipped += 1
+                    return row[0], False
+            version_id = self._insert(
+                conn, persistence_id, text, created_at or time.time()
+            )
+        return version_id, True
+
+    def latest(self, persistence_id: str) -> Optional[ResumeVersion]:
+        """Return the most recent version, or None if nothing is stored."""
+        self._import_legacy(persistence_id)
+        row = self._connection().execute(
+            f"SELECT {_VERSION_COLUMNS} "
+            "FROM resume_versions WHERE persistence_id = ? "
+            "ORDER BY version_id DESC LIMIT 1",
+            (persistence_id,),
+        ).fetchone()
+        return self._version(row) if row else None
+
+    def history(
+        self,
+        persistence_id: str,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: Optional[int] = None,
+        newest_first: bool = False,
+    ) -> List[ResumeVersion]:
+        """Return stored versions, optionally filtered by time range.
+
+        ``limit`` always keeps the *newest* matching versions; the result
+        is ordered oldest-first unless ``newest_first`` is set.
+        """
+        self._import_legacy(persistence_id)
+        query = (
+            f"SELECT {_VERSION_COLUMNS} "
+            "FROM resume_versions WHERE persistence_id = ?"
+        )
+        params: list = [persistence_id]
+        if since is not None:
+            query += " AND created_at >= ?"
+            params.append(since)
+        if until is not None:
+            query += " AND created_at < ?"
+            params.append(until)
+        query += " ORDER BY version_id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        rows = [self._version(row) for row in self._connection().execute(query, params)]
+        if not newest_first:
+            rows.reverse()
+        return rows
+
+    def count(self, persistence_id: str) -> int:
+        self._import_legacy(persistence_id)
+        (n,) = self._connection().execute(
+            "SELECT COUNT(*) FROM resume_versions WHERE persistence_id = ?",
+            (persistence_id,),
+        ).fetchone()
+        return int(n)
+
+    def compact(self, persistence_id: str, keep: int = 1) -> int:
+        """Delete all but the newest ``keep`` versions; return rows removed."""
+        self._import_legacy(persistence_id)
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute(
+                "DELETE FROM resume_versions WHERE persistence_id = ? "
+                "AND version_id NOT IN ("
+                "  SELECT version_id FROM resume_versions WHERE persistence_id = ? "
+                "  ORDER BY version_id DESC LIMIT ?"
+                ")",
+                (persistence_id, persistence_id, max(0, keep)),
+            )
+        return cursor.rowcount
+
+    # -----------------------------
+    # Compression maintenance
+    # -----------------------------
+
+    def all_versions(self) -> Iterator[ResumeVersion]:
+        """Every stored version, oldest first (legacy files not imported)."""
+        rows = self._connection().execute(
+            f"SELECT {_VERSION_COLUMNS} FROM resume_versions ORDER BY version_id"
+        )
+        for row in rows:
+            yield self._version(row)
+
+    def sample_texts(self, limit: int = 1000) -> List[str]:
+        """The newest ``limit`` versions, for training a dictionary."""
+        rows = self._connection().execute(
+            f"SELECT {_VERSION_COLUMNS} FROM resume_versions "
+            "ORDER BY version_id DESC LIMIT ?",
+            (limit,),
+        )
+        return [self._version(row).text for row in rows]
+
+    def install_dictionary(self, data: bytes) -> int:
+        """Use ``data`` as the dictionary for new versions; return its id."""
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute(
+                "INSERT INTO dictionaries (codec, data, created_at) VALUES (?, ?, ?)",
+                (self.codec, data, time.time()),
+            )
+        dict_id = int(cursor.lastrowid)
+        self._dictionaries[dict_id] = data
+        self._current_dict = (dict_id, data)
+        self._current_dict_loaded = True
+        return dict_id
+
+    def recompress(self) -> int:
+        """Re-encode versions not encoded for the current codec and dictionary.
+
+        Rows that stayed plain because they did not compress are not
+        retried until the codec or dictionary changes, so a repeated run
+        rewrites nothing. Returns the number of rows rewritten. Does not
+        VACUUM: the freed pages are reused by later writes (see ``vacuum``).
+        """
+        dict_id = (self.current_dictionary() or (None, None))[0]
+        target = self._encoded_for(dict_id)
+        conn = self._connection()
+        rows = conn.execute(
+            f"SELECT {_VERSION_COLUMNS}, content_hash FROM resume_versions "
+            "WHERE encoded_for IS NOT ?",
+            (target,),
+        ).fetchall()
+        rewritten = 0
+        with conn:
+            for row in rows:
+                version_id, codec, row_dict_id, digest = row[0], row[4], row[6], row[7]
+                if codec == self.codec and row_dict_id == dict_id and digest:
+                    # Already in the target encoding, written before
+                    # encoded_for was recorded.
+                    conn.execute(
+                        "UPDATE resume_versions SET encoded_for = ? "
+                        "WHERE version_id = ?",
+                        (target, version_id),
+                    )
+                    continue
+                text = self._version(row[:-1]).text
+                stored_text, codec, data, new_dict_id, encoded_for = self._encode(text)
+                conn.execute(
+                    "UPDATE resume_versions SET text = ?, codec = ?, data = ?, "
+                    "dict_id = ?, content_hash = ?, raw_bytes = ?, encoded_for = ? "
+                    "WHERE version_id = ?",
+                    (
+                        stored_text,
+                        codec,
+                        data,
+                        new_dict_id,
+                        resume_codec.content_hash(text),
+                        len(text.encode("utf-8")),
+                        encoded_for,
+                        version_id,
+                    ),
+                )
+                rewritten += 1
+        return rewritten
+
+    def vacuum(self) -> None:
+        """Give free pages back to the filesystem."""
+        conn = self._connection()
+        conn.execute("VACUUM")
+        # In WAL mode VACUUM writes through the WAL; fold it back in.
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def usage(self) -> List[UserUsage]:
+        """Raw and stored bytes per persistence id."""
+        rows = self._connection().execute(
+            "SELECT persistence_id, COUNT(*), "
+            "SUM(COALESCE(raw_bytes, LENGTH(CAST(text AS BLOB)))), "
+            "SUM(LENGTH(CAST(text AS BLOB)) + COALESCE(LENGTH(data), 0)) "
+            "FROM resume_versions GROUP BY persistence_id ORDER BY persistence_id"
+        )
+        return [UserUsage(*row) for row in rows]
+
+    def file_bytes(self) -> int:
+        """Size of the database files (including WAL) on disk."""
+        return sum(
+            os.path.getsize(path)
+            for path in (self.db_path, self.db_path + "-wal")
+            if os.path.exists(path)
+        )
+
+
+def shard_of(persistence_id: str, shards: int) -> int:
+    """Stable shard index of ``persistence_id`` (independent of PYTHONHASHSEED)."""
+    digest = hashlib.sha256(persistence_id.encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "big") % max(1, shards)
+
+
+class ShardedResumeStore:
+    """``ResumeStore`` API over one SQLite database per hash shard.
+
+    Changing ``shards`` for an existing root moves ids to other shards;
+    re-run the migration command with the new count instead.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        shards: int = DEFAULT_SHARDS,
+        legacy_dir: str = RESUME_DIR,
+        codec: Optional[str] = None,
+    ):
+        self.root = root
+        self.shards = max(1, shards)
+        self.legacy_dir = legacy_dir
+        self._stores = [
+            ResumeStore(self.shard_path(i), legacy_dir, codec)
+            for i in range(self.shards)
+        ]
+        self.codec = self._stores[0].codec
+
+    def shard_path(self, index: int) -> str:
+        return os.path.join(self.root, f"{index:02x}", "resumes.db")
+
+    def shard_for(self, persistence_id: str) -> ResumeStore:
+        return self._stores[shard_of(persistence_id, self.shards)]
+
+    def _legacy_path(self, persistence_id: str) -> str:
+        return os.path.join(self.legacy_dir, f"{persistence_id}.txt")
+
+    def append(
+        self,
+        persistence_id: str,
+        text: str,
+        created_at: Optional[float] = None,
+    ) -> int:
+        return self.shard_for(persistence_id).append(persistence_id, text, created_at)
+
+    def save(
+        self,
+        persistence_id: str,
+        text: str,
+        created_at: Optional[float] = None,
+    ) -> Tuple[int, bool]:
+        return self.shard_for(persistence_id).save(persistence_id, text, created_at)
+
+    def latest(self, persistence_id: str) -> Optional[ResumeVersion]:
+        return self.shard_for(persistence_id).latest(persistence_id)
+
+    def history(self, persistence_id: str, **kwargs) -> List[ResumeVersion]:
+        return self.shard_for(persistence_id).history(persistence_id, **kwargs)
+
+    def count(self, persistence_id: str) -> int:
+        return self.shard_for(persistence_id).count(persistence_id)
+
+    def compact(self, persistence_id: str, keep: int = 1) -> int:
+        return self.shard_for(persistence_id).compact(persistence_id, keep=keep)
+
+    @property
+    def duplicates_skipped(self) -> int:
+        return sum(store.duplicates_skipped for store in self._stores)
+
+    def train_dictionary(
+        self, size: int = 16 * 1024, sample_limit: int = 1000
+    ) -> Optional[bytes]:
+        """Train one dictionary on all shards and install it in each.
+
+        Returns the dictionary, or None when there is too little data.
+        """
+        per_shard = max(1, sample_limit // self.shards)
+        samples = [t for store in self._stores for t in store.sample_texts(per_shard)]
+        data = resume_codec.train_dictionary(samples, self.codec, size)
+        if data:
+            for store in self._stores:
+                store.install_dictionary(data)
+        return data
+
+    def recompress(self, vacuum: bool = True) -> int:
+        rewritten = sum(store.recompress() for store in self._stores)
+        if vacuum:
+            for store in self._stores:
+                store.vacuum()
+        return rewritten
+
+    def usage(self) -> List[UserUsage]:
+        return sorted(u for store in self._stores for u in store.usage())
+
+    def file_bytes(self) -> int:
+        return sum(store.file_bytes() for store in self._stores)
+
+    def close(self) -> None:
+        for store in self._stores:
+            store.close()
+
+
+def default_storage_dir() -> str:
+    """``RESUME_STORAGE_DIR``, else a per-user data directory."""
+    configured = os.getenv("RESUME_STORAGE_DIR")
+    if configured:
+        return os.path.abspath(os.path.expanduser(configured))
+    data_home = os.getenv("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    return os.path.join(data_home, "resume_creater_memory")
+
+
+_store = ShardedResumeStore(
+    default_storage_dir(),
+    shards=int(os.getenv("RESUME_STORAGE_SHARDS", str(DEFAULT_SHARDS))),
+)
+
+# Serializes append + cache update per id, so concurrent sessions of one
+# user cannot leave the cached history in a different order than the DB.
+_key_locks = [threading.Lock() for _ in range(64)]
+
+
+def _key_lock(persistence_id: str) -> threading.Lock:
+    return _key_locks[shard_of(persistence_id, len(_key_locks))]
+
+
+# Repeat reads for the same user ("show my resume" turns) are served from
+# memory; save_resume keeps the cached views current.
+_cache = ResumeCache(
+    max_entries=int(os.getenv("RESUME_CACHE_MAX_ENTRIES", "1024")),
+    max_bytes=int(os.getenv("RESUME_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+)
+
+
+def _indexed_versions(persistence_id: str) -> List[Tuple[int, str]]:
+    return [(v.version_id, v.text) for v in _store.history(persistence_id)]
+
+
+# Section index for ``search_resume``; users are indexed on first search.
+_index = ResumeIndex(
+    _indexed_versions,
+    max_users=int(os.getenv("RESUME_INDEX_MAX_USERS", "1024")),
+)
+
+_VIEW_ALL = "all"
+_VIEW_LATEST = "latest"
+
+
+def get_resume_store() -> ShardedResumeStore:
+    """Return the process-wide store used by the module-level helpers."""
+    return _store
+
+
+def configure_storage(
+    root: Optional[str] = None,
+    shards: Optional[int] = None,
+    legacy_dir: Optional[str] = None,
+) -> ShardedResumeStore:
+    """Point the module-level helpers at another storage root.
+
+    Mainly for tests and benchmarks; clears the in-process cache.
+    """
+    global _store
+    _store.close()
+    _store = ShardedResumeStore(
+        root or default_storage_dir(),
+        shards=shards or _store.shards,
+        legacy_dir=legacy_dir or _store.legacy_dir,
+    )
+    _cache.clear()
+    _index.clear()
+    return _store
 
 
 def get_resume_path(session_id: str) -> str:
-    return os.path.join(RESUME_DIR, f"{session_id}.txt")
+    """Path of the legacy text file for ``session_id`` (kept for callers)."""
+    return _store._legacy_path(session_id)
 
 
 def save_resume(session_id: str, text: str):
-    """Append resume text to a file for this session/user.
+    """Store resume text as a new version for this session/user.
 
-    We *append* instead of overwriting so that multiple sessions for the
-    same logical user_id (or session_id) accumulate in a single file.
-    A simple separator is added between entries.
+    Versions accumulate per logical user_id (or session_id), exactly like
+    the old append-only file, but each one is a separate record. Saving
+    the latest version's text again is a no-op.
     """
-    path = get_resume_path(session_id)
-    # Ensure file exists and append with a separator
-    with open(path, "a", encoding="utf-8") as f:
-        if f.tell() != 0:
-            f.write("\n\n" + "-" * 40 + "\n\n")
-        f.write(text)
+    with _key_lock(session_id):
+        version_id, stored = _store.save(session_id, text)
+        if not stored:
+            return  # identical to the latest version
+        _index.add(session_id, version_id, text)
+        # Write-through for the raw views; derived views (see ``load_view``)
+        # are dropped and rebuilt on the next read.
+        previous_all = _cache.peek(session_id, _VIEW_ALL)
+        _cache.invalidate(session_id)
+        if previous_all is not None:
+            _cache.put(
+                session_id,
+                _VIEW_ALL,
+                previous_all + SEPARATOR + text if previous_all else text,
+            )
+        _cache.put(session_id, _VIEW_LATEST, text)
 
 
 def load_resume(session_id: str) -> str:
     """Loads *all* resume text for this session/user. Returns '' if not found."""
-    path = get_resume_path(session_id)
-    if os.path.exists(path):
-        with open(path, "r", encoding="utf-8") as f:
-            return f.read()
-    return ""
+    cached = _cache.get(session_id, _VIEW_ALL)
+    if cached is not None:
+        return cached
+    return _read_all(session_id)
+
+
+def load_latest_resume(session_id: str) -> str:
+    """Loads only the most recent resume. Returns '' if not found."""
+    cached = _cache.get(session_id, _VIEW_LATEST)
+    if cached is not None:
+        return cached
+    return _read_latest(session_id)
+
+
+# Readers below take the cache generation before reading storage, so a
+# save that lands mid-read is not overwritten by the older view.
+
+
+def _read_all(session_id: str) -> str:
+    generation = _cache.generation(session_id)
+    text = SEPARATOR.join(v.text for v in _store.history(session_id))
+    _cache.put(session_id, _VIEW_ALL, text, generation)
+    return text
+
+
+def _read_latest(session_id: str) -> str:
+    generation = _cache.generation(session_id)
+    latest = _store.latest(session_id)
+    text = latest.text if latest else ""
+    _cache.put(session_id, _VIEW_LATEST, text, generation)
+    return text
+
+
+def load_view(session_id: str, view: str, loader: Callable[[], str]) -> str:
+    """Return a cached derived view of this user's resumes.
+
+    ``loader`` builds the text on a miss; the result is cached under
+    ``view`` until the next ``save_resume`` for the same id.
+    """
+    cached = _cache.get(session_id, view)
+    if cached is not None:
+        return cached
+    generation = _cache.generation(session_id)
+    text = loader()
+    _cache.put(session_id, view, text, generation)
+    return text
+
+
+def load_resume_history(
+    session_id: str,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    limit: Optional[int] = None,
+) -> List[ResumeVersion]:
+    """Return stored versions for this session/user, oldest first."""
+    return _store.history(session_id, since=since, until=until, limit=limit)
+
+
+def compact_resumes(session_id: str, keep: int = 1) -> int:
+    """Drop old versions, keeping the newest ``keep``. Returns rows removed."""
+    with _key_lock(session_id):
+        removed = _store.compact(session_id, keep=keep)
+        if removed:
+            _cache.invalidate(session_id)
+            _index.invalidate(session_id)
+    return removed
+
+
+def search_resume(session_id: str, query: str, k: int = 4) -> List[Section]:
+    """Top ``k`` stored sections for ``query`` (best first, [] if none)."""
+    return _index.search(session_id, query, k)
+
+
+# -----------------------------
+# Async API (thread-pool offload)
+# -----------------------------
+
+# A dedicated pool keeps storage I/O from competing with (or starving) the
+# default executor used by ADK and other libraries.
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("RESUME_STORAGE_WORKERS", "4")),
+                    thread_name_prefix="resume-storage",
+                )
+    return _executor
+
+
+async def _run_in_storage_thread(fn, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), fn, *args)
+
+
+async def async_save_resume(session_id: str, text: str) -> None:
+    """Async version of ``save_resume``; the write runs on a worker thread."""
+    await _run_in_storage_thread(save_resume, session_id, text)
+
+
+async def async_load_resume(session_id: str) -> str:
+    """Async version of ``load_resume``. Cache hits never leave the loop."""
+    cached = _cache.get(session_id, _VIEW_ALL)
+    if cached is not None:
+        return cached
+    return await _run_in_storage_thread(_read_all, session_id)
+
+
+async def async_load_latest_resume(session_id: str) -> str:
+    """Async version of ``load_latest_resume``."""
+    cached = _cache.get(session_id, _VIEW_LATEST)
+    if cached is not None:
+        return cached
+    return await _run_in_storage_thread(_read_latest, session_id)
+
+
+async def async_load_view(
+    session_id: str, view: str, loader: Callable[[], str]
+) -> str:
+    """Async version of ``load_view``; ``loader`` runs on a worker thread."""
+    cached = _cache.get(session_id, view)
+    if cached is not None:
+        return cached
+    generation = _cache.generation(session_id)
+    text = await _run_in_storage_thread(loader)
+    _cache.put(session_id, view, text, generation)
+    return text
+
+
+async def async_search_resume(
+    session_id: str, query: str, k: int = 4
+) -> List[Section]:
+    """Async version of ``search_resume``; only a first search reads storage."""
+    if _index.indexed(session_id):
+        return _index.search(session_id, query, k)
+    return await _run_in_storage_thread(_index.search, session_id, query, k)
+
+
+def get_index_stats() -> Dict[str, int]:
+    """Searches, builds and size of the section index."""
+    return _index.stats()
+
+
+def get_cache_stats() -> Dict[str, int]:
+    """Hit/miss/eviction counters of the in-process resume cache."""
+    return _cache.stats()
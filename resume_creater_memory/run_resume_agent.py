@@ -8,9 +8,13 @@ Usage (from project root):
 You can then:
 - Press Enter to start a NEW session, or
 - Paste an existing session_id to continue a previous session.
+
+The resume is streamed to the terminal as it is generated; pass
+``--no-stream`` to print it only once it is complete.
 """
 
 import asyncio
+import sys
 
 from resume_creater_memory.agent import run_resume_agent
 
@@ -39,15 +43,26 @@ async def main() -> None:
         print("No candidate info provided. Exiting.")
         return
 
+    stream = "--no-stream" not in sys.argv[1:]
+
+    def print_chunk(chunk: str) -> None:
+        print(chunk, end="", flush=True)
+
+    if stream:
+        print("\n=== Generated Resume ===\n")
+
     response, session_id = await run_resume_agent(
         candidate_info=candidate_info,
         session_id=session_id,
+        on_chunk=print_chunk if stream else None,
     )
 
-    print("\n=== Session ID ===")
+    if not stream:
+        print("\n=== Generated Resume ===\n")
+        print(response.content.parts[0].text)
+
+    print("\n\n=== Session ID ===")
     print(session_id)
-    print("\n=== Generated Resume ===\n")
-    print(response.content.parts[0].text)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,166 @@
+"""Long-lived service for generating resumes with memory.
+
+``run_resume_agent`` builds a fresh ``Runner`` and session service on
+every call, which is fine for the CLI but wasteful when serving traffic.
+``ResumeAgentService`` is created once and shared: it keeps one runner,
+one session service and one resolved model (so the model's HTTP client
+and its connection pool are reused) for all requests. Each request gets
+its own short-lived session, so any number of users can be served
+concurrently.
+
+    service = ResumeAgentService(max_concurrency=32)
+    text = await service.generate("alice", "Skills: Python, SQL")
+    ...
+    await service.close()
+"""
+
+import asyncio
+import logging
+import uuid
+from typing import Dict, Optional
+
+from google.adk.agents import LlmAgent
+from google.adk.models import BaseLlm, LLMRegistry
+from google.adk.runners import Runner
+from google.adk.sessions import BaseSessionService, InMemorySessionService
+
+from . import prompt
+from .agent import (
+    _APP_NAME,
+    ChunkHandler,
+    _run_and_collect,
+    resume_generator_agent,
+)
+from .memory_policy import async_build_memory
+from callback_logging import configure_logging
+
+
+def _with_resolved_model(agent: LlmAgent) -> LlmAgent:
+    """Return ``agent`` with its model name resolved to one shared instance.
+
+    Older ADK releases resolve a string model to a new ``BaseLlm`` (and a
+    new HTTP client) on every call; a resolved instance is reused.
+    """
+    if isinstance(agent.model, BaseLlm) or not agent.model:
+        return agent
+    return agent.clone(update={"model": LLMRegistry.new_llm(agent.model)})
+
+
+class ResumeAgentService:
+    """Shared runner for ``resume_generator_agent``.
+
+    ``max_concurrency`` bounds how many generations run at once (None = no
+    limit); extra callers wait for a slot instead of piling up requests on
+    the model. Sessions are deleted after each request unless
+    ``keep_sessions`` is set, so memory stays flat under load; the resume
+    itself is persisted by the agent's callback as usual.
+    """
+
+    def __init__(
+        self,
+        agent: Optional[LlmAgent] = None,
+        session_service: Optional[BaseSessionService] = None,
+        app_name: str = _APP_NAME,
+        max_concurrency: Optional[int] = None,
+        keep_sessions: bool = False,
+    ):
+        self.agent = _with_resolved_model(agent or resume_generator_agent)
+        self.session_service = session_service or InMemorySessionService()
+        self.app_name = app_name
+        self.keep_sessions = keep_sessions
+        self.runner = Runner(
+            app_name=app_name,
+            agent=self.agent,
+            session_service=self.session_service,
+        )
+        self._semaphore = (
+            asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        )
+        self._stats = {"requests": 0, "failures": 0, "active": 0}
+
+    async def generate(
+        self,
+        user_id: str,
+        candidate_info: str,
+        on_chunk: Optional[ChunkHandler] = None,
+    ) -> str:
+        """Generate (and persist) a resume for ``user_id``; return its text.
+
+        Stored memory for ``user_id`` is injected the same way as in
+        ``run_resume_agent``. ``on_chunk`` streams partial text.
+        """
+        if self._semaphore is None:
+            return await self._generate(user_id, candidate_info, on_chunk)
+        async with self._semaphore:
+            return await self._generate(user_id, candidate_info, on_chunk)
+
+    async def _generate(
+        self,
+        user_id: str,
+        candidate_info: str,
+        on_chunk: Optional[ChunkHandler],
+    ) -> str:
+        configure_logging()
+        self._stats["requests"] += 1
+        self._stats["active"] += 1
+        session_id = str(uuid.uuid4())
+        try:
+            previous_resume = await async_build_memory(
+                user_id, query=candidate_info
+            )
+            logging.info(
+                f"[memory for {user_id}]: injected "
+                f"{len(previous_resume.encode('utf-8'))} bytes"
+            )
+            await self.session_service.create_session(
+                app_name=self.app_name,
+                user_id=user_id,
+                session_id=session_id,
+                state={
+                    "user_id": user_id,
+                    "session_id": session_id,
+                    "previous_resume": previous_resume,
+                },
+            )
+            message = prompt.build_prompt_suffix(previous_resume, candidate_info)
+            response = await _run_and_collect(
+                self.runner, user_id, session_id, message, on_chunk
+            )
+        except Exception:
+            self._stats["failures"] += 1
+            raise
+        finally:
+            self._stats["active"] -= 1
+            if not self.keep_sessions:
+                await self._delete_session(user_id, session_id)
+
+        parts = response.content.parts if response.content else None
+        return "".join(p.text for p in parts or [] if p.text)
+
+    async def _delete_session(self, user_id: str, session_id: str) -> None:
+        try:
+            await self.session_service.delete_session(
+                app_name=self.app_name, user_id=user_id, session_id=session_id
+            )
+        except Exception as e:  # never mask the request's own outcome
+            logging.warning(f"[resume service] could not delete {session_id}: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self._stats)
+
+    async def close(self) -> None:
+        """Release the runner's resources (model clients, plugins)."""
+        close = getattr(self.runner, "close", None)
+        if close is not None:
+            await close()
+
+
+_default_service: Optional[ResumeAgentService] = None
+
+
+def get_resume_service() -> ResumeAgentService:
+    """Process-wide service, created on first use."""
+    global _default_service
+    if _default_service is None:
+        _default_service = ResumeAgentService()
+    return _default_service
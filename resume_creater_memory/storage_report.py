@@ -0,0 +1,96 @@
+"""Report stored bytes per user, and optionally compress existing versions.
+
+For every persistence id: number of versions, raw text bytes and bytes as
+stored. ``--train-dictionary`` trains a shared dictionary on the stored
+resumes; ``--recompress`` re-encodes the versions not yet encoded for the
+current codec and dictionary (rows written before compression existed are
+plain text) and vacuums the databases. When either is given, the report is printed
+before and after.
+
+Usage (from project root):
+
+    python -m resume_creater_memory.storage_report
+    python -m resume_creater_memory.storage_report --train-dictionary --recompress
+"""
+
+import argparse
+import os
+from typing import List, Optional
+
+from .resume_storage import (
+    DEFAULT_SHARDS,
+    ShardedResumeStore,
+    UserUsage,
+    default_storage_dir,
+)
+
+
+def _ratio(raw: int, stored: int) -> str:
+    return f"{stored / raw:.2f}" if raw else "-"
+
+
+def print_report(
+    usage: List[UserUsage], file_bytes: int, top: int, title: str
+) -> None:
+    print(f"== {title}")
+    print(
+        f"{'persistence id':<32}{'versions':>9}{'raw B':>12}{'stored B':>12}"
+        f"{'ratio':>7}"
+    )
+    for row in sorted(usage, key=lambda u: u.stored_bytes, reverse=True)[:top]:
+        print(
+            f"{row.persistence_id[:31]:<32}{row.versions:>9}{row.raw_bytes:>12}"
+            f"{row.stored_bytes:>12}{_ratio(row.raw_bytes, row.stored_bytes):>7}"
+        )
+    if len(usage) > top:
+        print(f"... {len(usage) - top} more")
+    raw = sum(u.raw_bytes for u in usage)
+    stored = sum(u.stored_bytes for u in usage)
+    versions = sum(u.versions for u in usage)
+    print(
+        f"{'total (' + str(len(usage)) + ' users)':<32}{versions:>9}{raw:>12}"
+        f"{stored:>12}{_ratio(raw, stored):>7}"
+    )
+    if usage:
+        print(f"stored bytes per user: {stored // len(usage)}")
+    print(f"database files on disk: {file_bytes} bytes\n")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--root", help="storage root (default: RESUME_STORAGE_DIR)")
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=int(os.getenv("RESUME_STORAGE_SHARDS", str(DEFAULT_SHARDS))),
+    )
+    parser.add_argument("--codec", help="default: RESUME_STORAGE_CODEC or zlib")
+    parser.add_argument("--train-dictionary", action="store_true")
+    parser.add_argument("--dictionary-size", type=int, default=16 * 1024)
+    parser.add_argument("--recompress", action="store_true")
+    parser.add_argument("--top", type=int, default=20, help="users to list")
+    args = parser.parse_args(argv)
+
+    store = ShardedResumeStore(
+        args.root or default_storage_dir(), shards=args.shards, codec=args.codec
+    )
+    changing = args.train_dictionary or args.recompress
+    print_report(
+        store.usage(), store.file_bytes(), args.top, "before" if changing else "usage"
+    )
+    if args.train_dictionary:
+        data = store.train_dictionary(size=args.dictionary_size)
+        print(
+            f"trained a {len(data)}-byte {store.codec} dictionary\n"
+            if data
+            else "not enough stored resumes to train a dictionary\n"
+        )
+    if args.recompress:
+        print(f"re-encoded {store.recompress()} versions\n")
+    if changing:
+        print_report(store.usage(), store.file_bytes(), args.top, "after")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
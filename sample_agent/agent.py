@@ -1,7 +1,10 @@
 from google.adk.agents.llm_agent import Agent
 
+from model_routing import routed_model
+
 root_agent = Agent(
-    model="gemini-2.5-flash-lite",
+    # MODEL_ROUTING can pick a model per request, see model_routing.py
+    model=routed_model("root_agent", "gemini-2.5-flash-lite"),
     name="root_agent",
     description="A helpful assistant for user questions.",
     instruction="Answer user questions to the best of your knowledge",
@@ -0,0 +1,164 @@
+"""Tests for the reviser's end-of-edit handling.
+
+Run from the project root: ``python -m unittest discover tests``.
+"""
+
+import asyncio
+import os
+import unittest
+from typing import AsyncGenerator
+
+os.environ.setdefault("MODEL", "gemini-fake")
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.genai import types
+
+import model_routing
+from llm_auditor.sub_agents.reviser import agent as reviser
+from llm_auditor.sub_agents.reviser.end_of_edit import (
+    END_OF_EDIT_KEY,
+    END_OF_EDIT_MARK,
+    TOKENS_AFTER_MARK_KEY,
+    EndOfEditLlm,
+    MarkScanner,
+    finish_response,
+    supports_stop_sequences,
+)
+from model_routing import ModelRouter, RoutedLlm, Tier
+
+_STOP_CONFIG = types.GenerateContentConfig(stop_sequences=[END_OF_EDIT_MARK])
+
+
+def _response(text, finish_reason=types.FinishReason.STOP):
+    return LlmResponse(
+        content=types.Content(role="model", parts=[types.Part(text=text)]),
+        finish_reason=finish_reason,
+    )
+
+
+class FinishResponseTest(unittest.TestCase):
+    def test_mark_in_text_is_trimmed(self):
+        response = finish_response(_response(f"fixed {END_OF_EDIT_MARK} more words"))
+        self.assertEqual(response.content.parts[0].text, "fixed ")
+        self.assertEqual(response.custom_metadata[END_OF_EDIT_KEY], "trimmed")
+        self.assertGreater(response.custom_metadata[TOKENS_AFTER_MARK_KEY], 0)
+
+    def test_stop_at_configured_mark(self):
+        response = finish_response(_response("fixed"), _STOP_CONFIG)
+        self.assertEqual(response.custom_metadata[END_OF_EDIT_KEY], "stop_sequence")
+        self.assertEqual(response.custom_metadata[TOKENS_AFTER_MARK_KEY], 0)
+
+    def test_token_limit_is_not_a_stop_sequence(self):
+        response = finish_response(
+            _response("fixed", types.FinishReason.MAX_TOKENS), _STOP_CONFIG
+        )
+        self.assertEqual(response.custom_metadata[END_OF_EDIT_KEY], "max_tokens")
+
+    def test_no_stop_sequence_configured(self):
+        response = finish_response(_response("fixed"))
+        self.assertEqual(response.custom_metadata[END_OF_EDIT_KEY], "no_mark")
+
+
+class SupportsStopSequencesTest(unittest.TestCase):
+    def tearDown(self):
+        model_routing.set_model_router(None)
+
+    def test_model_names(self):
+        self.assertTrue(supports_stop_sequences("gemini-2.5-flash"))
+        self.assertFalse(supports_stop_sequences("other-model"))
+        self.assertFalse(supports_stop_sequences(None))
+
+    def test_routed_model_needs_every_tier(self):
+        model_routing.set_model_router(
+            ModelRouter([Tier("lite", "gemini-2.5-flash", 10), Tier("big", "other")])
+        )
+        routed = RoutedLlm(model="gemini-2.5-pro", agent="reviser_agent")
+        self.assertFalse(supports_stop_sequences(routed))
+        model_routing.set_model_router(ModelRouter([Tier("std", "gemini-2.5-flash")]))
+        self.assertTrue(supports_stop_sequences(routed))
+
+    def test_wrapper_is_resolved(self):
+        wrapped = EndOfEditLlm.wrap(RoutedLlm(model="other", agent="reviser_agent"))
+        self.assertFalse(supports_stop_sequences(wrapped))
+
+
+class _ChunkLlm(BaseLlm):
+    """Streams ``chunks`` as partial responses, then the joined text."""
+
+    chunks: list
+    sent: int = 0
+    closed: bool = False
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        try:
+            for chunk in self.chunks:
+                self.sent += 1
+                response = _response(chunk)
+                response.partial = True
+                yield response
+            yield _response("".join(self.chunks))
+        finally:
+            self.closed = True
+
+
+class MarkScannerTest(unittest.TestCase):
+    def test_mark_split_across_chunks(self):
+        scanner = MarkScanner()
+        emitted = [
+            scanner.feed("fixed text ---EN"),
+            scanner.feed("D-OF-"),
+            scanner.feed("EDIT--- and more"),
+            scanner.feed(" words"),
+        ]
+        self.assertEqual(emitted, ["fixed text ", "", "", ""])
+        self.assertTrue(scanner.found)
+        self.assertEqual(scanner.after_mark, len(" and more words"))
+
+    def test_held_back_prefix_is_released(self):
+        scanner = MarkScanner()
+        self.assertEqual(scanner.feed("a --"), "a ")
+        self.assertEqual(scanner.feed("-x"), "---x")
+        self.assertFalse(scanner.found)
+
+
+class StreamCutTest(unittest.TestCase):
+    def _stream(self, chunks):
+        inner = _ChunkLlm(model="gemini-fake", chunks=chunks)
+        llm = EndOfEditLlm.wrap(inner)
+
+        async def run():
+            return [r async for r in llm.generate_content_async(LlmRequest(), True)]
+
+        return inner, asyncio.run(run())
+
+    def test_stream_stops_at_mark(self):
+        chunks = ["fixed ", "text ---END-", "OF-EDIT--- trailing", " more", " more"]
+        inner, responses = self._stream(chunks)
+        self.assertEqual(inner.sent, 3)  # nothing requested after the mark
+        self.assertTrue(inner.closed)
+        partial_text = "".join(r.content.parts[0].text for r in responses if r.partial)
+        self.assertEqual(partial_text, "fixed text ")
+        final = responses[-1]
+        self.assertFalse(final.partial)
+        self.assertEqual(final.content.parts[0].text, "fixed text ")
+        self.assertEqual(final.custom_metadata[END_OF_EDIT_KEY], "stream_cut")
+
+    def test_stream_without_mark_is_finished_normally(self):
+        inner, responses = self._stream(["fixed ", "text"])
+        self.assertEqual(responses[-1].content.parts[0].text, "fixed text")
+        self.assertEqual(responses[-1].custom_metadata[END_OF_EDIT_KEY], "no_mark")
+
+
+class AddStopSequenceTest(unittest.TestCase):
+    def test_mark_is_added_once(self):
+        self.assertTrue(reviser._stop_sequence)  # MODEL is a gemini model here
+        request = LlmRequest(config=types.GenerateContentConfig(stop_sequences=["x"]))
+        reviser._add_stop_sequence(None, request)
+        reviser._add_stop_sequence(None, request)
+        self.assertEqual(request.config.stop_sequences, ["x", END_OF_EDIT_MARK])
+
+
+if __name__ == "__main__":
+    unittest.main()
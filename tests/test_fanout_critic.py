@@ -0,0 +1,108 @@
+"""Tests for the fan-out critic's claim verification.
+
+Run from the project root: ``python -m unittest discover tests``.
+"""
+
+import asyncio
+import json
+import os
+import time
+import unittest
+from typing import AsyncGenerator, List
+
+os.environ.setdefault("MODEL", "gemini-fake")
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from fake_llm import install_fake_llm
+from llm_auditor.sub_agents.critic.fanout import critic_fanout_agent
+from llm_auditor.sub_agents.critic.verdict import CRITIC_VERDICT_KEY
+
+_SLOW = 0.5
+_FAST = 0.05
+
+
+class _ClaimLlm(BaseLlm):
+    """Extracts ``claims``; verifies "slow" claims in ``_SLOW`` seconds."""
+
+    model: str = "gemini-fake"
+    claims: List[str] = []
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        instruction = str(llm_request.config.system_instruction or "")
+        if "extract every distinct CLAIM" in instruction:
+            text = json.dumps(self.claims)
+        else:
+            await asyncio.sleep(_SLOW if "slow" in instruction else _FAST)
+            text = "Verdict: Accurate\nJustification: checked."
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=text)])
+        )
+
+
+async def _critique(claims: List[str], max_concurrency: int):
+    agent = critic_fanout_agent.model_copy(update={"max_concurrency": max_concurrency})
+    install_fake_llm(agent, _ClaimLlm(claims=claims))
+    runner = InMemoryRunner(agent=agent, app_name="test")
+    session = await runner.session_service.create_session(
+        app_name="test", user_id="u"
+    )
+    events = []
+    started = time.perf_counter()
+    async for event in runner.run_async(
+        user_id="u",
+        session_id=session.id,
+        new_message=types.Content(
+            role="user", parts=[types.Part(text="Question: q\nAnswer: a")]
+        ),
+    ):
+        events.append(event)
+    elapsed = time.perf_counter() - started
+    session = await runner.session_service.get_session(
+        app_name="test", user_id="u", session_id=session.id
+    )
+    return events, session.state, elapsed
+
+
+class FanoutCriticTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        asyncio.run(_critique(["warm-up"], 1))  # first-run setup is not timed
+
+    def test_finished_verifier_frees_its_slot(self):
+        # Batches of two would take _SLOW + 3 * _FAST; a sliding window
+        # runs the six fast claims beside the slow one.
+        claims = ["slow claim"] + [f"fast claim {i}" for i in range(6)]
+        events, state, elapsed = asyncio.run(_critique(claims, 2))
+        self.assertLess(elapsed, _SLOW + 2 * _FAST)
+        self.assertTrue(state[CRITIC_VERDICT_KEY]["all_accurate"])
+        findings = events[-1].content.parts[0].text
+        self.assertEqual(findings.count("Verdict: Accurate"), len(claims))
+
+    def test_verifiers_run_on_their_own_branches(self):
+        events, _, _ = asyncio.run(_critique(["one", "two"], 4))
+        branches = {
+            e.branch for e in events if e.author.startswith("claim_verifier_")
+        }
+        self.assertEqual(
+            branches,
+            {"critic_agent.claim_verifier_0", "critic_agent.claim_verifier_1"},
+        )
+
+    def test_no_claims_is_not_accurate(self):
+        with self.assertLogs(level="WARNING"):
+            _, state, _ = asyncio.run(_critique([], 4))
+        verdict = state[CRITIC_VERDICT_KEY]
+        self.assertFalse(verdict["all_accurate"])
+        self.assertEqual(verdict["overall"], "unsupported")
+
+    def test_verifier_template_is_a_sub_agent(self):
+        self.assertIsNotNone(critic_fanout_agent.find_sub_agent("claim_verifier_agent"))
+
+
+if __name__ == "__main__":
+    unittest.main()
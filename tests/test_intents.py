@@ -0,0 +1,93 @@
+"""Tests for the resume agent's retrieval-intent fast path.
+
+Run from the project root: ``python -m unittest discover tests``.
+"""
+
+import asyncio
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+from google.adk.models import LlmRequest
+from google.genai import types
+
+from resume_creater_memory import intents, resume_storage
+from resume_creater_memory.intents import (
+    DEFAULT_INTENTS,
+    IntentTable,
+    answer_retrieval_intent,
+)
+
+
+def _request(text: str) -> LlmRequest:
+    return LlmRequest(
+        contents=[types.Content(role="user", parts=[types.Part(text=text)])]
+    )
+
+
+def _context(user_id: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        state={"user_id": user_id},
+        agent_name="resume_generator_agent",
+        invocation_id="inv",
+    )
+
+
+class IntentTableTest(unittest.TestCase):
+    def setUp(self):
+        self.table = IntentTable(DEFAULT_INTENTS)
+
+    def test_retrieval_commands(self):
+        self.assertEqual(self.table.match("Show my resume!"), "latest")
+        self.assertEqual(self.table.match("what's my current CV"), "latest")
+        self.assertEqual(self.table.match("list all my resumes"), "history")
+
+    def test_other_messages_go_to_the_model(self):
+        self.assertIsNone(self.table.match("update my resume with Go"))
+        self.assertIsNone(self.table.match("show my resume " + "x" * 300))
+
+    def test_unknown_intent_is_rejected(self):
+        with self.assertRaises(ValueError):
+            IntentTable({"delete": ["delete my resume"]})
+
+
+class AnswerRetrievalIntentTest(unittest.TestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        resume_storage.configure_storage(root=root, legacy_dir=root)
+        intents.set_intent_table(IntentTable(DEFAULT_INTENTS))
+        self.addCleanup(intents.set_intent_table, None)
+
+    def test_latest_is_served_from_storage(self):
+        resume_storage.save_resume("u", "v1")
+        resume_storage.save_resume("u", "v2")
+        context = _context("u")
+        avoided = intents.get_intent_stats()["latest"]
+        response = asyncio.run(
+            answer_retrieval_intent(context, _request("show my resume"))
+        )
+        self.assertEqual(response.content.parts[0].text, "v2")
+        self.assertEqual(context.state["previous_resume"], "v2")
+        self.assertEqual(intents.get_intent_stats()["latest"], avoided + 1)
+
+    def test_history_lists_every_version(self):
+        resume_storage.save_resume("h", "v1")
+        resume_storage.save_resume("h", "v2")
+        response = asyncio.run(
+            answer_retrieval_intent(_context("h"), _request("show all my resumes"))
+        )
+        text = response.content.parts[0].text
+        self.assertIn("v1", text)
+        self.assertIn("v2", text)
+
+    def test_nothing_stored_goes_to_the_model(self):
+        response = asyncio.run(
+            answer_retrieval_intent(_context("nobody"), _request("show my resume"))
+        )
+        self.assertIsNone(response)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+"""Tests for per-request model routing.
+
+Run from the project root: ``python -m unittest discover tests``.
+"""
+
+import asyncio
+import time
+import unittest
+from typing import AsyncGenerator
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.genai import types
+
+import model_routing
+from model_routing import ModelRouter, RoutedLlm, Tier
+
+_TIERS = [
+    Tier("lite", "lite-model", max_input_chars=100),
+    Tier("standard", "standard-model", max_input_chars=1000, max_latency=2.0),
+    Tier("pro", "pro-model"),
+]
+
+
+def _router(**kwargs) -> ModelRouter:
+    return ModelRouter(_TIERS, **kwargs)
+
+
+def _request(text: str) -> LlmRequest:
+    return LlmRequest(
+        model="configured-model",
+        contents=[types.Content(role="user", parts=[types.Part(text=text)])],
+    )
+
+
+class _ScriptedLlm(BaseLlm):
+    """Answers with its model name, or fails when ``fail`` is set."""
+
+    fail: bool = False
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if self.fail:
+            raise RuntimeError("model unavailable")
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=self.model)])
+        )
+
+
+class ChooseTest(unittest.TestCase):
+    def test_smallest_tier_that_fits(self):
+        router = _router()
+        self.assertEqual(router.choose("a", 10).name, "lite")
+        self.assertEqual(router.choose("a", 101).name, "standard")
+        self.assertEqual(router.choose("a", 5000).name, "pro")
+
+    def test_agent_tiers(self):
+        router = _router(agents={"critic": ["pro"], "root": []})
+        self.assertEqual(router.choose("critic", 10).name, "pro")
+        self.assertIsNone(router.choose("root", 10))
+        with self.assertRaises(ValueError):
+            _router(agents={"critic": ["huge"]})
+
+    def test_failing_tier_falls_back_to_next(self):
+        router = _router(min_samples=3)
+        for _ in range(2):
+            router.record("a", _TIERS[0], 0.1, ok=False)
+        self.assertEqual(router.choose("a", 10).name, "lite")  # too few samples
+        router.record("a", _TIERS[0], 0.1, ok=False)
+        self.assertEqual(router.choose("a", 10).name, "standard")
+        self.assertEqual(router.choose("b", 10).name, "lite")  # per agent
+
+    def test_slow_tier_falls_back_to_next(self):
+        router = _router(min_samples=1)
+        router.record("a", _TIERS[1], 5.0, ok=True)
+        self.assertEqual(router.choose("a", 500).name, "pro")
+
+    def test_all_unhealthy_keeps_size_choice(self):
+        router = _router(min_samples=1)
+        for tier in _TIERS[1:]:
+            router.record("a", tier, 0.1, ok=False)
+        self.assertEqual(router.choose("a", 500).name, "standard")
+
+    def test_window_forgets_old_errors(self):
+        router = _router(min_samples=1, window_seconds=0.01)
+        router.record("a", _TIERS[0], 0.1, ok=False)
+        self.assertEqual(router.choose("a", 10).name, "standard")
+        time.sleep(0.02)
+        self.assertEqual(router.choose("a", 10).name, "lite")
+
+
+class RoutedLlmTest(unittest.TestCase):
+    def setUp(self):
+        self.router = _router(min_samples=1)
+        model_routing.set_model_router(self.router)
+        self.addCleanup(model_routing.set_model_router, None)
+        self.llm = RoutedLlm(model="configured-model", agent="a")
+        for tier in _TIERS:
+            self.llm._delegates[tier.model] = _ScriptedLlm(model=tier.model)
+
+    def _generate(self, text: str):
+        async def run():
+            request = _request(text)
+            responses = [r async for r in self.llm.generate_content_async(request)]
+            return request, responses
+
+        return asyncio.run(run())
+
+    def test_request_goes_to_chosen_tier(self):
+        request, responses = self._generate("short")
+        self.assertEqual(request.model, "lite-model")
+        self.assertEqual(responses[0].content.parts[0].text, "lite-model")
+        self.assertEqual(self.router.stats()["a/lite"]["calls"], 1)
+
+    def test_error_is_recorded_and_next_request_falls_back(self):
+        self.llm._delegates["lite-model"].fail = True
+        with self.assertRaises(RuntimeError):
+            self._generate("short")
+        self.assertEqual(self.router.stats()["a/lite"]["errors"], 1)
+        request, _ = self._generate("short")
+        self.assertEqual(request.model, "standard-model")
+
+    def test_unrouted_agent_is_not_wrapped(self):
+        model_routing.set_model_router(_router(agents={"root": []}))
+        self.assertEqual(
+            model_routing.routed_model("root", "configured-model"), "configured-model"
+        )
+        self.assertIsInstance(model_routing.routed_model("a", "m"), RoutedLlm)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+"""Tests for the nearest-rank ``percentile`` used by the benchmarks.
+
+Run from the project root: ``python -m unittest discover tests``.
+"""
+
+import unittest
+
+from callback_metrics import percentile
+
+
+class PercentileTest(unittest.TestCase):
+    def test_empty(self):
+        self.assertEqual(percentile([], 50), 0.0)
+
+    def test_odd_count(self):
+        values = [5, 1, 4, 2, 3]
+        self.assertEqual(percentile(values, 50), 3)
+        self.assertEqual(percentile(values, 95), 5)
+        self.assertEqual(percentile(values, 0), 1)
+        self.assertEqual(percentile(values, 100), 5)
+
+    def test_even_count(self):
+        values = [1, 2, 3, 4]
+        self.assertEqual(percentile(values, 50), 2)
+        self.assertEqual(percentile(values, 75), 3)
+        self.assertEqual(percentile(values, 95), 4)
+
+    def test_small_n_tail(self):
+        values = list(range(1, 11))
+        self.assertEqual(percentile(values, 95), 10)
+        self.assertEqual(percentile(values, 90), 9)
+        self.assertEqual(percentile([1.0, 9.0], 95), 9.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+"""Tests for the response cache and its request coalescing (singleflight).
+
+Run from the project root: ``python -m unittest discover tests``.
+"""
+
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from response_cache import CACHE_OUTCOME_KEY, InMemoryResponseBackend, ResponseCache
+
+
+def _context(invocation_id: str):
+    return SimpleNamespace(invocation_id=invocation_id, agent_name="search_agent")
+
+
+def _request(text: str = "who won the 2022 world cup?") -> LlmRequest:
+    return LlmRequest(
+        model="gemini-fake",
+        contents=[types.Content(role="user", parts=[types.Part(text=text)])],
+    )
+
+
+def _response(text: str = "Argentina", error_code=None) -> LlmResponse:
+    return LlmResponse(
+        content=types.Content(role="model", parts=[types.Part(text=text)]),
+        error_code=error_code,
+    )
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = ResponseCache(InMemoryResponseBackend(), coalesce_timeout=5)
+
+    def run_async(self, coro):
+        return asyncio.run(asyncio.wait_for(coro, 5))
+
+    async def _waiters(self, n: int):
+        """Start ``n`` duplicates of a request that is already in flight."""
+        tasks = [
+            asyncio.create_task(
+                self.cache.lookup_async(_context(f"dup-{i}"), _request())
+            )
+            for i in range(n)
+        ]
+        await asyncio.sleep(0.01)  # let them find the leader's call
+        self.assertFalse(any(task.done() for task in tasks))
+        return tasks
+
+    def test_hit_after_store(self):
+        self.assertIsNone(self.cache.lookup(_context("a"), _request()))
+        self.cache.store(_context("a"), _response())
+        # Whitespace is normalized away.
+        hit = self.cache.lookup(_context("b"), _request("who won  the 2022 world cup?"))
+        self.assertEqual(hit.content.parts[0].text, "Argentina")
+        self.assertEqual(hit.custom_metadata[CACHE_OUTCOME_KEY], "hit")
+
+    def test_duplicates_wait_for_the_leader(self):
+        async def scenario():
+            self.assertIsNone(await self.cache.lookup_async(_context("a"), _request()))
+            tasks = await self._waiters(3)
+            self.cache.store(_context("a"), _response())
+            return await asyncio.gather(*tasks)
+
+        responses = self.run_async(scenario())
+        for response in responses:
+            self.assertEqual(response.content.parts[0].text, "Argentina")
+            self.assertEqual(response.custom_metadata[CACHE_OUTCOME_KEY], "coalesced")
+        stats = self.cache.stats()
+        self.assertEqual((stats["misses"], stats["coalesced"]), (1, 3))
+
+    def test_failed_leader_hands_over_to_one_waiter(self):
+        async def scenario():
+            await self.cache.lookup_async(_context("a"), _request())
+            tasks = await self._waiters(3)
+            self.cache.fail(_context("a"), _request(), RuntimeError("quota"))
+            # One waiter becomes the new leader and calls the model...
+            await asyncio.sleep(0.01)
+            leaders = [task for task in tasks if task.done()]
+            self.assertEqual([task.result() for task in leaders], [None])
+            # ...and the others get its response.
+            self.cache.store(_context(f"dup-{tasks.index(leaders[0])}"), _response())
+            return await asyncio.gather(*tasks)
+
+        responses = self.run_async(scenario())
+        self.assertEqual(sum(r is not None for r in responses), 2)
+        self.assertEqual(self.cache.stats()["misses"], 2)
+
+    def test_error_response_is_not_cached_or_shared(self):
+        async def scenario():
+            await self.cache.lookup_async(_context("a"), _request())
+            tasks = await self._waiters(1)
+            failed = _response("", error_code="RESOURCE_EXHAUSTED")
+            self.cache.store(_context("a"), failed)
+            return await asyncio.gather(*tasks)
+
+        self.assertEqual(self.run_async(scenario()), [None])
+        self.assertEqual(self.cache.stats()["stores"], 0)
+
+    def test_stuck_leader_times_out(self):
+        self.cache.coalesce_timeout = 0.05
+
+        async def scenario():
+            await self.cache.lookup_async(_context("a"), _request())
+            return await self.cache.lookup_async(_context("b"), _request())
+
+        self.assertIsNone(self.run_async(scenario()))
+        self.assertEqual(self.cache.stats()["misses"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
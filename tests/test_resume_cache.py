@@ -0,0 +1,58 @@
+"""Tests for the in-process resume cache.
+
+Run from the project root: ``python -m unittest discover tests``.
+"""
+
+import unittest
+
+from resume_creater_memory.resume_cache import ResumeCache
+
+
+class ResumeCacheTest(unittest.TestCase):
+    def test_budget_counts_utf8_bytes(self):
+        cache = ResumeCache(max_bytes=10)
+        cache.put("a", "all", "ééééé")  # 5 characters, 10 bytes
+        self.assertEqual(cache.stats()["bytes"], 10)
+        cache.put("b", "all", "é")
+        self.assertIsNone(cache.get("a", "all"))
+        self.assertEqual(cache.get("b", "all"), "é")
+        self.assertEqual(cache.stats()["bytes"], 2)
+
+    def test_replacing_a_view_updates_the_size(self):
+        cache = ResumeCache()
+        cache.put("a", "all", "abcd")
+        cache.put("a", "latest", "ab")
+        cache.put("a", "all", "a")
+        self.assertEqual(cache.stats()["bytes"], 3)
+        cache.invalidate("a")
+        self.assertEqual(cache.stats()["bytes"], 0)
+
+    def test_least_recently_used_id_is_evicted(self):
+        cache = ResumeCache(max_entries=2)
+        cache.put("a", "all", "1")
+        cache.put("b", "all", "2")
+        cache.get("a", "all")
+        cache.put("c", "all", "3")
+        self.assertIsNone(cache.peek("b", "all"))
+        self.assertEqual(cache.peek("a", "all"), "1")
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_put_after_invalidation_is_dropped(self):
+        cache = ResumeCache()
+        generation = cache.generation("a")
+        cache.invalidate("a")  # a save landed while the reader was reading
+        cache.put("a", "all", "stale", generation)
+        self.assertIsNone(cache.peek("a", "all"))
+        cache.put("a", "all", "fresh", cache.generation("a"))
+        self.assertEqual(cache.peek("a", "all"), "fresh")
+
+    def test_clear_invalidates_every_generation(self):
+        cache = ResumeCache()
+        generation = cache.generation("a")
+        cache.clear()
+        cache.put("a", "all", "stale", generation)
+        self.assertIsNone(cache.peek("a", "all"))
+
+
+if __name__ == "__main__":
+    unittest.main()
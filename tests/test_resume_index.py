@@ -0,0 +1,97 @@
+"""Tests for the BM25 section index over stored resumes.
+
+Run from the project root: ``python -m unittest discover tests``.
+"""
+
+import unittest
+
+from resume_creater_memory.resume_index import ResumeIndex, split_sections
+
+_RESUME = """Jane Doe
+jane@example.com
+
+## Skills
+Python, SQL, Kubernetes
+
+**Experience**
+Backend engineer at Acme, payments platform.
+
+Education:
+BSc Computer Science
+
+PROJECTS
+Open-source scheduler in Go.
+"""
+
+
+class SplitSectionsTest(unittest.TestCase):
+    def test_heading_styles(self):
+        sections = split_sections(_RESUME)
+        self.assertEqual(
+            [heading for heading, _ in sections],
+            ["", "Skills", "Experience", "Education", "PROJECTS"],
+        )
+        self.assertEqual(sections[0][1], "Jane Doe\njane@example.com")
+        self.assertEqual(sections[1][1], "## Skills\nPython, SQL, Kubernetes")
+
+    def test_rules_and_long_lines_are_not_headings(self):
+        text = "Summary:\n-----\n" + "A" * 80 + ":\nend"
+        self.assertEqual([h for h, _ in split_sections(text)], ["Summary"])
+
+
+class ResumeIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.versions = {"u": [(1, _RESUME)]}
+        self.index = ResumeIndex(lambda pid: list(self.versions.get(pid, [])))
+
+    def test_best_section_first(self):
+        results = self.index.search("u", "update my skills: python")
+        self.assertEqual(results[0].heading, "Skills")
+        self.assertGreater(results[0].score, 0)
+        self.assertEqual(self.index.search("u", "acme", k=1)[0].heading, "Experience")
+        self.assertEqual(self.index.search("u", "show my resume"), [])  # stopwords
+
+    def test_unchanged_sections_are_indexed_once(self):
+        edited = _RESUME.replace("Python, SQL", "Python, SQL, Rust")
+        self.versions["u"].append((2, edited))
+        self.index.search("u", "python")
+        self.assertEqual(self.index.stats()["sections"], 6)  # 5 + new Skills
+        results = self.index.search("u", "python sql kubernetes", k=4)
+        # One section per heading: the shorter (closer) Skills section.
+        self.assertEqual([s.heading for s in results], ["Skills"])
+        self.assertEqual(results[0].version_id, 1)
+        self.assertEqual(self.index.search("u", "rust")[0].version_id, 2)
+        education = self.index.search("u", "computer science", k=1)[0]
+        self.assertEqual(education.version_id, 2)
+
+    def test_add_updates_indexed_users_only(self):
+        self.index.add("u", 2, "## Awards\nHackathon winner")
+        self.assertFalse(self.index.indexed("u"))
+        self.assertEqual(self.index.search("u", "hackathon"), [])
+        self.index.add("u", 2, "## Awards\nHackathon winner")
+        self.assertEqual(self.index.search("u", "hackathon")[0].heading, "Awards")
+
+    def test_version_saved_during_build_is_kept(self):
+        def load(pid):
+            # save_resume runs while the index is reading storage.
+            self.index.add(pid, 2, "## Awards\nHackathon winner")
+            return [(1, _RESUME)]
+
+        self.index.load_versions = load
+        self.assertEqual(self.index.search("u", "hackathon")[0].heading, "Awards")
+
+    def test_invalidate_and_eviction(self):
+        self.versions["v"] = [(3, "## Skills\nHaskell")]
+        index = ResumeIndex(self.index.load_versions, max_users=1)
+        index.search("u", "python")
+        index.search("v", "haskell")
+        self.assertFalse(index.indexed("u"))
+        self.assertEqual(index.stats()["evictions"], 1)
+        index.invalidate("v")
+        self.versions["v"] = [(4, "## Skills\nOCaml")]
+        self.assertEqual(index.search("v", "ocaml")[0].version_id, 4)
+        self.assertEqual(index.stats()["builds"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
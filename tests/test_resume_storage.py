@@ -0,0 +1,173 @@
+"""Tests for resume storage.
+
+Run from the project root: ``python -m unittest discover tests``.
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from resume_creater_memory.migrate_storage import migrate
+from resume_creater_memory.resume_storage import (
+    SEPARATOR,
+    ResumeStore,
+    ShardedResumeStore,
+    shard_of,
+)
+
+
+class StorageTestCase(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir, ignore_errors=True)
+
+    def store(self, codec="plain", name="r.db") -> ResumeStore:
+        store = ResumeStore(os.path.join(self.dir, name), self.dir, codec)
+        self.addCleanup(store.close)
+        return store
+
+    def write_legacy(self, persistence_id, *versions):
+        path = os.path.join(self.dir, f"{persistence_id}.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(SEPARATOR.join(versions))
+
+
+class DedupTest(StorageTestCase):
+    def test_repeat_of_latest_is_skipped(self):
+        store = self.store()
+        first, stored = store.save("u", "A")
+        self.assertTrue(stored)
+        again, stored = store.save("u", "A")
+        self.assertFalse(stored)
+        self.assertEqual(again, first)
+        self.assertEqual(store.count("u"), 1)
+        self.assertEqual(store.duplicates_skipped, 1)
+
+    def test_return_to_earlier_text_is_stored(self):
+        store = self.store()
+        for text in ("A", "B", "A"):
+            store.append("u", text)
+        self.assertEqual([v.text for v in store.history("u")], ["A", "B", "A"])
+        self.assertEqual(store.latest("u").text, "A")
+        self.assertEqual(store.duplicates_skipped, 0)
+
+    def test_ids_are_independent(self):
+        store = self.store()
+        store.append("u", "A")
+        _, stored = store.save("v", "A")
+        self.assertTrue(stored)
+
+
+class ShardingTest(StorageTestCase):
+    def test_shard_is_stable_and_in_range(self):
+        for pid in ("u", "user-42", "ünïcode"):
+            self.assertEqual(shard_of(pid, 16), shard_of(pid, 16))
+            self.assertIn(shard_of(pid, 16), range(16))
+        self.assertEqual(shard_of("u", 0), 0)
+
+    def test_ids_are_stored_in_their_shard(self):
+        root = os.path.join(self.dir, "root")
+        store = ShardedResumeStore(root, shards=4, legacy_dir=self.dir, codec="plain")
+        self.addCleanup(store.close)
+        pids = [f"user-{i}" for i in range(12)]
+        for pid in pids:
+            store.append(pid, f"resume of {pid}")
+        for pid in pids:
+            shard = store.shard_for(pid)
+            self.assertIs(shard, store._stores[shard_of(pid, 4)])
+            self.assertEqual(shard.latest(pid).text, f"resume of {pid}")
+            self.assertEqual(store.latest(pid).text, f"resume of {pid}")
+        used = {shard_of(pid, 4) for pid in pids}
+        self.assertGreater(len(used), 1)
+        for i in range(4):
+            self.assertEqual(os.path.exists(store.shard_path(i)), i in used)
+
+
+class LegacyImportTest(StorageTestCase):
+    def test_text_file_versions_come_first(self):
+        self.write_legacy("u", "v1", "v2")
+        store = self.store()
+        store.append("u", "v3")
+        self.assertEqual([v.text for v in store.history("u")], ["v1", "v2", "v3"])
+
+    def test_file_is_imported_once(self):
+        self.write_legacy("u", "v1", "v2")
+        self.assertEqual(self.store().count("u"), 2)
+        self.write_legacy("u", "v1", "v2", "edited later")
+        self.assertEqual(self.store().count("u"), 2)  # a new store, same db
+
+
+class MigrateTest(StorageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.source = os.path.join(self.dir, "source")
+        self.dest = os.path.join(self.dir, "dest")
+        os.makedirs(self.source)
+        for pid in ("a", "b"):
+            with open(os.path.join(self.source, f"{pid}.txt"), "w") as f:
+                f.write(SEPARATOR.join([f"{pid}1", f"{pid}2"]))
+        # The unsharded layout: plain text rows, no compression columns.
+        self.old_db = os.path.join(self.source, "resumes.db")
+        conn = sqlite3.connect(self.old_db)
+        with conn:
+            conn.execute(
+                "CREATE TABLE resume_versions (version_id INTEGER PRIMARY KEY, "
+                "persistence_id TEXT, created_at REAL, text TEXT)"
+            )
+            conn.executemany(
+                "INSERT INTO resume_versions (persistence_id, created_at, text) "
+                "VALUES (?, ?, ?)",
+                [("b", 1.0, "b1"), ("b", 2.0, "b2"), ("c", 3.0, "c1")],
+            )
+        conn.close()
+
+    def listing(self):
+        return {
+            name: os.path.getsize(os.path.join(self.source, name))
+            for name in os.listdir(self.source)
+        }
+
+    def test_dry_run_writes_nothing(self):
+        before = self.listing()
+        counts = migrate(self.source, self.dest, shards=4, dry_run=True)
+        self.assertEqual(
+            counts,
+            {"db_ids": 2, "db_versions": 3, "text_files": 1, "skipped_ids": 0},
+        )
+        self.assertFalse(os.path.exists(self.dest))
+        self.assertEqual(self.listing(), before)  # no -wal/-shm, no upgrade
+
+    def test_migration_is_idempotent(self):
+        migrate(self.source, self.dest, shards=4)
+        counts = migrate(self.source, self.dest, shards=4)
+        self.assertEqual(counts["skipped_ids"], 2)
+        store = ShardedResumeStore(self.dest, shards=4, legacy_dir=self.source)
+        self.addCleanup(store.close)
+        self.assertEqual([v.text for v in store.history("a")], ["a1", "a2"])
+        # b's text file is in the old database already: not imported twice.
+        self.assertEqual([v.text for v in store.history("b")], ["b1", "b2"])
+        self.assertEqual([v.text for v in store.history("c")], ["c1"])
+
+
+class RecompressTest(StorageTestCase):
+    def test_repeated_run_rewrites_nothing(self):
+        store = self.store(codec="plain")
+        for i in range(5):
+            store.append(f"u{i}", "Experience: Python developer. " * 20)
+        self.assertEqual(store.recompress(), 0)  # already plain
+
+        store = self.store(codec="zlib")  # same database, new codec
+        self.assertEqual(store.recompress(), 5)
+        self.assertEqual(store.recompress(), 0)
+        self.assertEqual(store.latest("u0").text, "Experience: Python developer. " * 20)
+
+    def test_incompressible_rows_are_not_retried(self):
+        store = self.store(codec="zlib")
+        store.append("u", "x")  # too short to compress, stays plain
+        self.assertEqual(store.recompress(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+"""Regression tests for skipping the reviser on accurate audits.
+
+Run from the project root: ``python -m unittest discover tests``.
+"""
+
+import asyncio
+import os
+import unittest
+
+os.environ.setdefault("MODEL", "gemini-fake")
+os.environ.setdefault("CRITIC_CACHE", "off")
+
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from fake_llm import FakeLlm, install_fake_llm
+from llm_auditor.agent import root_agent
+
+
+async def _audit_twice(questions):
+    install_fake_llm(root_agent, FakeLlm(latency=0, verdict="Accurate"))
+    runner = InMemoryRunner(agent=root_agent, app_name="test")
+    session = await runner.session_service.create_session(
+        app_name="test", user_id="u"
+    )
+    answers = []
+    for question in questions:
+        final = None
+        async for event in runner.run_async(
+            user_id="u",
+            session_id=session.id,
+            new_message=types.Content(role="user", parts=[types.Part(text=question)]),
+        ):
+            if event.author == "reviser_agent" and event.content:
+                final = "".join(p.text or "" for p in event.content.parts or [])
+        answers.append(final)
+    return answers
+
+
+class SkipRevisionTest(unittest.TestCase):
+    def test_second_audit_returns_its_own_answer(self):
+        answers = asyncio.run(
+            _audit_twice(
+                [
+                    "Question: Capital of France?\nAnswer: Paris is the capital.",
+                    "Question: Capital of Germany?\nAnswer: Berlin is the capital.",
+                ]
+            )
+        )
+        self.assertEqual(
+            answers, ["Paris is the capital.", "Berlin is the capital."]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()